@@ -1,5 +1,12 @@
+import os
 import sys
+import argparse
+from typing import Optional
 from antlr4 import *
+from antlr4.atn.PredictionMode import PredictionMode
+from antlr4.error.ErrorListener import ConsoleErrorListener
+from antlr4.error.ErrorStrategy import BailErrorStrategy, DefaultErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
 from program.CompiscriptLexer import CompiscriptLexer
 from program.CompiscriptParser import CompiscriptParser
 from program.semantic.type_checker import TypeChecker
@@ -7,15 +14,123 @@ from program.semantic.error_reporter import ErrorReporter
 from program.semantic.table import print_symbol_table
 from program.ir.tac_builder import TACBuilder
 from program.ir.tac_gen import TACGen
-from program.codegen.mips.mips_gen import MIPSGenerator
+from program.codegen.mips.mips_gen import MIPSGenerator, REG_ALLOCATORS, DEFAULT_REGALLOC
+from program.pass_timer import PassTimer, count_tree_nodes, count_symbols
+from program.opt.pass_manager import PassManager, PASS_REGISTRY, OPT_LEVELS, resolve_passes
+from program.compile_cache import CompileCache, DEFAULT_MAX_BYTES
 
 
-def compile_full_from_text(src: str):
+def _parse_program(parser, tokens):
+    """
+    Parseo en dos etapas:
+      1) SLL + BailErrorStrategy: rápido, sin recuperación; cualquier error aborta.
+      2) Solo si (1) falla: re-parsea desde el inicio con LL completo y la
+         recuperación/reportes de error normales.
+    Si SLL termina sin errores el árbol es el mismo que produciría LL.
+    Retorna: (tree, used_fallback)
+    """
+    parser._interp.predictionMode = PredictionMode.SLL
+    parser._errHandler = BailErrorStrategy()
+    parser.removeErrorListeners()
+    try:
+        return parser.program(), False
+    except ParseCancellationException:
+        tokens.seek(0)
+        parser.reset()
+        parser.addErrorListener(ConsoleErrorListener.INSTANCE)
+        parser._errHandler = DefaultErrorStrategy()
+        parser._interp.predictionMode = PredictionMode.LL
+        return parser.program(), True
+
+
+def _front_end(input_stream, timer: PassTimer,
+               lexer_cls=CompiscriptLexer, parser_cls=CompiscriptParser):
+    """
+    Lex + Parse + TypeCheck, midiendo cada etapa en 'timer'.
+    Retorna: (tree, reporter, checker)
+    """
+    with timer.stage("lex"):
+        lexer = lexer_cls(input_stream)
+        tokens = CommonTokenStream(lexer)
+        tokens.fill()
+    timer.count("lex", "tokens", len(tokens.tokens))
+
+    with timer.stage("parse"):
+        parser = parser_cls(tokens)
+        tree, used_fallback = _parse_program(parser, tokens)
+    if timer.enabled:
+        timer.count("parse", "parse_tree_nodes", count_tree_nodes(tree))
+        timer.count("parse", "ll_fallback", int(used_fallback))
+
+    with timer.stage("semantic"):
+        reporter = ErrorReporter()
+        checker = TypeChecker(reporter)
+        checker.visit(tree)
+    if timer.enabled:
+        timer.count("semantic", "symbols", count_symbols(checker.scopes))
+        timer.count("semantic", "errors", reporter.count())
+
+    return tree, reporter, checker
+
+
+def _gen_tac(checker, tree, timer: PassTimer, tacgen_cls=TACGen) -> TACBuilder:
+    """Genera TAC usando la symtab del checker (ya trae offsets y ActivationRecord)."""
+    with timer.stage("tac"):
+        builder = TACBuilder()
+        gen = tacgen_cls(checker.symtab, builder)
+        gen.visit(tree)
+    timer.count("tac", "quads", len(builder.tac))
+    return builder
+
+
+def _optimize(tac, timer: PassTimer, passes) -> PassManager:
+    """Corre los passes TAC -> TAC (en sitio) hasta punto fijo; retorna el PassManager."""
+    pm = PassManager(passes, timer=timer)
+    with timer.stage("opt"):
+        pm.run(tac)
+    if timer.enabled and pm.passes:
+        timer.count("opt", "quads_in", pm.quads_in)
+        timer.count("opt", "quads_out", pm.quads_out)
+        timer.count("opt", "iterations", pm.iterations)
+    return pm
+
+
+def _regalloc_for(opt_level: int, regalloc: Optional[str] = None) -> str:
+    """Asignador explícito o, si no se pidió uno, 'color' desde -O2."""
+    if regalloc:
+        return regalloc
+    return "color" if opt_level >= 2 else DEFAULT_REGALLOC
+
+
+def _gen_mips(tac, timer: PassTimer, regalloc: str = DEFAULT_REGALLOC):
+    """Retorna: (asm_code, mips_gen); mips_gen trae frames y regalloc_stats."""
+    with timer.stage("mips"):
+        mips_gen = MIPSGenerator(regalloc=regalloc)
+        asm_code = mips_gen.generate_program(tac)
+    if timer.enabled:
+        timer.count("mips", "asm_lines", len(asm_code.splitlines()))
+        timer.count("mips", "spill_slots", sum(f.spill_slots for f in mips_gen.frames))
+        timer.count("mips", "spill_slots_reused",
+                    sum(f.spill_requests - f.spill_slots for f in mips_gen.frames))
+        timer.count("mips", "moves_coalesced",
+                    sum(st["moves_coalesced"] for st in mips_gen.regalloc_stats))
+        timer.count("mips", "peephole_removed", mips_gen.peephole.total_removed())
+    return asm_code, mips_gen
+
+
+def compile_full_from_text(src: str, timer: Optional[PassTimer] = None,
+                           cache: Optional[CompileCache] = None,
+                           opt_level: int = 0, passes: Optional[str] = None):
     """
     Compila una cadena fuente:
     - Lex/Parse con ANTLR
     - TypeCheck
-    - Si no hay errores: genera TAC y lo devuelve como texto
+    - Si no hay errores: genera TAC, lo optimiza (opt_level / passes, con la
+      sintaxis de --passes) y lo devuelve como texto
+    Si se pasa un PassTimer, registra tiempo/memoria/contadores por etapa.
+    Si se pasa un CompileCache y hay hit, se omite todo el pipeline: en ese caso
+    scopes y tree son None y el reporter viene vacío (solo se cachean
+    compilaciones sin errores).
     Retorna: (reporter, scopes, tree, tac_text)
     """
     # Local imports para tolerar ubicaciones de los generados ANTLR
@@ -30,46 +145,156 @@ def compile_full_from_text(src: str):
     # Importa TACGen ahora, para que su import no falle cuando falten los ANTLR
     from program.ir.tac_gen import TACGen
 
-    input_stream = InputStream(src)
-    lexer = CompiscriptLexer(input_stream)
-    tokens = CommonTokenStream(lexer)
-    parser = CompiscriptParser(tokens)
-    tree = parser.program()
+    timer = timer or PassTimer(enabled=False)
+    pass_names = resolve_passes(opt_level, passes)
 
-    reporter = ErrorReporter()
-    checker = TypeChecker(reporter)
-    checker.visit(tree)
+    cache_key = None
+    if cache is not None:
+        with timer.stage("cache"):
+            cache_key = cache.key(src, _cache_options(mips=False, passes=pass_names))
+            entry = cache.get(cache_key)
+        if entry is not None:
+            return ErrorReporter(), None, None, entry["tac"]
+
+    input_stream = InputStream(src)
+    tree, reporter, checker = _front_end(
+        input_stream, timer, lexer_cls=CompiscriptLexer, parser_cls=CompiscriptParser
+    )
 
     tac_text = ""
     if not reporter.has_errors():
-        builder = TACBuilder()
-        # Usa la symtab que ya trae tu TypeChecker
-        gen = TACGen(checker.symtab, builder)
-        gen.visit(tree)
+        builder = _gen_tac(checker, tree, timer, tacgen_cls=TACGen)
+        _optimize(builder.tac, timer, pass_names)
         tac_text = str(builder.tac)
+        if cache is not None:
+            cache.put(cache_key, tac_text)
 
     return reporter, checker.scopes, tree, tac_text
 
+
+def _cache_options(mips: bool, regalloc: str = DEFAULT_REGALLOC, passes=()) -> dict:
+    """Opciones que forman parte de la clave del caché (todo lo que cambia la salida)."""
+    opts = {"stage": "mips" if mips else "tac"}
+    if passes:
+        # la secuencia resuelta: -O1 y su --passes equivalente comparten entrada
+        opts["passes"] = list(passes)
+    if mips:
+        opts["regalloc"] = regalloc
+    return opts
+
+
+def _parse_args(argv):
+    ap = argparse.ArgumentParser(prog="Driver.py")
+    ap.add_argument("source", help="archivo .cps a compilar")
+    ap.add_argument("--mips", "--emit-mips", dest="mips_out", metavar="ARCHIVO.s",
+                    help="genera ensamblador MIPS en ARCHIVO.s")
+    ap.add_argument("-O", dest="opt_level", type=int, choices=sorted(OPT_LEVELS), default=0,
+                    help="nivel de optimización del TAC: -O0 (ninguna), -O1, -O2 (además usa --regalloc color)")
+    ap.add_argument("--passes", metavar="LISTA",
+                    help="passes TAC a correr: 'a,b' reemplaza los del nivel; '+a,-b' los ajusta "
+                         f"(disponibles: {', '.join(sorted(PASS_REGISTRY)) or 'ninguno'})")
+    ap.add_argument("--opt-stats", action="store_true",
+                    help="imprime, por pass, ejecuciones, cambios, tiempo y delta de quads")
+    ap.add_argument("--regalloc", choices=sorted(REG_ALLOCATORS), default=None,
+                    help=f"asignador de registros del backend MIPS (por defecto: {DEFAULT_REGALLOC}; color con -O2)")
+    ap.add_argument("--regalloc-stats", action="store_true",
+                    help="imprime, por función, valores, spills, moves coalescidos y slots de spill antes/después del reuso")
+    ap.add_argument("--peephole-stats", action="store_true",
+                    help="imprime cuántas instrucciones quitó cada regla del peephole MIPS")
+    ap.add_argument("--time-passes", action="store_true",
+                    help="imprime tiempo de pared/CPU y contadores por etapa")
+    ap.add_argument("--mem-passes", action="store_true",
+                    help="como --time-passes, agregando pico de memoria (tracemalloc)")
+    ap.add_argument("--time-json", metavar="ARCHIVO.json",
+                    help="escribe el reporte por etapa en formato JSON")
+    ap.add_argument("--cache-dir", metavar="DIR", default=os.environ.get("CPS_CACHE_DIR"),
+                    help="directorio del caché de compilación (o variable CPS_CACHE_DIR)")
+    ap.add_argument("--cache-max-size", metavar="MB", type=float,
+                    default=DEFAULT_MAX_BYTES / (1024 * 1024),
+                    help="tamaño máximo del caché antes de expulsar entradas (LRU)")
+    ap.add_argument("--cache-stats", action="store_true",
+                    help="imprime hits/misses/expulsiones del caché al terminar")
+    return ap.parse_args(argv[1:])
+
+
+def _report_passes(timer: PassTimer, opts) -> None:
+    if not timer.enabled:
+        return
+    timer.close()
+    if opts.time_json:
+        timer.to_json(opts.time_json)
+    if opts.time_passes or opts.mem_passes:
+        print("\n=== Tiempos por etapa ===")
+        print(timer.report())
+
+
+def _write_asm(output_file: str, asm_code: str) -> None:
+    print(f"\n=== Generación de Código MIPS → {output_file} ===")
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write(asm_code)
+    print(f"Código ensamblador guardado en {output_file}")
+
+
+def _wants_stats(opts) -> bool:
+    """True si se pidió alguna estadística que solo produce una compilación completa."""
+    return opts.opt_stats or opts.regalloc_stats or opts.peephole_stats
+
+
+def _report_cache(cache: Optional[CompileCache], opts) -> None:
+    if cache is not None and opts.cache_stats:
+        print("\n=== Caché de compilación ===")
+        print(cache.format_stats())
+
+
 def main(argv):
     if len(argv) < 2:
-        print("Uso: python Driver.py <archivo.cps>")
+        print("Uso: python Driver.py <archivo.cps> [-O0|-O1|-O2] [--passes LISTA] [--mips salida.s] [--time-passes] [--mem-passes]")
         return
 
-    input_stream = FileStream(argv[1], encoding="utf-8")
-    lexer = CompiscriptLexer(input_stream)
-    tokens = CommonTokenStream(lexer)
-    parser = CompiscriptParser(tokens)
+    opts = _parse_args(argv)
+    try:
+        pass_names = resolve_passes(opts.opt_level, opts.passes)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    regalloc = _regalloc_for(opts.opt_level, opts.regalloc)
+    timer = PassTimer(
+        enabled=bool(opts.time_passes or opts.mem_passes or opts.time_json),
+        track_memory=opts.mem_passes,
+    )
+
+    with open(opts.source, "r", encoding="utf-8") as f:
+        src = f.read()
 
-    tree = parser.program()
+    cache = None
+    cache_key = None
+    if opts.cache_dir:
+        cache = CompileCache(opts.cache_dir, max_bytes=int(opts.cache_max_size * 1024 * 1024))
+        with timer.stage("cache"):
+            cache_key = cache.key(src, _cache_options(mips=bool(opts.mips_out), regalloc=regalloc,
+                                                      passes=pass_names))
+            # las estadísticas salen de compilar de verdad: con --*-stats no se lee
+            # el caché (el resultado se vuelve a guardar igual)
+            entry = None if _wants_stats(opts) else cache.get(cache_key)
+        if entry is not None:
+            print("\nCompilación recuperada del caché (se omite ANTLR → TypeChecker → TACGen → MIPS).")
+            print("\n=== Generación de Código Intermedio (TAC) ===")
+            print(entry["tac"])
+            if opts.mips_out:
+                _write_asm(opts.mips_out, entry["asm"])
+            _report_cache(cache, opts)
+            _report_passes(timer, opts)
+            return
 
-    reporter = ErrorReporter()
-    checker = TypeChecker(reporter)
-    checker.visit(tree)
+    input_stream = InputStream(src)
+    tree, reporter, checker = _front_end(input_stream, timer)
 
     if reporter.has_errors():
         print("\nErrores semánticos encontrados:")
         for e in reporter:
             print("   ", e)
+        _report_cache(cache, opts)
+        _report_passes(timer, opts)
         return
 
     print("\nAnálisis semántico completado sin errores.")
@@ -80,23 +305,30 @@ def main(argv):
 
     # ✅ Generación de TAC usando la symtab del checker
     print("\n=== Generación de Código Intermedio (TAC) ===")
-    builder = TACBuilder()
-    gen = TACGen(checker.symtab, builder)   # ← usa la symtab del checker, no reconstruyas
-    gen.visit(tree)
+    builder = _gen_tac(checker, tree, timer)   # ← usa la symtab del checker, no reconstruyas
+    pm = _optimize(builder.tac, timer, pass_names)
     print(builder.tac)
-    
-    # Si el usuario pide generar MIPS
-    if len(argv) >= 4 and argv[2] in ("--mips", "--emit-mips"):
-        output_file = argv[3]
-        print(f"\n=== Generación de Código MIPS → {output_file} ===")
+    if opts.opt_stats and pm.passes:
+        print("\n=== Passes de optimización ===")
+        print(pm.format_stats())
 
-        mips_gen = MIPSGenerator()
-        asm_code = mips_gen.generate_program(builder.tac)
+    # Si el usuario pide generar MIPS
+    asm_code = None
+    if opts.mips_out:
+        asm_code, mips_gen = _gen_mips(builder.tac, timer, regalloc=regalloc)
+        _write_asm(opts.mips_out, asm_code)
+        if opts.regalloc_stats:
+            print("\n=== Asignación de registros ===")
+            print(mips_gen.format_regalloc_stats())
+        if opts.peephole_stats:
+            print("\n=== Peephole MIPS ===")
+            print(mips_gen.format_peephole_stats())
 
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write(asm_code)
+    if cache is not None:
+        cache.put(cache_key, str(builder.tac), asm_code)
 
-        print(f"Código ensamblador guardado en {output_file}")
+    _report_cache(cache, opts)
+    _report_passes(timer, opts)
 
 if __name__ == "__main__":
     main(sys.argv)
@@ -1,13 +1,17 @@
 # program/codegen/mips/frame.py
 
 from dataclasses import dataclass, field
-from typing import Dict
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from program.runtime.activation_record import ARG_REGS
 
 # Convención de offsets relativos a $fp:
 # 
-#   fp + 12 -> arg0
-#   fp + 16 -> arg1
-#   fp + 20 -> arg2
+#   fp + 12 -> arg0   (llega en $a0; el slot es su "home")
+#   fp + 16 -> arg1   (llega en $a1)
+#   fp + 20 -> arg2   (llega en $a2)
+#   fp + 24 -> arg3   (llega en $a3)
+#   fp + 28 -> arg4   (ya en la pila, lo escribe el caller)
 #
 #   fp + 8  -> $ra
 #   fp + 4  -> old $fp
@@ -16,10 +20,15 @@ from typing import Dict
 #   fp - 4  -> locales / spills
 #   fp - 8  -> locales / spills
 #   fp - 12 -> ...
+#   ...     -> $s* guardados por el callee (después de locales y spills)
+#
+# El caller reserva los 4*n bytes de args con un único ajuste de $sp; el callee
+# copia $aN a su home solo si el cuerpo usa ese parámetro (homed_args) y no
+# basta con leerlo de $aN antes del primer call/print/alloc.
 #
 # El tamaño del frame (frame_size) solo incluye:
 #   - 8 bytes para old $fp y $ra
-#   - 4 bytes por cada local/spill
+#   - 4 bytes por cada local/spill/$s guardado
 # y se alinea a múltiplos de 8.
 
 @dataclass
@@ -28,7 +37,18 @@ class Frame:
     num_params: int = 0
     num_locals: int = 0
     spill_slots: int = 0
+    # slots que se habrían usado con uno por valor derramado (sin reuso)
+    spill_requests: int = 0
     local_offsets: Dict[str, int] = field(default_factory=dict)
+    # $s* que la función usa y debe preservar: reg -> offset relativo a $fp
+    saved_regs: Dict[str, int] = field(default_factory=dict)
+    # args que llegan en $a* y el cuerpo usa: reg -> offset de su home ($fp)
+    homed_args: Dict[str, int] = field(default_factory=dict)
+    # Hoja: no hace ningún jal, así que $ra no cambia y no hace falta guardarlo
+    leaf: bool = False
+    # False si ni el cuerpo ni el prólogo/epílogo direccionan vía $fp:
+    # la función no necesita frame (sin prólogo, epílogo = jr $ra)
+    needs_fp: bool = True
 
     # Offsets fijos para el prólogo/epílogo (relativos a $fp)
     SAVED_FP_OFFSET: int = 4            # fp + 4  -> old $fp
@@ -37,6 +57,11 @@ class Frame:
     # Siguiente offset negativo disponible para locals/spills
     _next_neg_offset: int = field(default=-4, init=False)
 
+    @property
+    def exit_label(self) -> str:
+        """Etiqueta del epílogo: destino de los 'ret' que no están al final."""
+        return f"{self.func_name}_epilogo"
+
     # Asignación de locales
     def alloc_local(self, name: str) -> int:
         """
@@ -58,6 +83,61 @@ class Frame:
         off = self._next_neg_offset
         self._next_neg_offset -= 4
         self.spill_slots += 1
+        self.spill_requests += 1
+        return off
+
+    def share_spill_slots(
+        self,
+        values: Sequence[Any],
+        interferes: Callable[[Any, Any], bool],
+    ) -> List[int]:
+        """
+        Coloreo de slots: cada valor toma el primer slot ya reservado cuyos
+        ocupantes no interfieren con él (rangos vivos disjuntos); si no hay,
+        uno nuevo con alloc_spill(). Devuelve el offset de cada valor, en orden.
+        Con 'values' ordenados por inicio y rangos como intervalos, el greedy
+        usa el mínimo de slots.
+        """
+        slots: List[Tuple[int, List[Any]]] = []
+        out: List[int] = []
+        for v in values:
+            for off, occupants in slots:
+                if not any(interferes(v, o) for o in occupants):
+                    occupants.append(v)
+                    out.append(off)
+                    break
+            else:
+                off = self.alloc_spill()
+                slots.append((off, [v]))
+                out.append(off)
+        # alloc_spill() ya contó los slots nuevos; sumar los valores que reusaron
+        self.spill_requests += len(values) - len(slots)
+        return out
+
+    def spill_report(self) -> Dict[str, int]:
+        """Slots de spill antes (uno por valor) y después del reuso."""
+        return {"spill_slots_before": self.spill_requests,
+                "spill_slots_after": self.spill_slots}
+
+    def alloc_saved_reg(self, reg: str) -> int:
+        """
+        Reserva el slot donde el prólogo guarda un registro callee-saved ($s*)
+        y el epílogo lo restaura. Idempotente por registro.
+        """
+        if reg not in self.saved_regs:
+            self.saved_regs[reg] = self._next_neg_offset
+            self._next_neg_offset -= 4
+        return self.saved_regs[reg]
+
+    def home_arg(self, i: int) -> int:
+        """
+        Marca que el arg i (en $a0..$a3) debe copiarse a su home en el prólogo.
+        Devuelve el offset del home. Idempotente.
+        """
+        if not 0 <= i < len(ARG_REGS):
+            raise IndexError(f"El parámetro {i} no llega en registro")
+        off = self.offset_of_param(i)
+        self.homed_args[ARG_REGS[i]] = off
         return off
 
     # Acceso a locales
@@ -85,9 +165,9 @@ class Frame:
     # Tamaño del frame
     def _locals_spills_size(self) -> int:
         """
-        Bytes usados por locales + spills (cada uno 4 bytes).
+        Bytes usados por locales + spills + $s guardados (cada uno 4 bytes).
         """
-        return 4 * (self.num_locals + self.spill_slots)
+        return 4 * (self.num_locals + self.spill_slots + len(self.saved_regs))
 
     def frame_size(self) -> int:
         """
@@ -95,8 +175,9 @@ class Frame:
 
         Incluye:
             - 12 bytes de cabecera (old $fp, $ra y padding)
-            - 4 * (num_locals + spill_slots)
-        NO incluye parámetros (son parte del caller).
+            - 4 * (num_locals + spill_slots + $s guardados)
+        NO incluye parámetros (son parte del caller). Es exacto solo después de
+        la asignación de registros (spills, saves y $s* ya reservados).
         """
         base = 12
         extra = self._locals_spills_size()
@@ -0,0 +1,226 @@
+# program/codegen/mips/graph_color.py
+#
+# Asignador por coloreo de grafos (Chaitin-Briggs), para funciones "calientes".
+#
+# 1) Grafo de interferencia sobre los quads normalizados, a partir de Liveness:
+#    cada variable definida en i interfiere con lo vivo después de i. En
+#    'assign' x := y NO se agrega la arista x-y (clásico de Chaitin), para poder
+#    coalescer el move. El selector lee todos los operandos antes de escribir el
+#    destino, así que el destino puede reusar el registro de un operando que muere.
+# 2) Coalescing conservador (Briggs): x := y se fusiona si x e y no interfieren
+#    y el nodo resultante tiene menos de K vecinos de grado significativo (>= K).
+# 3) Simplify / select con coloreo optimista (Briggs): si no hay nodos de grado
+#    < K, se empuja igual el de menor costo/grado; solo se derrama de verdad si
+#    al hacer select no le queda color.
+# 4) Costo de spill = sum(10^profundidad_de_loop) sobre usos y definiciones.
+#
+# Los valores derramados viven completos en un slot del frame y el selector los
+# carga/almacena vía los registros scratch ($t7..$t9): no hace falta reescribir
+# el código ni reconstruir el grafo. Los slots se colorean con el mismo grafo:
+# derramados que no interfieren comparten slot.
+
+from typing import Dict, List, Set, Tuple
+
+from .linear_scan import Interval, LinearScanAllocator
+from .operands import VAR_KINDS
+from .reg_alloc import S_REGS
+
+
+def loop_depths(liveness) -> List[int]:
+    """
+    Profundidad de loop por instrucción: cada arco hacia atrás b -> s (s <= b en
+    el orden del código) define un loop que abarca los bloques s..b.
+    """
+    depth = [0] * len(liveness)
+    spans = set()
+    for b, succs in enumerate(liveness.succ):
+        for s in succs:
+            if s <= b:
+                spans.add((s, b))
+    for s, b in spans:
+        for i in range(liveness.blocks[s][0], liveness.blocks[b][1]):
+            depth[i] += 1
+    return depth
+
+
+class GraphColorAllocator(LinearScanAllocator):
+    """
+    Misma API que LinearScanAllocator (ubicaciones fijas por variable); solo
+    cambia cómo se decide la ubicación. Colores: $t0..$t6 y $s0..$s7; los
+    valores vivos a través de llamadas prefieren $s*.
+    """
+
+    name = "color"
+
+    def __init__(self, liveness=None):
+        super().__init__(liveness)
+        self.moves_coalesced = 0
+        self.alias: Dict[str, str] = {}
+        self._adj: List[Set[int]] = []
+        self._roots: List[int] = []
+
+    def attach_frame(self, frame):
+        super().attach_frame(frame)
+        self.moves_coalesced = 0
+        self.alias = {}
+
+    # ---------- construcción del grafo ----------
+    def _build_graph(self) -> Tuple[List[Set[int]], List[Tuple[int, int]], List[float]]:
+        liv = self.liveness
+        nv = len(liv.var_names)
+        adj: List[Set[int]] = [set() for _ in range(nv)]
+        moves: List[Tuple[int, int]] = []
+        cost: List[float] = [0.0] * nv
+        depth = loop_depths(liv)
+
+        for i, q in enumerate(liv.quads):
+            d_bits = liv.def_bits[i]
+            u_bits = liv.use_bits[i]
+
+            w = 10.0 ** depth[i]
+            bits = d_bits | u_bits
+            while bits:
+                low = bits & -bits
+                cost[low.bit_length() - 1] += w
+                bits ^= low
+
+            if not d_bits:
+                continue
+            live = liv.out_bits(i)
+            if q["op"] == "assign" and q["k1"] in VAR_KINDS and q["kd"] in VAR_KINDS:
+                src = liv.var_index[q["a1"]]
+                dst = liv.var_index[q["dst"]]
+                if src != dst:
+                    moves.append((dst, src))
+                    live &= ~(1 << src)
+
+            bits = d_bits
+            while bits:
+                low = bits & -bits
+                d = low.bit_length() - 1
+                bits ^= low
+                others = live & ~low
+                while others:
+                    olow = others & -others
+                    o = olow.bit_length() - 1
+                    others ^= olow
+                    adj[d].add(o)
+                    adj[o].add(d)
+        return adj, moves, cost
+
+    # ---------- coalescing conservador (Briggs) ----------
+    def _coalesce(self, adj, moves, cost, k) -> List[int]:
+        parent = list(range(len(adj)))
+
+        def find(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        changed = True
+        while changed:
+            changed = False
+            for dst, src in moves:
+                a, b = find(dst), find(src)
+                if a == b or b in adj[a]:
+                    continue
+                neighbors = adj[a] | adj[b]
+                significant = sum(1 for n in neighbors if len(adj[n]) >= k)
+                if significant >= k:
+                    continue
+                # fusionar b dentro de a
+                for n in adj[b]:
+                    adj[n].discard(b)
+                    adj[n].add(a)
+                adj[a] |= adj[b]
+                adj[b] = set()
+                cost[a] += cost[b]
+                parent[b] = a
+                changed = True
+
+        self.moves_coalesced = sum(1 for dst, src in moves if find(dst) == find(src))
+        return [find(v) for v in range(len(adj))]
+
+    # ---------- simplify / select ----------
+    def _color(self, adj, cost, roots, colors, crossing: Set[int]) -> Dict[int, str]:
+        k = len(colors)
+        nodes = sorted(set(roots))
+        degree = {n: len(adj[n]) for n in nodes}
+        removed: Set[int] = set()
+        stack: List[int] = []
+
+        while len(removed) < len(nodes):
+            pick = None
+            for n in nodes:
+                if n not in removed and degree[n] < k:
+                    pick = n
+                    break
+            if pick is None:
+                # candidato a spill (optimista): menor costo por vecino
+                pick = min((n for n in nodes if n not in removed),
+                           key=lambda n: (cost[n] / max(degree[n], 1), n))
+            removed.add(pick)
+            stack.append(pick)
+            for m in adj[pick]:
+                if m not in removed:
+                    degree[m] -= 1
+
+        color_of: Dict[int, str] = {}
+        while stack:
+            n = stack.pop()
+            taken = {color_of[m] for m in adj[n] if m in color_of}
+            # vivos a través de llamadas prefieren $s* (ver LinearScanAllocator._pool)
+            for c in self._pool(n in crossing):
+                if c not in taken:
+                    color_of[n] = c
+                    break
+        return color_of
+
+    def _allocate(self) -> None:
+        colors = self._pool()
+        adj, moves, cost = self._build_graph()
+        roots = self._coalesce(adj, moves, cost, len(colors))
+        crossing = {roots[self.liveness.var_index[iv.name]]
+                    for iv in self.intervals if iv.crosses_call}
+        color_of = self._color(adj, cost, roots, colors, crossing)
+
+        names = self.liveness.var_names
+        self._adj, self._roots = adj, roots
+        for iv in self.intervals:
+            v = self.liveness.var_index[iv.name]
+            root = roots[v]
+            if root != v:
+                self.alias[iv.name] = names[root]
+            reg = color_of.get(root)
+            if reg is not None:
+                iv.reg = reg
+                if reg in S_REGS:
+                    self.used_s.add(reg)
+            self.loc[iv.name] = iv
+
+    # ---------- slots de spill ----------
+    def _spill_units(self) -> List[List[Interval]]:
+        """Los derramados coalescidos con el mismo representante comparten slot."""
+        groups: Dict[int, List[Interval]] = {}
+        for iv in self.intervals:
+            if iv.reg is None:
+                groups.setdefault(self._root_of(iv), []).append(iv)
+        return list(groups.values())
+
+    def _root_of(self, iv: Interval) -> int:
+        return self._roots[self.liveness.var_index[iv.name]]
+
+    def _units_interfere(self, a: List[Interval], b: List[Interval]) -> bool:
+        # entre valores, el grafo de interferencia (más preciso que los intervalos);
+        # los saves de un jal no están en el grafo
+        if a[0].name in self.loc and b[0].name in self.loc:
+            return self._root_of(b[0]) in self._adj[self._root_of(a[0])]
+        return super()._units_interfere(a, b)
+
+    def stats(self) -> Dict[str, object]:
+        out = super().stats()
+        # una variable coalescida comparte ubicación con su representante
+        out["spills"] = len({self._root_of(iv) for iv in self.intervals if iv.reg is None})
+        out["moves_coalesced"] = self.moves_coalesced
+        return out
@@ -3,11 +3,43 @@
 from typing import Dict
 import re
 
+from .string_pool import StringPool
+from .strength import INT_MIN, is_pow2, log2, shift_add_terms, signed_magic
+from program.runtime.activation_record import ARG_REGS
+from .operands import (
+    K_INT, K_STR, K_SYM, K_ADDR, CONST_KINDS, SYM_VALUES,
+    classify_text, parse_addr_text,
+)
+
+# relacional -> salto fusionado (MIPSGenerator._fuse_adjacent); contra
+# cero hay instrucciones propias (bltz/bgez/... son reales, no pseudo)
+BRANCH_OPS = {"<": "blt", "<=": "ble", ">": "bgt", ">=": "bge", "==": "beq", "!=": "bne"}
+BRANCH_ZERO_OPS = {"<": "bltz", "<=": "blez", ">": "bgtz", ">=": "bgez", "==": "beqz", "!=": "bnez"}
+# a op b  <=>  b SWAPPED[op] a
+SWAPPED_REL = {"<": ">", "<=": ">=", ">": "<", ">=": "<=", "==": "==", "!=": "!="}
+REL_EVAL = {
+    "<": lambda x, y: x < y, "<=": lambda x, y: x <= y, ">": lambda x, y: x > y,
+    ">=": lambda x, y: x >= y, "==": lambda x, y: x == y, "!=": lambda x, y: x != y,
+}
+
+
+def fits_simm16(v: int) -> bool:
+    """Cabe como inmediato con signo de addiu/slti/sltiu (16 bits)."""
+    return -0x8000 <= v <= 0x7FFF
+
+
+def fits_uimm16(v: int) -> bool:
+    """Cabe como inmediato sin signo de andi/ori/xori (16 bits)."""
+    return 0 <= v <= 0xFFFF
+
+
 class InstructionSelector:
-    def __init__(self, writer, reg_alloc, frame, string_vars=None, known_funcs=None):
+    def __init__(self, writer, reg_alloc, frame, string_vars=None, known_funcs=None, strings=None):
         self.w = writer
         self.ra = reg_alloc
         self.frame = frame
+        # pool de literales del programa (MIPSGenerator); aquí solo se referencian etiquetas
+        self.strings = strings if strings is not None else StringPool()
         self.pc = 0
         # conjunto de nombres de variables que guardan direcciones de strings
         self.string_vars = set(string_vars or [])
@@ -24,6 +56,142 @@ class InstructionSelector:
         # acepta enteros negativos y literales "..."
         return x.lstrip("-").isdigit() or (x.startswith('"') and x.endswith('"'))
 
+    def _int_value(self, x: str, kind: str):
+        """Valor de una constante entera o simbólica (true/false/null); None si no lo es."""
+        if kind == K_INT:
+            return int(x)
+        if kind == K_SYM:
+            return SYM_VALUES[x]
+        return None
+
+    def _reg_or_li(self, x: str, kind: str, scratch: str) -> str:
+        """Registro con el valor de x; una constante entera se carga con li en 'scratch' ($zero si es 0)."""
+        v = self._int_value(x, kind)
+        if v is None:
+            return self._read_into_reg(x, scratch)
+        if v == 0:
+            return "$zero"
+        self.w.emit(f"li {scratch}, {v}")
+        return scratch
+
+    def _arith_imm(self, op: str, c):
+        """(mnemónico, inmediato) para 'x op c' en una sola instrucción, o None."""
+        if c is None:
+            return None
+        if op == "+" and fits_simm16(c):
+            return "addiu", c
+        if op == "-" and fits_simm16(-c):
+            return "addiu", -c
+        return None
+
+    def _strength_ok(self, op: str, c) -> bool:
+        """x op c (op en * / %) sin mul/div: ver strength.py."""
+        if c is None or op not in ("*", "/", "%"):
+            return False
+        if op == "*":
+            return c in (0, 1, -1) or shift_add_terms(abs(c)) is not None
+        # c == 0 mantiene el 'div' (resultado indefinido, como antes)
+        return c != 0 and c != INT_MIN
+
+    def _emit_by_const(self, op: str, out: str, rs: str, c: int) -> None:
+        """
+        out = rs op c con shifts/sumas o multiplicación por número mágico.
+        $t8 y x (el scratch que no es rs) son temporales; out se escribe al
+        final, así que puede coincidir con x o con rs.
+        """
+        x = "$t9" if rs == "$t7" else "$t7"
+        emit = self.w.emit
+        if op == "*":
+            if c == 0:
+                emit(f"move {out}, $zero")
+            elif c == 1:
+                emit(f"move {out}, {rs}")
+            elif c == -1:
+                emit(f"subu {out}, $zero, {rs}")
+            else:
+                r = out if c > 0 else "$t8"
+                terms = shift_add_terms(abs(c))
+                if terms[0] == "sll":
+                    emit(f"sll {r}, {rs}, {terms[1]}")
+                else:
+                    mn, a, b = terms
+                    emit(f"sll $t8, {rs}, {a}")
+                    if b == 0:
+                        emit(f"{mn} {r}, $t8, {rs}")
+                    else:
+                        emit(f"sll {x}, {rs}, {b}")
+                        emit(f"{mn} {r}, $t8, {x}")
+                if c < 0:
+                    emit(f"subu {out}, $zero, $t8")
+            return
+
+        ad = abs(c)
+        if ad == 1:
+            if op == "%":
+                emit(f"move {out}, $zero")
+            elif c == 1:
+                emit(f"move {out}, {rs}")
+            else:
+                emit(f"subu {out}, $zero, {rs}")
+            return
+
+        if is_pow2(ad):
+            # sesgo 2^k - 1 solo si rs < 0: trunca hacia cero como 'div'
+            k = log2(ad)
+            if k == 1:
+                emit(f"srl $t8, {rs}, 31")
+            else:
+                emit(f"sra $t8, {rs}, 31")
+                emit(f"srl $t8, $t8, {32 - k}")
+            if op == "/":
+                emit(f"addu $t8, {rs}, $t8")
+                if c > 0:
+                    emit(f"sra {out}, $t8, {k}")
+                else:
+                    emit(f"sra $t8, $t8, {k}")
+                    emit(f"subu {out}, $zero, $t8")
+            elif fits_uimm16(ad - 1):
+                # ((rs + sesgo) & (2^k - 1)) - sesgo
+                emit(f"addu {x}, {rs}, $t8")
+                emit(f"andi {x}, {x}, {ad - 1}")
+                emit(f"subu {out}, {x}, $t8")
+            else:
+                emit(f"addu {x}, {rs}, $t8")
+                emit(f"sra {x}, {x}, {k}")
+                emit(f"sll {x}, {x}, {k}")
+                emit(f"subu {out}, {rs}, {x}")
+            return
+
+        m, shift = signed_magic(c)
+        emit(f"li $t8, {m}")
+        emit(f"mult {rs}, $t8")
+        emit("mfhi $t8")
+        if c > 0 and m < 0:
+            emit(f"addu $t8, $t8, {rs}")
+        elif c < 0 and m > 0:
+            emit(f"subu $t8, $t8, {rs}")
+        if shift:
+            emit(f"sra $t8, $t8, {shift}")
+        emit(f"srl {x}, $t8, 31")
+        if op == "/":
+            emit(f"addu {out}, $t8, {x}")
+        else:
+            # resto = rs - q * c
+            emit(f"addu $t8, $t8, {x}")
+            emit(f"li {x}, {c}")
+            emit(f"mul $t8, $t8, {x}")
+            emit(f"subu {out}, {rs}, $t8")
+
+    def _rel_imm_ok(self, op: str, c) -> bool:
+        """'x op c' se resuelve con slti/sltiu/xori/addiu sin cargar c en un registro."""
+        if c is None:
+            return False
+        if op in ("<", ">="):
+            return fits_simm16(c)
+        if op in ("<=", ">"):
+            return fits_simm16(c + 1)
+        return c == 0 or fits_uimm16(c) or fits_simm16(-c)
+
     def _mem_addr(self, bracketed: str):
         """
         Traduce direcciones TAC tipo [fp+2] o [fp-1] a offsets en bytes.
@@ -32,26 +200,9 @@ class InstructionSelector:
             fp+8  -> $ra
             fp+12 -> arg0
         Por tanto, [fp+2] debe mapear a 12($fp), no 8($fp).
+        (Solo para quads sin m1/m2 precalculados; ver operands.frame_addr_bytes.)
         """
-        inside = bracketed[1:-1].strip()
-        if "+" in inside:
-            base, off = inside.split("+", 1)
-            sgn, val = +1, int(off.strip())
-        elif "-" in inside:
-            base, off = inside.split("-", 1)
-            sgn, val = -1, int(off.strip())
-        else:
-            base, val, sgn = inside, 0, +1
-
-        base = base.strip()
-        byte_off = sgn * val * 4
-
-        # ⚙️ Ajuste especial solo para base == "fp" y desplazamientos positivos:
-        # agrega 4 bytes para compensar que arg0 = fp + 12, no fp + 8
-        if base == "fp" and sgn > 0:
-            byte_off += 4
-
-        return base, byte_off
+        return parse_addr_text(bracketed)
 
 
     def _save_victim(self, victim):
@@ -76,6 +227,16 @@ class InstructionSelector:
             self.ra.mark_loaded(name)
         return reg
 
+    def _read_into(self, name: str, target: str) -> None:
+        """Deja el valor de 'name' (variable o entero literal) en 'target' ($a*)."""
+        if self._is_const(name) and not name.startswith('"'):
+            self.w.emit(f"li {target}, {name}")
+            return
+        # si vive en memoria, _read_into_reg ya lo carga directo en 'target'
+        rs = self._read_into_reg(name, target)
+        if rs != target:
+            self.w.emit(f"move {target}, {rs}")
+
     def _dest_reg_or_spill(self, name: str, scratch: str = "$t8", across: bool = False):
         """Reg destino si cabe; si no, (None, off, scratch) para luego sw scratch->off."""
         reg, off, victim = self.ra.get_reg(name, across_call=across)
@@ -94,6 +255,16 @@ class InstructionSelector:
 
         op, a1, a2, dst, lab = q["op"], q["a1"], q["a2"], q["dst"], q["label"]
 
+        # Tipos de operando precalculados por MIPSGenerator._normalize_quad;
+        # si el quad viene de otro lado, se clasifican aquí una sola vez.
+        if "k1" in q:
+            k1, k2 = q["k1"], q["k2"]
+            m1, m2 = q["m1"], q["m2"]
+        else:
+            k1, k2 = classify_text(a1), classify_text(a2)
+            m1 = self._mem_addr(a1) if k1 == K_ADDR else None
+            m2 = self._mem_addr(a2) if k2 == K_ADDR else None
+
         # --- Saneamiento defensivo de labels (por si _normalize dejó cosas raras) ---
         if op == "goto":
             # si a1 viene vacío pero dst trae el label, usamos dst
@@ -118,7 +289,7 @@ class InstructionSelector:
 
         # IF GOTO  (if t goto L)
         if op in ("ifgoto", "if_goto"):
-            if self._is_const(a1):
+            if k1 in CONST_KINDS or k1 == K_SYM:
                 cond_true = (a1 not in ("0", "false", "null"))
                 if cond_true: self.w.emit(f"j {a2}")
             else:
@@ -126,21 +297,45 @@ class InstructionSelector:
                 self.w.emit(f"bne {rcond}, $zero, {a2}")
                 self.ra.free_if_dead(a1, pc)
             return
+
+        # BRANCH  (rel a1, a2 -> t ; if t goto L  fusionados)
+        if op == "branch":
+            rel, target = q["rel"], q["target"]
+            c1, c2 = self._int_value(a1, k1), self._int_value(a2, k2)
+            if c1 is not None and c2 is not None:
+                if REL_EVAL[rel](c1, c2):
+                    self.w.emit(f"j {target}")
+                return
+            if c1 is not None:
+                # constante a la derecha: 3 < x  ==  x > 3
+                a1, a2, c2, rel = a2, a1, c1, SWAPPED_REL[rel]
+            rs = self._read_into_reg(a1, "$t7")
+            if c2 == 0:
+                self.w.emit(f"{BRANCH_ZERO_OPS[rel]} {rs}, {target}")
+            elif c2 is not None and rel in ("<", ">=", "<=", ">") and self._rel_imm_ok(rel, c2):
+                # blt/bge contra constante: slti + salto sobre cero (x <= c  <=>  x < c+1)
+                bound = c2 if rel in ("<", ">=") else c2 + 1
+                self.w.emit(f"slti $t8, {rs}, {bound}")
+                self.w.emit(f"{'bnez' if rel in ('<', '<=') else 'beqz'} $t8, {target}")
+            else:
+                if c2 is not None:
+                    rt = "$t8"
+                    self.w.emit(f"li {rt}, {c2}")
+                else:
+                    rt = self._read_into_reg(a2, "$t8")
+                self.w.emit(f"{BRANCH_OPS[rel]} {rs}, {rt}, {target}")
+            self.ra.free_if_dead(a1, pc)
+            self.ra.free_if_dead(a2, pc)
+            return
         
         # ASSIGN: dst := a1
         if op == "assign":
-            if self._is_const(a1):
+            if k1 in CONST_KINDS or k1 == K_SYM:
                 # Literal de STRING: "..."
-                if a1.startswith('"') and a1.endswith('"'):
-                    label = f"_str_{hash(a1) & 0xFFFF:X}"
-
-                    # Definimos el string en la sección .data
-                    self.w.data()
-                    self.w.label(label)
-                    self.w.emit(f".asciiz {a1}")
+                if k1 == K_STR:
+                    label = self.strings.intern(a1)
 
-                    # Volvemos a .text y cargamos la DIRECCIÓN en el destino
-                    self.w.text()
+                    # Cargamos la DIRECCIÓN del literal (definido en el pool .data)
                     rd, off, sc = self._dest_reg_or_spill(dst)
                     if rd:
                         self.w.emit(f"la {rd}, {label}")
@@ -148,20 +343,23 @@ class InstructionSelector:
                         self.w.emit(f"la {sc}, {label}")
                         self.w.emit(f"sw {sc}, {off}($fp)")
 
-                # Literal NUMÉRICO
+                # Literal NUMÉRICO (null/false -> 0, true -> 1)
                 else:
+                    value = SYM_VALUES[a1] if k1 == K_SYM else a1
                     rd, off, sc = self._dest_reg_or_spill(dst)
                     if rd:
-                        self.w.emit(f"li {rd}, {a1}")
+                        self.w.emit(f"li {rd}, {value}")
                     else:
-                        self.w.emit(f"li {sc}, {a1}")
+                        self.w.emit(f"li {sc}, {value}")
                         self.w.emit(f"sw {sc}, {off}($fp)")
             else:
                 # dst := var/temporal
                 rs = self._read_into_reg(a1)
                 rd, off, sc = self._dest_reg_or_spill(dst)
                 if rd:
-                    self.w.emit(f"move {rd}, {rs}")
+                    # move coalescido por el asignador: mismo registro, nada que emitir
+                    if rd != rs:
+                        self.w.emit(f"move {rd}, {rs}")
                 else:
                     self.w.emit(f"sw {rs}, {off}($fp)")
 
@@ -170,8 +368,15 @@ class InstructionSelector:
         # LOAD
         if op == "load":
             # Caso 1: dirección explícita [fp+N] (Addr(fp, k) -> "[fp+k]")
-            if isinstance(a1, str) and a1.startswith("["):
-                base, byte_off = self._mem_addr(a1)
+            if q.get("from_reg"):
+                # arg que sigue en $aN (MIPSGenerator._home_register_args): sin home
+                rd, off, sc = self._dest_reg_or_spill(dst)
+                out = rd if rd is not None else sc
+                self.w.emit(f"move {out}, {q['from_reg']}")
+                if off is not None:
+                    self.w.emit(f"sw {out}, {off}($fp)")
+            elif k1 == K_ADDR:
+                base, byte_off = m1
                 rd, off, sc = self._dest_reg_or_spill(dst)
                 out = rd if rd is not None else sc
                 # cargar desde [base+off] al registro 'out'
@@ -195,8 +400,8 @@ class InstructionSelector:
         # STORE
         if op == "store":
             # store src, [fp+N]  → acceso directo al frame
-            if isinstance(a2, str) and a2.startswith("["):
-                base, byte_off = self._mem_addr(a2)
+            if k2 == K_ADDR:
+                base, byte_off = m2
                 rs = self._read_into_reg(a1)
                 self.w.emit(f"sw {rs}, {byte_off}(${base})")
                 self.ra.free_if_dead(a1, pc)
@@ -204,8 +409,8 @@ class InstructionSelector:
                 return
             else:
                 # store src, ptr  → *ptr = src
-                rs   = self._read_into_reg(a1)   # valor a escribir
-                rptr = self._read_into_reg(a2)   # puntero donde escribir
+                rs   = self._read_into_reg(a1)           # valor a escribir
+                rptr = self._read_into_reg(a2, "$t8")    # puntero donde escribir
                 
                 # DEBUG: chequear alineación SIN tocar rptr
                 #self.w.emit(f"andi $at, {rptr}, 3")
@@ -222,19 +427,11 @@ class InstructionSelector:
 
             # --- CASO ESPECIAL: concatenación "string" + int usada para prints ---
             if op == "+":
-                is_str1 = (
-                    a1 is not None
-                    and isinstance(a1, str)
-                    and a1.startswith('"') and a1.endswith('"')
-                )
-                is_str2 = (
-                    a2 is not None
-                    and isinstance(a2, str)
-                    and a2.startswith('"') and a2.endswith('"')
-                )
+                is_str1 = (k1 == K_STR)
+                is_str2 = (k2 == K_STR)
 
                 # Patrón: uno es string literal y el otro NO es constante (ej. "r1=" + r1)
-                if (is_str1 and not self._is_const(a2)) or (is_str2 and not self._is_const(a1)):
+                if (is_str1 and k2 not in CONST_KINDS) or (is_str2 and k1 not in CONST_KINDS):
                     # Determinar cuál es el prefijo string y cuál es el valor numérico
                     if is_str1:
                         prefix = a1
@@ -250,7 +447,7 @@ class InstructionSelector:
                     # Semántica "pragmática": dst solo almacena el valor numérico,
                     # y el prefijo se imprimirá en 'print dst'
                     rs = self._read_into_reg(value_name, "$t7")
-                    rd, off, sc = self._dest_reg_or_spill(dst, "$t5")
+                    rd, off, sc = self._dest_reg_or_spill(dst, "$t9")
                     out = rd if rd is not None else sc
                     self.w.emit(f"move {out}, {rs}")
                     if off is not None:
@@ -260,11 +457,19 @@ class InstructionSelector:
                     return
 
             # --- CASO NORMAL: aritmética entera pura ---
-            rs = self._read_into_reg(a1, "$t7")
-            rt = self._read_into_reg(a2, "$t6")
-            rd, off, sc = self._dest_reg_or_spill(dst, "$t5")
+            c1, c2 = self._int_value(a1, k1), self._int_value(a2, k2)
+            if op in ("+", "*") and c1 is not None and c2 is None:
+                # conmutativa: la constante pasa a la derecha (inmediato)
+                a1, a2, k1, k2, c2 = a2, a1, k2, k1, c1
+            rs = self._reg_or_li(a1, k1, "$t7")
+            imm = self._arith_imm(op, c2)
+            reduced = not imm and self._strength_ok(op, c2)
+            rt = None if imm or reduced else self._reg_or_li(a2, k2, "$t8")
+            rd, off, sc = self._dest_reg_or_spill(dst, "$t9")
             out = rd if rd is not None else sc
-            if op == "+":   self.w.emit(f"addu {out}, {rs}, {rt}")
+            if imm:         self.w.emit(f"{imm[0]} {out}, {rs}, {imm[1]}")
+            elif reduced:   self._emit_by_const(op, out, rs, c2)
+            elif op == "+": self.w.emit(f"addu {out}, {rs}, {rt}")
             elif op == "-": self.w.emit(f"subu {out}, {rs}, {rt}")
             elif op == "*": self.w.emit(f"mul {out}, {rs}, {rt}")
             elif op == "/":
@@ -281,11 +486,38 @@ class InstructionSelector:
 
         # RELACIONALES básicos
         if op in {"<", "<=", ">", ">=", "==", "!="}:
-            rs = self._read_into_reg(a1, "$t7")
-            rt = self._read_into_reg(a2, "$t6")
-            rd, off, sc = self._dest_reg_or_spill(dst, "$t5")
+            c1, c2 = self._int_value(a1, k1), self._int_value(a2, k2)
+            if c1 is not None and c2 is None:
+                # constante a la derecha: 3 < x  ==  x > 3
+                a1, a2, k1, k2, c2, op = a2, a1, k2, k1, c1, SWAPPED_REL[op]
+            rs = self._reg_or_li(a1, k1, "$t7")
+            imm = self._rel_imm_ok(op, c2)
+            rt = None if imm else self._reg_or_li(a2, k2, "$t8")
+            rd, off, sc = self._dest_reg_or_spill(dst, "$t9")
             out = rd if rd is not None else sc
-            if op == "<":
+            if imm and op in ("<", ">="):
+                self.w.emit(f"slti {out}, {rs}, {c2}")
+                if op == ">=":
+                    self.w.emit(f"xori {out}, {out}, 1")
+            elif imm and op in ("<=", ">"):
+                # x <= c  <=>  x < c+1
+                self.w.emit(f"slti {out}, {rs}, {c2 + 1}")
+                if op == ">":
+                    self.w.emit(f"xori {out}, {out}, 1")
+            elif imm:
+                # == / != contra c: diferencia (xori o addiu -c) y comparar con 0
+                diff = rs
+                if c2 != 0:
+                    diff = out
+                    if fits_uimm16(c2):
+                        self.w.emit(f"xori {out}, {rs}, {c2}")
+                    else:
+                        self.w.emit(f"addiu {out}, {rs}, {-c2}")
+                if op == "==":
+                    self.w.emit(f"sltiu {out}, {diff}, 1")
+                else:
+                    self.w.emit(f"sltu {out}, $zero, {diff}")
+            elif op == "<":
                 self.w.emit(f"slt {out}, {rs}, {rt}")
             elif op == "<=":
                 # rs <= rt  <=>  !(rs > rt)
@@ -310,10 +542,15 @@ class InstructionSelector:
 
         # RETURN
         if op == "ret":
-            if a1 and a1 not in ("null",):
+            if k1 == K_INT or (k1 == K_SYM and a1 != "null"):
+                value = SYM_VALUES[a1] if k1 == K_SYM else a1
+                self.w.emit(f"li $v0, {value}")
+            elif a1 and a1 not in ("null",):
                 rs = self._read_into_reg(a1)
                 self.w.emit(f"move $v0, {rs}")
                 self.ra.free_if_dead(a1, pc)
+            # salir por el epílogo (MIPSGenerator quita el salto si es el último quad)
+            self.w.emit(f"j {self.frame.exit_label}")
             return
 
         # PARAM/CALL
@@ -328,15 +565,20 @@ class InstructionSelector:
             # 0) Número de parámetros acumulados
             param_count = len(self.pending_params)
 
-            # 1) Empujar parámetros en orden inverso
-            #    IR: param p1, param p2, call f
-            #    En stack (de arriba hacia abajo): p1, p2
-            for pname in reversed(self.pending_params):
-                # En tu IR los params deberían ser temporales/vars, no literales.
-                # Así que podemos leerlos normal:
-                rs = self._read_into_reg(pname, "$t7")
-                self.w.emit("addi $sp, $sp, -4")
-                self.w.emit(f"sw {rs}, 0($sp)")
+            # 1) Un solo ajuste de $sp para los n args (los 4 primeros son home
+            #    de $a0..$a3; el callee los escribe solo si los usa).
+            #    IR: param p1, param p2, call f  ->  p1 en $a0 / 0($sp), p2 en $a1 / 4($sp)
+            if param_count > 0:
+                self.w.emit(f"addiu $sp, $sp, -{param_count*4}")
+            for i, pname in enumerate(self.pending_params):
+                if i < len(ARG_REGS):
+                    self._read_into(pname, ARG_REGS[i])
+                elif self._is_const(pname):
+                    self._read_into(pname, "$t7")
+                    self.w.emit(f"sw $t7, {i*4}($sp)")
+                else:
+                    rs = self._read_into_reg(pname, "$t7")
+                    self.w.emit(f"sw {rs}, {i*4}($sp)")
                 # Liberar aquí según liveness
                 self.ra.free_if_dead(pname, pc)
 
@@ -344,7 +586,7 @@ class InstructionSelector:
             self.pending_params.clear()
 
             # 2) caller-saved: pedir a RA qué $t* guardar
-            saves = self.ra.on_call()
+            saves = self.ra.on_call(pc)
             for reg, off in saves:
                 self.w.emit(f"sw {reg}, {off}($fp)")
 
@@ -363,10 +605,13 @@ class InstructionSelector:
             # 4) llamar
             self.w.emit(f"jal {fname}")
 
-            # 5) limpiar args apilados
-            n = int(a2) if a2 and a2.isdigit() else param_count
-            if n > 0:
-                self.w.emit(f"addi $sp, $sp, {n*4}")
+            # 5) liberar el área de args reservada en (1)
+            if param_count > 0:
+                self.w.emit(f"addiu $sp, $sp, {param_count*4}")
+
+            # 5b) recargar los $t* que el asignador guardó en (2)
+            for reg, off in self.ra.after_call():
+                self.w.emit(f"lw {reg}, {off}($fp)")
 
             # 6) recoger retorno
             if dst:
@@ -383,7 +628,7 @@ class InstructionSelector:
             # dst = base + offset * 4
             offset = int(a2) * 4
             rb = self._read_into_reg(a1, "$t7")
-            rd, off, sc = self._dest_reg_or_spill(dst, "$t6")
+            rd, off, sc = self._dest_reg_or_spill(dst, "$t8")
             out = rd if rd is not None else sc
             self.w.emit(f"addi {out}, {rb}, {offset}")
             if off is not None: self.w.emit(f"sw {out}, {off}($fp)")
@@ -393,14 +638,22 @@ class InstructionSelector:
         if op == "addr_index":
             # dst = base + (i << 2)
             rb = self._read_into_reg(a1, "$t7")  
-            ri = self._read_into_reg(a2, "$t6")
-            rd, off, sc = self._dest_reg_or_spill(dst, "$t5")
-            out = rd if rd is not None else sc
+            ci = self._int_value(a2, k2)
+            if ci is not None and fits_simm16(ci * 4):
+                # índice constante: el desplazamiento va como inmediato
+                rd, off, sc = self._dest_reg_or_spill(dst, "$t9")
+                out = rd if rd is not None else sc
+                self.w.emit(f"addiu {out}, {rb}, {ci * 4}")
+            else:
+                ri = self._reg_or_li(a2, k2, "$t8")
+                rd, off, sc = self._dest_reg_or_spill(dst, "$t9")
+                out = rd if rd is not None else sc
 
-            # out = i << 2
-            self.w.emit(f"sll {out}, {ri}, 2")
-            # out = base + (i << 2)
-            self.w.emit(f"addu {out}, {rb}, {out}")
+                # $t9 = i << 2  (scratch: 'out' puede compartir registro con rb);
+                # con '* i, 2^k' fusionado, i << (k + 2)
+                self.w.emit(f"sll $t9, {ri}, {q.get('scale', 2)}")
+                # out = base + (i << 2)
+                self.w.emit(f"addu {out}, {rb}, $t9")
 
             if off is not None:
                 self.w.emit(f"sw {out}, {off}($fp)")
@@ -421,11 +674,11 @@ class InstructionSelector:
                 self.w.emit("li $a0, 4")
 
             # Caso 1: literal numérico (ej. "16")
-            elif size_expr.lstrip("-").isdigit():
+            elif k1 == K_INT:
                 self.w.emit(f"li $a0, {size_expr}")
 
             # Caso 2: literal de cadena (ej. "Box") -> tipo/clase
-            elif size_expr.startswith('"') and size_expr.endswith('"'):
+            elif k1 == K_STR:
                 type_name = size_expr.strip('"')
                 # Para este proyecto: Box tiene 1 campo int -> 4 bytes
                 # Si luego tienes más clases, aquí haces un map nombre->tamaño
@@ -440,7 +693,7 @@ class InstructionSelector:
             self.w.emit("li $v0, 9")
             self.w.emit("syscall")
 
-            rd, off, sc = self._dest_reg_or_spill(dst, "$t6")
+            rd, off, sc = self._dest_reg_or_spill(dst, "$t8")
             if rd:
                 self.w.emit(f"move {rd}, $v0")
             else:
@@ -450,7 +703,7 @@ class InstructionSelector:
 
         if op == "alloc_array":
             # a1 = n (longitud del arreglo)
-            if self._is_const(a1) and not (a1.startswith('"') and a1.endswith('"')):
+            if k1 == K_INT:
                 # Longitud constante: li a un scratch y luego *4
                 self.w.emit(f"li $t7, {a1}")
                 self.w.emit("sll $a0, $t7, 2")   # bytes = n * 4
@@ -462,7 +715,7 @@ class InstructionSelector:
             self.w.emit("li $v0, 9")
             self.w.emit("syscall")
 
-            rd, off, sc = self._dest_reg_or_spill(dst, "$t6")
+            rd, off, sc = self._dest_reg_or_spill(dst, "$t8")
             if rd:
                 self.w.emit(f"move {rd}, $v0")
             else:
@@ -477,11 +730,7 @@ class InstructionSelector:
                 prefix = self.concat_prefix[a1]
 
                 # 1) imprimir el prefijo (string literal)
-                label = f"_str_{hash(prefix) & 0xFFFF:X}"
-                self.w.data()
-                self.w.label(label)
-                self.w.emit(f".asciiz {prefix}")
-                self.w.text()
+                label = self.strings.intern(prefix)
                 self.w.emit(f"la $a0, {label}")
                 self.w.emit("li $v0, 4")
                 self.w.emit("syscall")
@@ -496,16 +745,10 @@ class InstructionSelector:
                 return
 
             # --- CASO NORMAL ---
-            if self._is_const(a1):
+            if k1 in CONST_KINDS:
                 # Literal de cadena
-                if a1.startswith('"') and a1.endswith('"'):
-                    label = f"_str_{hash(a1) & 0xFFFF:X}"
-                    # Definimos el string en .data
-                    self.w.data()
-                    self.w.label(label)
-                    self.w.emit(f".asciiz {a1}")
-                    # Volvemos a .text y lo imprimimos como string
-                    self.w.text()
+                if k1 == K_STR:
+                    label = self.strings.intern(a1)
                     self.w.emit(f"la $a0, {label}")
                     self.w.emit("li $v0, 4")   # print string
                 else:
@@ -0,0 +1,256 @@
+# program/codegen/mips/linear_scan.py
+#
+# Asignador de registros linear-scan (Poletto & Sarkar, 1999).
+#
+# - Cada variable de la función tiene UN intervalo vivo [start, end] sobre el
+#   orden lineal de los quads: desde el primer punto donde se define, usa o
+#   está viva, hasta el último. Es conservador (cubre los huecos), y por eso es
+#   correcto aunque haya saltos: el valor nunca cambia de lugar.
+# - Los intervalos se recorren por start creciente. Los que terminaron antes
+#   del actual liberan su registro (reuso en cuanto el valor muere).
+# - Si no hay registro libre, se derrama el intervalo que termina más lejos
+#   (el actual o uno activo) y ese intervalo vive COMPLETO en un slot del frame.
+#
+# Los slots de spill también se reparten por interferencia: intervalos derramados
+# que no se solapan (y los saves de $t* alrededor de cada jal) comparten slot
+# (Frame.share_spill_slots).
+#
+# La asignación se decide entera en attach_liveness(), antes de emitir código;
+# get_reg() solo consulta la ubicación fija de cada variable, con la misma API
+# que RegAllocator: (reg, None, None) si está en registro, (None, off, None) si
+# vive en memoria (el selector carga/almacena vía scratch).
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .reg_alloc import ALLOC_T_REGS, S_REGS, USE_S_REGS
+
+
+@dataclass
+class Interval:
+    name: str
+    start: int
+    end: int
+    reg: Optional[str] = None
+    slot: Optional[int] = None
+    crosses_call: bool = False
+
+
+def call_crossing_bits(liveness) -> int:
+    """
+    Bitset de variables vivas a través de algún 'call' (vivas después del jal
+    y no definidas por la propia llamada): candidatas naturales a $s*.
+    """
+    bits = 0
+    for i, q in enumerate(liveness.quads):
+        if q["op"] == "call":
+            bits |= liveness.out_bits(i) & ~liveness.def_bits[i]
+    return bits
+
+
+def build_intervals(liveness) -> List[Interval]:
+    """
+    Intervalos a partir de un Liveness (liveness.py): la instrucción i cuenta
+    para v si v se usa o define en i, o si está viva después de i.
+    Orden: por start, luego end, luego numeración de la variable (determinista).
+    """
+    names = liveness.var_names
+    start: Dict[int, int] = {}
+    end: Dict[int, int] = {}
+    for i in range(len(liveness)):
+        bits = liveness.use_bits[i] | liveness.def_bits[i] | liveness.out_bits(i)
+        while bits:
+            low = bits & -bits
+            v = low.bit_length() - 1
+            bits ^= low
+            if v not in start:
+                start[v] = i
+            end[v] = i
+    order = sorted(start, key=lambda v: (start[v], end[v], v))
+    return [Interval(names[v], start[v], end[v]) for v in order]
+
+
+class LinearScanAllocator:
+    """
+    Misma API que RegAllocator (attach_frame, attach_liveness, get_reg,
+    mark_loaded, free_if_dead, on_call, stats) más after_call():
+      - on_call(pc)   -> [(reg, off)] a guardar antes del jal: solo los
+                         registros de valores vivos DESPUÉS de la llamada
+      - after_call()  -> los mismos (reg, off), para recargarlos tras el jal
+    """
+
+    # nombre que se reporta en stats()
+    name = "linear"
+
+    def __init__(self, liveness=None):
+        self.frame = None
+        self.liveness = liveness
+        self.loc: Dict[str, Interval] = {}
+        self.intervals: List[Interval] = []
+        self.used_s = set()
+        self._call_saves: Dict[int, List[Tuple[str, int]]] = {}
+        self._restores: List[Tuple[str, int]] = []
+
+    # ------- ciclo de vida por función -------
+
+    def attach_frame(self, frame):
+        self.frame = frame
+        self.loc.clear()
+        self.intervals = []
+        self.used_s = set()
+        self._call_saves = {}
+        self._restores = []
+
+    def attach_liveness(self, liveness):
+        self.liveness = liveness
+        self.intervals = build_intervals(liveness) if liveness is not None else []
+        if liveness is not None:
+            crossing = call_crossing_bits(liveness)
+            for iv in self.intervals:
+                iv.crosses_call = bool(crossing >> liveness.var_index[iv.name] & 1)
+        self._allocate()
+        self._assign_spill_slots()
+
+    def _pool(self, crosses_call: bool = False) -> List[str]:
+        """
+        Orden de preferencia: los valores vivos a través de llamadas van primero
+        a $s* (sin sw/lw en cada jal); el resto a $t* (sin costo en el prólogo).
+        """
+        s_regs = S_REGS if USE_S_REGS else []
+        if crosses_call:
+            return s_regs + ALLOC_T_REGS
+        return ALLOC_T_REGS + s_regs
+
+    def _allocate(self) -> None:
+        free = list(self._pool())
+        active: List[Interval] = []          # ordenados por end creciente
+
+        for cur in self.intervals:
+            # expirar intervalos que terminaron antes de 'cur'
+            while active and active[0].end < cur.start:
+                done = active.pop(0)
+                free.append(done.reg)
+
+            if free:
+                pref = self._pool(cur.crosses_call)
+                cur.reg = min(free, key=pref.index)
+                free.remove(cur.reg)
+            else:
+                victim = active[-1]
+                if victim.end > cur.end:
+                    # el activo que termina más lejos cede su registro
+                    # (el slot se decide después, en _assign_spill_slots)
+                    cur.reg, victim.reg = victim.reg, None
+                    active.pop()
+                else:
+                    self.loc[cur.name] = cur
+                    continue
+
+            if cur.reg in S_REGS:
+                self.used_s.add(cur.reg)
+            self.loc[cur.name] = cur
+            k = len(active)
+            while k > 0 and active[k - 1].end > cur.end:
+                k -= 1
+            active.insert(k, cur)
+
+    # ------- slots de spill y de saves -------
+
+    def _call_save_regs(self, pc: int) -> List[str]:
+        """
+        $t* a guardar alrededor del 'call' en pc: los de valores vivos después
+        de la llamada (no el destino de la propia llamada, que se define aquí).
+        """
+        regs: List[str] = []
+        defined_here = self.liveness.def_bits[pc]
+        for name in sorted(self.liveness[pc]):
+            iv = self.loc.get(name)
+            if iv is None or iv.reg is None:
+                continue
+            if defined_here >> self.liveness.var_index[name] & 1:
+                continue
+            if iv.reg in self.callee_saved() or iv.reg in regs:
+                continue
+            regs.append(iv.reg)
+        return regs
+
+    def _spill_units(self) -> List[List[Interval]]:
+        """Grupos que comparten ubicación; aquí cada intervalo derramado es uno."""
+        return [[iv] for iv in self.intervals if iv.reg is None]
+
+    def _units_interfere(self, a: List[Interval], b: List[Interval]) -> bool:
+        return any(x.start <= y.end and y.start <= x.end for x in a for y in b)
+
+    def _assign_spill_slots(self) -> None:
+        """
+        Un slot por grupo derramado y por (call, $t* a guardar), compartidos
+        entre los que no se solapan. Los saves de un jal viven solo en ese pc.
+        """
+        saves: List[Tuple[int, str]] = []
+        if self.liveness is not None:
+            for pc, q in enumerate(self.liveness.quads):
+                if q["op"] == "call":
+                    saves += [(pc, reg) for reg in self._call_save_regs(pc)]
+        save_units = [[Interval(f"{reg}@{pc}", pc, pc)] for pc, reg in saves]
+
+        units = self._spill_units() + save_units
+        units.sort(key=lambda u: min(iv.start for iv in u))
+        for unit, off in zip(units, self.frame.share_spill_slots(units, self._units_interfere)):
+            for iv in unit:
+                iv.slot = off
+        for (pc, reg), (iv,) in zip(saves, save_units):
+            self._call_saves.setdefault(pc, []).append((reg, iv.slot))
+
+    # ------- API principal -------
+
+    def get_reg(
+        self,
+        name: str,
+        across_call: bool = False
+    ) -> Tuple[Optional[str], Optional[int], Optional[Tuple[str, int]]]:
+        iv = self.loc.get(name)
+        if iv is None:
+            # Nombre sin intervalo (no debería pasar con la IR actual): a memoria
+            iv = Interval(name, -1, -1, slot=self.frame.alloc_spill())
+            self.loc[name] = iv
+        if iv.reg is not None:
+            return iv.reg, None, None
+        return None, iv.slot, None
+
+    def mark_loaded(self, name: str):
+        # Las ubicaciones son fijas: nunca hay cargas pendientes.
+        return
+
+    def free_if_dead(self, name: str, pc: Optional[int] = None):
+        # El reuso de registros ya está resuelto por los intervalos.
+        return
+
+    def on_call(self, pc: Optional[int] = None):
+        """
+        Caller-saved: los $t* de valores vivos después de la llamada, con los
+        slots ya repartidos en _assign_spill_slots.
+        """
+        saves = list(self._call_saves.get(pc, [])) if pc is not None else []
+        self._restores = saves
+        return saves
+
+    def after_call(self):
+        restores, self._restores = self._restores, []
+        return restores
+
+    def callee_saved(self):
+        """Registros que el callee preserva (el caller no los guarda en on_call)."""
+        return S_REGS
+
+    def stats(self) -> Dict[str, object]:
+        """Resumen de la función actual (MIPSGenerator.regalloc_stats)."""
+        spilled = [iv for iv in self.loc.values() if iv.reg is None]
+        regs = {iv.reg for iv in self.loc.values() if iv.reg is not None}
+        return {
+            "function": self.frame.func_name if self.frame else None,
+            "regalloc": self.name,
+            "values": len(self.loc),
+            "regs_used": len(regs),
+            "spills": len(spilled),
+            "moves_coalesced": 0,
+        }
@@ -0,0 +1,162 @@
+# program/codegen/mips/liveness.py
+#
+# Liveness por bloques básicos con bitsets.
+#
+# - Las variables de la función se numeran densamente (0..n-1) y cada conjunto
+#   (use/def por instrucción, gen/kill/in/out por bloque) es un int de Python
+#   usado como bitset: uniones y diferencias son O(palabras), no O(elementos).
+# - El punto fijo se calcula a nivel de BLOQUE con un worklist. Como el problema
+#   es hacia atrás, el worklist arranca en orden reverse-postorder del CFG
+#   invertido (postorden del CFG desde la entrada), de modo que casi siempre se
+#   procesa un bloque después de sus sucesores.
+# - El live-out por instrucción no se materializa: se deriva bajo demanda
+#   recorriendo el bloque hacia atrás desde su live-out (y se cachea por bloque).
+#
+# El resultado es el mismo que el análisis clásico por instrucción: mismo CFG
+# (goto a label conocido, ifgoto = label + caída, ret sin sucesores) y mismo
+# mínimo punto fijo. Los bloques los parte program/ir/cfg.split_blocks, el
+# mismo núcleo que usa el CFG de los passes sobre TAC.
+
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from program.ir.cfg import postorder, split_blocks
+
+
+def bits_to_names(bits: int, names: List[str]) -> Set[str]:
+    out: Set[str] = set()
+    while bits:
+        low = bits & -bits
+        out.add(names[low.bit_length() - 1])
+        bits ^= low
+    return out
+
+
+class Liveness:
+    """
+    Se comporta como la lista live_out[i] del análisis anterior:
+      - len(liv), liv[i] -> set de variables vivas DESPUÉS de la instrucción i
+    y además expone la vista por bloques (blocks, succ, pred, live_in/live_out
+    como bitsets) y la numeración de variables (var_index / var_names).
+    """
+
+    def __init__(self, quads: List[dict], defs_uses: Callable[[dict], Tuple[Set[str], Set[str]]]):
+        self.quads = quads
+        self.n = len(quads)
+
+        # ---- numeración densa de variables y use/def por instrucción ----
+        self.var_index: Dict[str, int] = {}
+        self.var_names: List[str] = []
+        self.use_bits: List[int] = []
+        self.def_bits: List[int] = []
+        for q in quads:
+            defs, uses = defs_uses(q)
+            self.def_bits.append(self._bits_of(defs))
+            self.use_bits.append(self._bits_of(uses))
+
+        self._build_blocks()
+        self._solve()
+
+        # cache: bloque -> [live_out bits de cada instrucción del bloque]
+        self._instr_out: Dict[int, List[int]] = {}
+
+    # ---------- helpers ----------
+    def _bits_of(self, names: Set[str]) -> int:
+        b = 0
+        for name in names:
+            idx = self.var_index.get(name)
+            if idx is None:
+                idx = len(self.var_names)
+                self.var_index[name] = idx
+                self.var_names.append(name)
+            b |= 1 << idx
+        return b
+
+    # ---------- bloques básicos y CFG ----------
+    def _build_blocks(self) -> None:
+        quads = self.quads
+        branch_kind = {"goto": "goto", "ifgoto": "if", "if_goto": "if", "branch": "if", "ret": "ret"}
+
+        def label_at(i: int) -> Optional[str]:
+            return quads[i]["label"] if quads[i]["op"] == "label" else None
+
+        def branch_at(i: int) -> Tuple[Optional[str], Optional[str]]:
+            q = quads[i]
+            kind = branch_kind.get(q["op"])
+            # goto L lleva el label en a1; ifgoto c, L en a2; branch (rel fusionado) en target
+            if kind == "goto":
+                return kind, q["a1"]
+            if kind == "if":
+                return kind, q["target"] if q["op"] == "branch" else q["a2"]
+            return kind, None
+
+        self.blocks, self.block_of, self.succ, self.pred = split_blocks(self.n, label_at, branch_at)
+
+    def postorder(self) -> List[int]:
+        """Postorden del CFG desde el bloque 0; los bloques inalcanzables van al final."""
+        return postorder(self.succ)
+
+    # ---------- punto fijo por bloques ----------
+    def _solve(self) -> None:
+        nb = len(self.blocks)
+        self.gen: List[int] = [0] * nb
+        self.kill: List[int] = [0] * nb
+        for b, (start, end) in enumerate(self.blocks):
+            gen = kill = 0
+            for i in range(end - 1, start - 1, -1):
+                d = self.def_bits[i]
+                gen = self.use_bits[i] | (gen & ~d)
+                kill |= d
+            self.gen[b], self.kill[b] = gen, kill
+
+        self.live_in: List[int] = [0] * nb
+        self.live_out: List[int] = [0] * nb
+
+        work = deque(self.postorder())
+        queued = [True] * nb
+        while work:
+            b = work.popleft()
+            queued[b] = False
+            out = 0
+            for s in self.succ[b]:
+                out |= self.live_in[s]
+            self.live_out[b] = out
+            new_in = self.gen[b] | (out & ~self.kill[b])
+            if new_in != self.live_in[b]:
+                self.live_in[b] = new_in
+                for p in self.pred[b]:
+                    if not queued[p]:
+                        queued[p] = True
+                        work.append(p)
+
+    # ---------- vista por instrucción (bajo demanda) ----------
+    def out_bits(self, i: int) -> int:
+        b = self.block_of[i]
+        outs = self._instr_out.get(b)
+        if outs is None:
+            start, end = self.blocks[b]
+            outs = [0] * (end - start)
+            live = self.live_out[b]
+            for j in range(end - 1, start - 1, -1):
+                outs[j - start] = live
+                live = self.use_bits[j] | (live & ~self.def_bits[j])
+            self._instr_out[b] = outs
+        return outs[i - self.blocks[b][0]]
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, i: int) -> Set[str]:
+        if i < 0:
+            i += self.n
+        if not 0 <= i < self.n:
+            raise IndexError(i)
+        return bits_to_names(self.out_bits(i), self.var_names)
+
+    def __iter__(self) -> Iterator[Set[str]]:
+        for i in range(self.n):
+            yield self[i]
+
+    def is_live_after(self, name: str, i: int) -> bool:
+        idx: Optional[int] = self.var_index.get(name)
+        return idx is not None and bool(self.out_bits(i) >> idx & 1)
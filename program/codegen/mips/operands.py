@@ -0,0 +1,99 @@
+# program/codegen/mips/operands.py
+#
+# Clasificación de operandos de la IR para el backend MIPS.
+#
+# Cada quad normalizado lleva, además de sus operandos como texto (a1, a2, dst),
+# el "tipo" precalculado de cada uno (k1, k2, kd) y, para direcciones de frame,
+# el par (base, offset_en_bytes) ya resuelto (m1, m2). Así el resto del backend
+# no vuelve a parsear strings con isdigit()/startswith('"')/split('+') en cada
+# instrucción.
+
+from typing import Any, Optional, Tuple
+
+from program.ir.tac_ir import Const, Var, Temp, Addr, Label
+
+# Tipos de operando
+K_INT = "int"       # constante entera:           5, -3
+K_STR = "str"       # literal de cadena:          "Hola"
+K_SYM = "sym"       # constante simbólica:        null, true, false
+K_VAR = "var"       # variable con nombre:        x, C, this
+K_TEMP = "temp"     # temporal de la IR:          t0, t1
+K_ADDR = "addr"     # dirección de frame:         [fp+2], [fp-1]
+K_LABEL = "label"   # etiqueta / nombre de función
+
+VAR_KINDS = (K_VAR, K_TEMP)
+CONST_KINDS = (K_INT, K_STR)
+
+SYM_VALUES = {"null": 0, "false": 0, "true": 1}
+
+
+def frame_addr_bytes(base: str, offset_words: int) -> Tuple[str, int]:
+    """
+    Traduce una dirección TAC [base+k] (k en palabras) a (base, offset en bytes).
+    Para base == fp y k >= 0 (zona de parámetros) se suman 4 bytes, porque en
+    el frame real arg0 está en 12($fp) y no en 8($fp): [fp+2] -> 12($fp).
+    """
+    byte_off = offset_words * 4
+    if base == "fp" and offset_words >= 0:
+        byte_off += 4
+    return base, byte_off
+
+
+def parse_addr_text(bracketed: str) -> Tuple[str, int]:
+    """'[fp+2]' -> ('fp', 12); '[fp-1]' -> ('fp', -4)."""
+    inside = bracketed[1:-1].strip()
+    if "+" in inside:
+        base, off = inside.split("+", 1)
+        return frame_addr_bytes(base.strip(), int(off.strip()))
+    if "-" in inside:
+        base, off = inside.split("-", 1)
+        return frame_addr_bytes(base.strip(), -int(off.strip()))
+    # sin desplazamiento: [base]
+    return inside, 0
+
+
+def classify_text(s: Optional[str]) -> Optional[str]:
+    """Tipo de un operando que solo conocemos como texto (IR ajena / fallback)."""
+    if s is None:
+        return None
+    s = s.strip()
+    if not s:
+        return None
+    if s.lstrip("-").isdigit():
+        return K_INT
+    if s.startswith('"') and s.endswith('"'):
+        return K_STR
+    if s.startswith("[") and s.endswith("]"):
+        return K_ADDR
+    if s in SYM_VALUES:
+        return K_SYM
+    return K_VAR
+
+
+def typed_operand(x: Any):
+    """
+    Operando de tac_ir -> (texto, tipo, (base, bytes)|None).
+    El texto es el mismo que produce str(x), para que el resto del backend
+    (nombres en el RegAllocator, etiquetas, .asciiz) no cambie.
+    """
+    if x is None:
+        return None, None, None
+    if isinstance(x, Const):
+        v = x.value
+        if v is None or isinstance(v, bool):
+            return repr(x), K_SYM, None
+        if isinstance(v, str):
+            return repr(x), K_STR, None
+        return repr(x), K_INT, None
+    if isinstance(x, Temp):
+        return x.name, K_TEMP, None
+    if isinstance(x, Var):
+        return x.name, K_VAR, None
+    if isinstance(x, Label):
+        return x.name, K_LABEL, None
+    if isinstance(x, Addr):
+        return repr(x), K_ADDR, frame_addr_bytes(str(x.base), x.offset)
+    # Cualquier otra cosa: decidir por el texto
+    txt = str(x)
+    kind = classify_text(txt)
+    return txt, kind, (parse_addr_text(txt) if kind == K_ADDR else None)
@@ -0,0 +1,180 @@
+# program/codegen/mips/peephole.py
+#
+# Peephole sobre la salida del AsmWriter (MIPSGenerator.generate, al final).
+#
+# Cada línea se parsea a un AsmRecord (label, directiva, instrucción con su
+# mnemónico y operandos, comentario o línea vacía) y las reglas miran una
+# ventana de dos instrucciones consecutivas; los comentarios y las líneas
+# vacías no cortan la ventana, los labels y las directivas sí. Se repite hasta
+# que ninguna regla cambia nada. Reglas (nombre -> instrucciones quitadas):
+#
+#   self_move     move $x, $x
+#   move_back     move $x, $y ; move $y, $x            -> el segundo sobra
+#   store_load    sw $r, off($b) ; lw $r, off($b)      -> el lw sobra
+#   sp_adjust     addiu $sp,$sp,a ; addiu $sp,$sp,b    -> uno solo (o ninguno)
+#   jump_to_next  j L / bxx ..., L seguido de L:
+#   unreachable   instrucciones entre un j/b y el siguiente label
+#   section       .text/.data cuando ya se está en esa sección
+#
+# Las líneas que no cambian se emiten tal cual venían.
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+BRANCH_MNEMONICS = {"b", "beq", "bne", "blt", "ble", "bgt", "bge",
+                    "beqz", "bnez", "bltz", "blez", "bgtz", "bgez"}
+SECTIONS = (".text", ".data")
+RULES = ("self_move", "move_back", "store_load", "sp_adjust",
+         "jump_to_next", "unreachable", "section")
+
+
+@dataclass
+class AsmRecord:
+    kind: str                      # "instr" | "label" | "directive" | "comment" | "blank"
+    op: str = ""                   # mnemónico, directiva o nombre del label
+    args: Tuple[str, ...] = ()
+    comment: str = ""
+    text: Optional[str] = None     # línea original; None si el record se reescribió
+
+    def render(self) -> str:
+        if self.text is not None:
+            return self.text
+        line = f"  {self.op} {', '.join(self.args)}" if self.args else f"  {self.op}"
+        return f"{line}  # {self.comment}" if self.comment else line
+
+
+def parse_asm_line(line: str) -> AsmRecord:
+    s = line.strip()
+    if not s:
+        return AsmRecord("blank", text=line)
+    if s.startswith("#"):
+        return AsmRecord("comment", comment=s[1:].strip(), text=line)
+    if s.endswith(":") and " " not in s:
+        return AsmRecord("label", op=s[:-1], text=line)
+    if s.startswith("."):
+        # .asciiz "a, b # c" no se parte: el resto queda como un solo argumento
+        parts = s.split(None, 1)
+        return AsmRecord("directive", op=parts[0], args=tuple(parts[1:]), text=line)
+    comment = ""
+    if "#" in s:
+        s, comment = s.split("#", 1)
+        s, comment = s.strip(), comment.strip()
+    parts = s.split(None, 1)
+    args = tuple(a.strip() for a in parts[1].split(",")) if len(parts) > 1 else ()
+    return AsmRecord("instr", op=parts[0], args=args, comment=comment, text=line)
+
+
+def _is_sp_adjust(r: AsmRecord) -> bool:
+    return (r.op in ("addiu", "addi") and len(r.args) == 3
+            and r.args[0] == "$sp" and r.args[1] == "$sp" and r.args[2].lstrip("-").isdigit())
+
+
+def _jump_target(r: AsmRecord) -> Optional[str]:
+    if r.op == "j" and len(r.args) == 1:
+        return r.args[0]
+    if r.op in BRANCH_MNEMONICS and r.args:
+        return r.args[-1]
+    return None
+
+
+class Peephole:
+    """Aplica RULES hasta un punto fijo; removed[regla] = instrucciones quitadas."""
+
+    def __init__(self):
+        self.removed: Dict[str, int] = {name: 0 for name in RULES}
+
+    def run(self, lines: List[str]) -> List[str]:
+        recs = [parse_asm_line(ln) for ln in lines]
+        while self._window_pass(recs) | self._sections(recs):
+            pass
+        return [r.render() for r in recs]
+
+    def total_removed(self) -> int:
+        return sum(self.removed.values())
+
+    # -------- reglas --------
+    def _drop(self, recs: List[AsmRecord], i: int, rule: str) -> None:
+        del recs[i]
+        self.removed[rule] += 1
+
+    def _next_significant(self, recs: List[AsmRecord], i: int) -> int:
+        j = i + 1
+        while j < len(recs) and recs[j].kind in ("comment", "blank"):
+            j += 1
+        return j
+
+    def _labels_after(self, recs: List[AsmRecord], i: int) -> List[str]:
+        """Labels que siguen a recs[i] (antes de la próxima instrucción o directiva)."""
+        names = []
+        j = self._next_significant(recs, i)
+        while j < len(recs) and recs[j].kind == "label":
+            names.append(recs[j].op)
+            j = self._next_significant(recs, j)
+        return names
+
+    def _window_pass(self, recs: List[AsmRecord]) -> bool:
+        changed = False
+        i = 0
+        while i < len(recs):
+            r = recs[i]
+            if r.kind != "instr":
+                i += 1
+                continue
+            if r.op == "move" and len(r.args) == 2 and r.args[0] == r.args[1]:
+                self._drop(recs, i, "self_move")
+                changed = True
+                continue
+
+            target = _jump_target(r)
+            if target is not None and target in self._labels_after(recs, i):
+                self._drop(recs, i, "jump_to_next")
+                changed = True
+                continue
+
+            j = self._next_significant(recs, i)
+            nxt = recs[j] if j < len(recs) else None
+            if nxt is None or nxt.kind != "instr":
+                i += 1
+                continue
+
+            if r.op in ("j", "b"):
+                # lo que sigue sin label no se alcanza (los labels cortan antes)
+                self._drop(recs, j, "unreachable")
+                changed = True
+                continue
+            if (r.op == "move" and nxt.op == "move" and len(r.args) == 2
+                    and nxt.args == (r.args[1], r.args[0])):
+                self._drop(recs, j, "move_back")
+                changed = True
+                continue
+            if r.op == "sw" and nxt.op == "lw" and nxt.args == r.args:
+                self._drop(recs, j, "store_load")
+                changed = True
+                continue
+            if _is_sp_adjust(r) and _is_sp_adjust(nxt):
+                total = int(r.args[2]) + int(nxt.args[2])
+                self._drop(recs, j, "sp_adjust")
+                if total == 0:
+                    self._drop(recs, i, "sp_adjust")
+                else:
+                    recs[i] = AsmRecord("instr", op="addiu", args=("$sp", "$sp", str(total)),
+                                        comment=r.comment)
+                changed = True
+                continue
+            i += 1
+        return changed
+
+    def _sections(self, recs: List[AsmRecord]) -> bool:
+        changed = False
+        current = None
+        i = 0
+        while i < len(recs):
+            r = recs[i]
+            if r.kind == "directive" and r.op in SECTIONS:
+                if r.op == current:
+                    self._drop(recs, i, "section")
+                    changed = True
+                    continue
+                current = r.op
+            i += 1
+        return changed
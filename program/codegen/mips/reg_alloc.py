@@ -4,7 +4,14 @@ from typing import Dict, Optional, Tuple, List, Set
 
 T_REGS = [f"$t{i}" for i in range(10)]  # $t0..$t9
 S_REGS = [f"$s{i}" for i in range(8)]   # $s0..$s7
-USE_S_REGS = False   
+# $s* son callee-saved: el prólogo/epílogo guarda y restaura los que la función
+# usa (used_s), así que un valor en $s sobrevive a un jal sin sw/lw en la llamada.
+USE_S_REGS = True
+
+# $t7..$t9 quedan reservados como scratch del InstructionSelector (operandos en
+# memoria); los asignadores solo reparten $t0..$t6 (y $s* si USE_S_REGS).
+SCRATCH_REGS = ["$t7", "$t8", "$t9"]
+ALLOC_T_REGS = [r for r in T_REGS if r not in SCRATCH_REGS]
 
 class RegAllocator:
     """
@@ -16,7 +23,9 @@ class RegAllocator:
            -> (reg|None, my_spill_off|None, victim|(reg,off)|None)
       - mark_loaded(name)            # llama después de hacer lw reg, off($fp)
       - free_if_dead(name, pc=None)  # libera registro si la variable ya no está viva
-      - on_call()                    # cumple convención caller-saved para $t*
+      - on_call(pc=None)             # cumple convención caller-saved para $t*
+      - after_call()                 # (reg, off) a recargar tras el jal (aquí ninguno)
+      - stats()                      # valores, spills y moves coalescidos de la función
     Notas:
       * Si devuelve victim=(reg,off), debes emitir `sw reg, off($fp)` antes de usar el nuevo reg.
       * Si devuelve (None, my_off, _), usa memoria: carga a scratch o almacena desde scratch.
@@ -31,15 +40,18 @@ class RegAllocator:
         self.free_t = set()
         self.free_s = set()
         self.used_s = set()
+        # nombres que en algún momento se mandaron a un slot del frame (stats)
+        self.spilled: Set[str] = set()
 
     # ------- ciclo de vida por función -------
 
     def attach_frame(self, frame):
         self.frame = frame
         self.loc.clear()
-        self.free_t = set(T_REGS)
+        self.free_t = set(ALLOC_T_REGS)
         self.free_s = set(S_REGS) if USE_S_REGS else set()
         self.used_s = set()
+        self.spilled = set()
 
     def attach_liveness(self, liveness: Optional[List[Set[str]]]):
         """
@@ -50,11 +62,23 @@ class RegAllocator:
 
     # ------- utilitarios internos -------
 
+    @staticmethod
+    def _take(free: set, order: List[str]) -> str:
+        """
+        Saca de 'free' el primer registro según 'order'.
+        (set.pop() depende del hash de los strings y haría la salida no determinista.)
+        """
+        for r in order:
+            if r in free:
+                free.discard(r)
+                return r
+        raise KeyError("no hay registros libres")
+
     def _spill_victim(self) -> Optional[str]:
         """
-        Política mínima: escoge el primer $t* ocupado en orden T_REGS.
+        Política mínima: escoge el primer $t* ocupado en orden ALLOC_T_REGS.
         """
-        for r in T_REGS:
+        for r in ALLOC_T_REGS:
             if r not in self.free_t:
                 return r
         return None
@@ -69,6 +93,7 @@ class RegAllocator:
                 if off is None:
                     off = self.frame.alloc_spill()
                 self.loc[name] = (None, off)
+                self.spilled.add(name)
                 self.free_t.add(reg)
                 return name, off
         return None, None
@@ -96,12 +121,12 @@ class RegAllocator:
             off = self.loc[name][1]
             # intenta $t* primero (si no across_call)
             if not across_call and self.free_t:
-                r = self.free_t.pop()
+                r = self._take(self.free_t, ALLOC_T_REGS)
                 self.loc[name] = (r, off)   # pendiente de cargar
                 return r, off, None
             # usa $s* si está habilitado
             if self.free_s:
-                r = self.free_s.pop()
+                r = self._take(self.free_s, S_REGS)
                 self.used_s.add(r)
                 self.loc[name] = (r, off)
                 return r, off, None
@@ -110,12 +135,12 @@ class RegAllocator:
 
         # Nuevo símbolo: intenta $t* / $s*
         if not across_call and self.free_t:
-            r = self.free_t.pop()
+            r = self._take(self.free_t, ALLOC_T_REGS)
             self.loc[name] = (r, None)
             return r, None, None
 
         if self.free_s:
-            r = self.free_s.pop()
+            r = self._take(self.free_s, S_REGS)
             self.used_s.add(r)
             self.loc[name] = (r, None)
             return r, None, None
@@ -127,11 +152,13 @@ class RegAllocator:
             # Slot propio para 'name'
             my_off = self.frame.alloc_spill()
             self.loc[name] = (None, my_off)
+            self.spilled.add(name)
             return None, my_off, (victim, voff)
 
         # Todo lleno: trabaja en memoria
         my_off = self.frame.alloc_spill()
         self.loc[name] = (None, my_off)
+        self.spilled.add(name)
         return None, my_off, None
 
     def mark_loaded(self, name: str):
@@ -147,7 +174,7 @@ class RegAllocator:
         """
         return
 
-    def on_call(self):
+    def on_call(self, pc: Optional[int] = None):
         """
         Convención caller-saved: devolver lista de (reg, off) para guardar antes del jal.
         Luego marca esos temporales como derramados y libera $t*.
@@ -161,5 +188,21 @@ class RegAllocator:
                 saves.append((r, off))
                 # marcar como derramado
                 self.loc[name] = (None, off)
-        self.free_t = set(T_REGS)
+                self.spilled.add(name)
+        self.free_t = set(ALLOC_T_REGS)
         return saves
+
+    def after_call(self):
+        """Los valores quedaron derramados en on_call(): se recargan al usarse."""
+        return []
+
+    def stats(self) -> Dict[str, object]:
+        """Resumen de la función actual (MIPSGenerator.regalloc_stats)."""
+        return {
+            "function": self.frame.func_name if self.frame else None,
+            "regalloc": "simple",
+            "values": len(self.loc),
+            "regs_used": len({r for r, _ in self.loc.values() if r is not None}),
+            "spills": len(self.spilled),
+            "moves_coalesced": 0,
+        }
@@ -0,0 +1,77 @@
+# program/codegen/mips/strength.py
+#
+# Reducción de fuerza para '*', '/' y '%' por una constante (InstructionSelector).
+#
+# - x * c: si |c| es 2^a, 2^a + 2^b o 2^a - 2^b sale con sll y un addu/subu
+#   (y un subu $zero si c < 0) en vez de 'mul'; los 32 bits bajos son los mismos.
+# - x / 2^k y x % 2^k: sra/srl suman el sesgo 2^k - 1 a los negativos para que
+#   el cociente se trunque hacia cero y el resto tenga el signo del dividendo,
+#   igual que 'div' (ver opt/fold.py).
+# - x / d y x % d con otro d: multiplicación por el "número mágico" M y shift
+#   (Hacker's Delight, cap. 10): q = hi(M * x) [+/- x] >> s, más 1 si q < 0.
+#   El resto sale como x - q * d.
+
+from typing import Optional, Tuple
+
+M32 = 0xFFFFFFFF
+TWO31 = 1 << 31
+INT_MIN = -TWO31
+
+
+def is_pow2(c: int) -> bool:
+    return c > 0 and c & (c - 1) == 0
+
+
+def log2(c: int) -> int:
+    """k tal que c == 2^k (c potencia de 2)."""
+    return c.bit_length() - 1
+
+
+def shift_add_terms(c: int) -> Optional[Tuple]:
+    """
+    Descomposición de c > 0 para x * c con shifts:
+      ("sll", a)        c == 2^a
+      ("addu", a, b)    c == 2^a + 2^b   (a > b)
+      ("subu", a, b)    c == 2^a - 2^b   (a > b)
+    None si hace falta más de un addu/subu.
+    """
+    if c <= 0:
+        return None
+    if is_pow2(c):
+        return ("sll", log2(c))
+    low = c & -c
+    if is_pow2(c - low):
+        return ("addu", log2(c - low), log2(low))
+    if is_pow2(c + low):
+        return ("subu", log2(c + low), log2(low))
+    return None
+
+
+def signed_magic(d: int) -> Tuple[int, int]:
+    """
+    (M, s) para dividir enteros de 32 bits con signo por d (2 <= |d| < 2^31):
+    M es el multiplicador como entero con signo y s el shift posterior.
+    """
+    ad = abs(d)
+    t = TWO31 + (1 if d < 0 else 0)
+    anc = t - 1 - t % ad            # |nc|
+    p = 31
+    q1, r1 = divmod(TWO31, anc)
+    q2, r2 = divmod(TWO31, ad)
+    while True:
+        p += 1
+        q1, r1 = 2 * q1, 2 * r1
+        if r1 >= anc:
+            q1, r1 = q1 + 1, r1 - anc
+        q2, r2 = 2 * q2, 2 * r2
+        if r2 >= ad:
+            q2, r2 = q2 + 1, r2 - ad
+        delta = ad - r2
+        if not (q1 < delta or (q1 == delta and r1 == 0)):
+            break
+    m = (q2 + 1) & M32
+    if d < 0:
+        m = (-m) & M32
+    if m >= TWO31:
+        m -= 1 << 32
+    return m, p - 32
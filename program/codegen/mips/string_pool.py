@@ -0,0 +1,35 @@
+# program/codegen/mips/string_pool.py
+
+from typing import Dict
+
+
+class StringPool:
+    """
+    Pool de literales de cadena por programa.
+    - intern('"Hola"') -> '_str_0' (misma etiqueta para el mismo literal)
+    - Las etiquetas son secuenciales en orden de primera aparición, así que
+      la salida es determinista entre ejecuciones (no depende de hash()).
+    - emit(writer) vuelca todos los literales en una única sección .data.
+    """
+
+    def __init__(self, prefix: str = "_str_"):
+        self.prefix = prefix
+        self.labels: Dict[str, str] = {}   # literal (con comillas) -> etiqueta
+
+    def intern(self, literal: str) -> str:
+        label = self.labels.get(literal)
+        if label is None:
+            label = f"{self.prefix}{len(self.labels)}"
+            self.labels[literal] = label
+        return label
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def emit(self, writer) -> None:
+        if not self.labels:
+            return
+        writer.data()
+        for literal, label in self.labels.items():
+            writer.label(label)
+            writer.emit(f".asciiz {literal}")
@@ -0,0 +1,182 @@
+# program/compile_cache.py
+#
+# Caché de compilación en disco, estilo ccache.
+#
+# Clave = sha256( versión del compilador + huella de sus fuentes + opciones + fuente .cps )
+# Valor = TAC (texto) y ensamblador MIPS final (si se generó).
+#
+# Layout del directorio:
+#   <root>/stats.json          contadores persistentes (hits, misses, stores, evictions)
+#   <root>/ab/abcdef....json   una entrada por clave (2 primeros hex como subdirectorio)
+#
+# La política de expulsión es LRU por tamaño: cada hit actualiza el mtime de la
+# entrada y, al superar max_bytes, se borran las entradas con mtime más antiguo.
+
+import hashlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+from typing import Dict, Optional
+
+COMPILER_VERSION = "1.0"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_STATS_FILE = "stats.json"
+_STAT_KEYS = ("hits", "misses", "stores", "evictions")
+
+
+@lru_cache(maxsize=1)
+def compiler_fingerprint() -> str:
+    """
+    Huella de las fuentes del compilador (.py del paquete 'program' y runtime.s).
+    Cualquier cambio en el compilador invalida las entradas viejas aunque
+    COMPILER_VERSION no se haya actualizado.
+    """
+    pkg_root = os.path.dirname(os.path.abspath(__file__))
+    h = hashlib.sha256()
+    for dirpath, dirnames, filenames in os.walk(pkg_root):
+        dirnames[:] = sorted(d for d in dirnames if d not in ("__pycache__", "ide", "docs"))
+        for fn in sorted(filenames):
+            if not (fn.endswith(".py") or fn.endswith(".s")):
+                continue
+            path = os.path.join(dirpath, fn)
+            h.update(os.path.relpath(path, pkg_root).encode("utf-8"))
+            with open(path, "rb") as f:
+                h.update(f.read())
+    return h.hexdigest()
+
+
+class CompileCache:
+    """
+    API:
+      - key(src, options)          -> clave hex (sha256)
+      - get(key)                   -> {"tac": str, "asm": str|None} o None
+      - put(key, tac, asm=None)    guarda la entrada y aplica expulsión LRU
+      - stats()                    -> dict con hits/misses/stores/evictions/entries/bytes
+      - format_stats()             -> texto listo para imprimir
+    """
+
+    def __init__(self, root: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    # ---------- claves y rutas ----------
+    def key(self, src: str, options: Optional[Dict] = None) -> str:
+        h = hashlib.sha256()
+        h.update(COMPILER_VERSION.encode("utf-8"))
+        h.update(b"\0")
+        h.update(compiler_fingerprint().encode("utf-8"))
+        h.update(b"\0")
+        h.update(json.dumps(options or {}, sort_keys=True).encode("utf-8"))
+        h.update(b"\0")
+        h.update(src.encode("utf-8"))
+        return h.hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    # ---------- contadores ----------
+    def _read_stats(self) -> Dict[str, int]:
+        path = os.path.join(self.root, _STATS_FILE)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        return {k: int(data.get(k, 0)) for k in _STAT_KEYS}
+
+    def _bump(self, **deltas: int) -> None:
+        stats = self._read_stats()
+        for k, d in deltas.items():
+            stats[k] += d
+        self._write_atomic(os.path.join(self.root, _STATS_FILE), json.dumps(stats))
+
+    @staticmethod
+    def _write_atomic(path: str, text: str) -> None:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    # ---------- API principal ----------
+    def get(self, key: str) -> Optional[Dict]:
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._bump(misses=1)
+            return None
+        # LRU: un hit "rejuvenece" la entrada
+        os.utime(path, None)
+        self._bump(hits=1)
+        return entry
+
+    def put(self, key: str, tac: str, asm: Optional[str] = None) -> None:
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._write_atomic(path, json.dumps({"tac": tac, "asm": asm}))
+        evicted = self._evict(keep=path)
+        self._bump(stores=1, evictions=evicted)
+
+    def _entries(self):
+        """Lista (mtime, size, path) de todas las entradas del caché."""
+        out = []
+        for dirpath, _, filenames in os.walk(self.root):
+            if dirpath == self.root:
+                continue
+            for fn in filenames:
+                if not fn.endswith(".json"):
+                    continue
+                path = os.path.join(dirpath, fn)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                out.append((st.st_mtime, st.st_size, path))
+        return out
+
+    def _evict(self, keep: Optional[str] = None) -> int:
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return 0
+
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        return evicted
+
+    def stats(self) -> Dict[str, int]:
+        stats = self._read_stats()
+        entries = self._entries()
+        stats["entries"] = len(entries)
+        stats["bytes"] = sum(size for _, size, _ in entries)
+        return stats
+
+    def format_stats(self) -> str:
+        s = self.stats()
+        lookups = s["hits"] + s["misses"]
+        rate = (100.0 * s["hits"] / lookups) if lookups else 0.0
+        return (
+            f"cache: {self.root}\n"
+            f"  hits={s['hits']} misses={s['misses']} (hit rate {rate:.1f}%)\n"
+            f"  stores={s['stores']} evictions={s['evictions']}\n"
+            f"  entries={s['entries']} size={s['bytes']}/{self.max_bytes} bytes"
+        )
@@ -0,0 +1,431 @@
+# program/ir/cfg.py
+#
+# Bloques básicos y grafo de flujo de control (CFG) sobre TACProgram.code.
+#
+# - Cada función (entre func_<f>_entry y func_<f>_end) se parte en bloques
+#   básicos; el código de nivel superior forma la función "main" (igual que en
+#   MIPSGenerator). El 'ret' implícito que TACBuilder emite justo después de
+#   func_<f>_end pertenece a <f>.
+# - Líderes: la primera instrucción, cada label y la que sigue a goto/ifgoto/ret.
+#   Sucesores: goto L -> bloque de L; ifgoto -> L y la caída; ret -> ninguno;
+#   el resto cae al bloque siguiente. Saltos a labels fuera de la función se
+#   ignoran.
+# - Sobre el CFG: reverse postorder, dominadores (Cooper, Harvey y Kennedy,
+#   "A Simple, Fast Dominance Algorithm"), loops naturales (arcos hacia atrás
+#   b -> h con h dominando a b) y liveness de Vars/Temps por bloque.
+#
+# Caché: program_cfg(tac) reutiliza el ProgramCFG mientras tac.version no
+# cambie. Un pass que edita los bloques llama a FunctionCFG.invalidate() (recalcula
+# bloques y análisis de esa función) y al final a ProgramCFG.commit(), que
+# reescribe tac.code y deja el CFG como vigente; un pass que edita tac.code
+# directamente llama a tac.invalidate().
+
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from .tac_ir import Label, Quadruple, TACProgram, Temp, Var
+
+
+# ---------- núcleo compartido (también lo usa el Liveness del backend) ----------
+
+def split_blocks(
+    n: int,
+    label_at: Callable[[int], Optional[str]],
+    branch_at: Callable[[int], Tuple[Optional[str], Optional[str]]],
+) -> Tuple[List[Tuple[int, int]], List[int], List[List[int]], List[List[int]]]:
+    """
+    Parte n instrucciones en bloques básicos, sin depender de su representación:
+      label_at(i)  -> nombre del label si la instrucción i es un label, si no None
+      branch_at(i) -> ("goto" | "if" | "ret" | None, label destino o None)
+    Devuelve (blocks, block_of, succ, pred), con blocks como rangos [start, end).
+    """
+    label_pos: Dict[str, int] = {}
+    for i in range(n):
+        name = label_at(i)
+        if name:
+            label_pos[name] = i
+
+    leaders = {0} if n else set()
+    leaders.update(label_pos.values())
+    for i in range(n - 1):
+        if branch_at(i)[0] is not None:
+            leaders.add(i + 1)
+
+    starts = sorted(leaders)
+    blocks: List[Tuple[int, int]] = []
+    block_of: List[int] = [0] * n
+    for b, start in enumerate(starts):
+        end = starts[b + 1] if b + 1 < len(starts) else n
+        blocks.append((start, end))
+        for i in range(start, end):
+            block_of[i] = b
+
+    succ: List[List[int]] = [[] for _ in blocks]
+    pred: List[List[int]] = [[] for _ in blocks]
+    for b, (start, end) in enumerate(blocks):
+        kind, target = branch_at(end - 1)
+        targets: List[int] = []
+        if kind in ("goto", "if") and target in label_pos:
+            targets.append(block_of[label_pos[target]])
+        if kind in (None, "if") and end < n:
+            targets.append(b + 1)
+        for t in dict.fromkeys(targets):
+            succ[b].append(t)
+            pred[t].append(b)
+    return blocks, block_of, succ, pred
+
+
+def postorder(succ: Sequence[Sequence[int]], roots: Optional[Sequence[int]] = None) -> List[int]:
+    """
+    Postorden iterativo desde cada raíz (por defecto todos los bloques en
+    orden, así que los inalcanzables quedan al final).
+    """
+    seen = [False] * len(succ)
+    order: List[int] = []
+    for root in (range(len(succ)) if roots is None else roots):
+        if seen[root]:
+            continue
+        seen[root] = True
+        stack = [(root, iter(succ[root]))]
+        while stack:
+            b, it = stack[-1]
+            nxt = next(it, None)
+            if nxt is None:
+                stack.pop()
+                order.append(b)
+            elif not seen[nxt]:
+                seen[nxt] = True
+                stack.append((nxt, iter(succ[nxt])))
+    return order
+
+
+def quad_label(q: Quadruple) -> Optional[str]:
+    return str(q.dst) if q.op == "label" else None
+
+
+def quad_branch(q: Quadruple) -> Tuple[Optional[str], Optional[str]]:
+    if q.op == "goto":
+        return "goto", str(q.dst)
+    if q.op in ("ifgoto", "if_goto"):
+        return "if", str(q.dst)
+    if q.op == "ret":
+        return "ret", None
+    return None, None
+
+
+def quad_defs_uses(q: Quadruple) -> Tuple[Set[str], Set[str]]:
+    """
+    (defs, uses) de un quad: solo cuentan Vars y Temps. dst es la única
+    definición; a y b son usos (en 'store' también la dirección en b). Los
+    argumentos de un 'phi' cuentan como usos del bloque (el liveness de SSA
+    los ubica al final de cada predecesor, ver ir/ssa.py).
+    """
+    defs = {str(q.dst)} if isinstance(q.dst, (Var, Temp)) else set()
+    uses = {str(x) for x in (q.a, q.b) if isinstance(x, (Var, Temp))}
+    uses.update(str(v) for _, v in q.args if isinstance(v, (Var, Temp)))
+    return defs, uses
+
+
+# ---------- CFG por función ----------
+
+@dataclass
+class BasicBlock:
+    id: int
+    quads: List[Quadruple]
+    succs: List[int] = field(default_factory=list)
+    preds: List[int] = field(default_factory=list)
+
+    @property
+    def label(self) -> Optional[str]:
+        return quad_label(self.quads[0]) if self.quads else None
+
+    @property
+    def terminator(self) -> Optional[Quadruple]:
+        """El goto/ifgoto/ret final del bloque, si lo hay."""
+        if self.quads and quad_branch(self.quads[-1])[0] is not None:
+            return self.quads[-1]
+        return None
+
+
+@dataclass
+class Loop:
+    header: int
+    body: Set[int]
+    latches: List[int]      # bloques con arco hacia atrás al header
+
+
+class FunctionCFG:
+    """
+    Bloques de una función. Los análisis (rpo, idom, loops) se calculan bajo
+    demanda y se descartan con invalidate(), que además vuelve a partir los
+    bloques a partir de sus quads actuales.
+    """
+
+    def __init__(self, name: str, quads: List[Quadruple]):
+        self.name = name
+        self._build(list(quads))
+
+    def _build(self, quads: List[Quadruple]) -> None:
+        ranges, _, succ, pred = split_blocks(
+            len(quads),
+            lambda i: quad_label(quads[i]),
+            lambda i: quad_branch(quads[i]),
+        )
+        # siempre hay un bloque de entrada (posiblemente vacío)
+        if not ranges:
+            ranges, succ, pred = [(0, 0)], [[]], [[]]
+        self.blocks: List[BasicBlock] = [
+            BasicBlock(b, quads[s:e], succ[b], pred[b]) for b, (s, e) in enumerate(ranges)
+        ]
+        self._rpo: Optional[List[int]] = None
+        self._idom: Optional[List[Optional[int]]] = None
+        self._loops: Optional[List[Loop]] = None
+        self._live_out: Optional[List[Set[str]]] = None
+
+    def invalidate(self) -> None:
+        """Llamar tras editar los quads de los bloques: re-parte y olvida análisis."""
+        self._build(self.quads())
+
+    def set_quads(self, quads: List[Quadruple]) -> None:
+        """Reemplaza el cuerpo completo de la función (re-parte en bloques)."""
+        self._build(list(quads))
+
+    def quads(self) -> List[Quadruple]:
+        return [q for blk in self.blocks for q in blk.quads]
+
+    @property
+    def entry(self) -> BasicBlock:
+        return self.blocks[0]
+
+    def block_of_label(self, name: str) -> Optional[BasicBlock]:
+        for blk in self.blocks:
+            if blk.label == name:
+                return blk
+        return None
+
+    # ---------- órdenes ----------
+    def rpo(self) -> List[int]:
+        """Reverse postorder de los bloques alcanzables desde la entrada."""
+        if self._rpo is None:
+            succ = [blk.succs for blk in self.blocks]
+            self._rpo = postorder(succ, [0])[::-1]
+        return self._rpo
+
+    def reachable(self) -> Set[int]:
+        return set(self.rpo())
+
+    # ---------- dominadores ----------
+    def idom(self) -> List[Optional[int]]:
+        """Dominador inmediato de cada bloque (None: la entrada o inalcanzable)."""
+        if self._idom is None:
+            rpo = self.rpo()
+            index = {b: i for i, b in enumerate(rpo)}
+            idom: List[Optional[int]] = [None] * len(self.blocks)
+            idom[0] = 0
+
+            def intersect(a: int, b: int) -> int:
+                while a != b:
+                    while index[a] > index[b]:
+                        a = idom[a]
+                    while index[b] > index[a]:
+                        b = idom[b]
+                return a
+
+            changed = True
+            while changed:
+                changed = False
+                for b in rpo[1:]:
+                    new = None
+                    for p in self.blocks[b].preds:
+                        if idom[p] is None:
+                            continue
+                        new = p if new is None else intersect(p, new)
+                    if new is not None and idom[b] != new:
+                        idom[b] = new
+                        changed = True
+            idom[0] = None
+            self._idom = idom
+        return self._idom
+
+    def dom_children(self) -> List[List[int]]:
+        """Hijos de cada bloque en el árbol de dominadores."""
+        children: List[List[int]] = [[] for _ in self.blocks]
+        for b, d in enumerate(self.idom()):
+            if d is not None:
+                children[d].append(b)
+        return children
+
+    def dominates(self, a: int, b: int) -> bool:
+        """a domina a b (reflexivo). Un bloque inalcanzable no es dominado."""
+        if b not in self.reachable():
+            return False
+        idom = self.idom()
+        while b is not None:
+            if b == a:
+                return True
+            b = idom[b]
+        return False
+
+    # ---------- loops naturales ----------
+    def loops(self) -> List[Loop]:
+        """Un Loop por header (los arcos hacia atrás al mismo header se fusionan)."""
+        if self._loops is None:
+            by_header: Dict[int, Loop] = {}
+            for b in self.rpo():
+                for h in self.blocks[b].succs:
+                    if not self.dominates(h, b):
+                        continue
+                    loop = by_header.setdefault(h, Loop(h, {h}, []))
+                    loop.latches.append(b)
+                    stack = [b]
+                    while stack:
+                        x = stack.pop()
+                        if x in loop.body:
+                            continue
+                        loop.body.add(x)
+                        stack.extend(self.blocks[x].preds)
+            index = {b: i for i, b in enumerate(self.rpo())}
+            self._loops = sorted(by_header.values(), key=lambda lp: index[lp.header])
+        return self._loops
+
+    def loop_depth(self, b: int) -> int:
+        return sum(1 for lp in self.loops() if b in lp.body)
+
+    # ---------- liveness ----------
+    def live_out(self) -> List[Set[str]]:
+        """Nombres vivos a la salida de cada bloque (punto fijo hacia atrás)."""
+        if self._live_out is None:
+            gen: List[Set[str]] = []
+            kill: List[Set[str]] = []
+            for blk in self.blocks:
+                g: Set[str] = set()
+                k: Set[str] = set()
+                for q in reversed(blk.quads):
+                    defs, uses = quad_defs_uses(q)
+                    g = (g - defs) | uses
+                    k |= defs
+                gen.append(g)
+                kill.append(k)
+            live_in: List[Set[str]] = [set() for _ in self.blocks]
+            live_out: List[Set[str]] = [set() for _ in self.blocks]
+            order = postorder([blk.succs for blk in self.blocks])
+            changed = True
+            while changed:
+                changed = False
+                for b in order:
+                    out = set().union(*(live_in[s] for s in self.blocks[b].succs))
+                    new_in = gen[b] | (out - kill[b])
+                    if out != live_out[b] or new_in != live_in[b]:
+                        live_out[b], live_in[b] = out, new_in
+                        changed = True
+            self._live_out = live_out
+        return self._live_out
+
+
+# ---------- CFG de todo el programa ----------
+
+class ProgramCFG:
+    """
+    Un FunctionCFG por función, en orden de aparición ("main" = nivel superior).
+    commit() reescribe el TACProgram: cada función queda contigua entre sus
+    labels de entrada/salida y el código de nivel superior se agrupa donde
+    aparecía su primer tramo.
+    """
+
+    def __init__(self, program: TACProgram):
+        self.program = program
+        self.functions: Dict[str, FunctionCFG] = {}
+        # orden de reescritura: ("func", nombre) o ("main", None)
+        self._layout: List[Tuple[str, Optional[str]]] = []
+        self._split(program.code)
+        self.version = program.version
+        self._label_names: Optional[Set[str]] = None
+
+    def _split(self, code: List[Quadruple]) -> None:
+        bodies: Dict[str, List[Quadruple]] = {}
+        top: List[Quadruple] = []
+        open_fns: List[str] = []
+        just_closed: Optional[str] = None
+
+        for q in code:
+            name = quad_label(q)
+            if name and name.startswith("func_") and name.endswith("_entry"):
+                fn = name[len("func_"):-len("_entry")]
+                bodies[fn] = []
+                open_fns.append(fn)
+                self._layout.append(("func", fn))
+                just_closed = None
+                continue
+            if name and name.startswith("func_") and name.endswith("_end") and open_fns:
+                just_closed = open_fns.pop()
+                continue
+            if just_closed is not None and q.op == "ret":
+                bodies[just_closed].append(q)
+                just_closed = None
+                continue
+            just_closed = None
+            if open_fns:
+                bodies[open_fns[-1]].append(q)
+            else:
+                if ("main", None) not in self._layout:
+                    self._layout.append(("main", None))
+                top.append(q)
+
+        if top:
+            self.functions["main"] = FunctionCFG("main", top)
+        for fn, body in bodies.items():
+            self.functions[fn] = FunctionCFG(fn, body)
+
+    def __iter__(self):
+        return iter(self.functions.values())
+
+    def quads(self) -> List[Quadruple]:
+        code: List[Quadruple] = []
+        for kind, fn in self._layout:
+            if kind == "main":
+                code.extend(self.functions["main"].quads())
+                continue
+            code.append(Quadruple("label", dst=Label(f"func_{fn}_entry")))
+            code.extend(self.functions[fn].quads())
+            code.append(Quadruple("label", dst=Label(f"func_{fn}_end")))
+        return code
+
+    def global_names(self) -> Set[str]:
+        """Vars de main que también aparecen en otra función (se leen por nombre)."""
+        def names(fn: FunctionCFG) -> Set[str]:
+            return {str(x) for q in fn.quads() for x in (q.a, q.b, q.dst) if isinstance(x, Var)}
+
+        main = self.functions.get("main")
+        if main is None:
+            return set()
+        others: Set[str] = set()
+        for fn in self.functions.values():
+            if fn is not main:
+                others |= names(fn)
+        return names(main) & others
+
+    def new_label(self, prefix: str) -> Label:
+        """Label nuevo '<prefix><n>' que no existe en ninguna función."""
+        if self._label_names is None:
+            self._label_names = {quad_label(q) for q in self.quads()} - {None}
+        n = 0
+        while f"{prefix}{n}" in self._label_names:
+            n += 1
+        self._label_names.add(f"{prefix}{n}")
+        return Label(f"{prefix}{n}")
+
+    def commit(self) -> None:
+        """Reescribe program.code desde los bloques y deja este CFG en caché."""
+        self.program.code[:] = self.quads()
+        self.program.invalidate()
+        self.version = self.program.version
+        self.program._cfg = self
+
+
+def program_cfg(program: TACProgram) -> ProgramCFG:
+    """CFG del programa, reconstruido solo si program.version cambió."""
+    cached = getattr(program, "_cfg", None)
+    if cached is None or cached.version != program.version:
+        cached = ProgramCFG(program)
+        program._cfg = cached
+    return cached
@@ -0,0 +1,541 @@
+# program/ir/ssa.py
+#
+# Forma SSA sobre el CFG de una función (Cytron, Ferrante, Rosen, Wegman y
+# Zadeck, "Efficiently Computing Static Single Assignment Form and the Control
+# Dependence Graph").
+#
+# build_ssa(fn, new_label) -> versión -> nombre original
+#   - quita los bloques inalcanzables; si la entrada tiene predecesores (un
+#     loop al inicio de la función) le antepone un label propio
+#   - phis en la frontera de dominancia iterada de los bloques que definen cada
+#     nombre, solo donde el nombre está vivo a la entrada (SSA "pruned")
+#   - parte los arcos críticos que llegan a bloques con phis, así la
+#     destrucción pone las copias al final del predecesor
+#   - renombra en preorden del árbol de dominadores: cada definición de x pasa
+#     a x.1, x.2, ...; un uso sin definición previa (param, global) sigue
+#     siendo x. Como cada definición es una versión nueva, los temporales que
+#     TempAllocator recicla (t3 usado para valores sin relación) quedan separados.
+#     Las copias 'x := y' se pliegan al renombrar: los usos de x leen y.
+#   - 'pinned': nombres que no se versionan (quedan como memoria, sin phis)
+#
+# verify_ssa(fn) -> lista de problemas (vacía si la forma es válida): una sola
+#   definición por nombre, phis al inicio del bloque con un argumento por
+#   predecesor y cada uso dominado por su definición.
+#
+# destroy_ssa(fn, origins): vuelve a TAC sin phis (Sreedhar et al., método I,
+#   más coalescing):
+#   - x := phi(p: a, ...) pasa a una copia x' := a al final de cada p y a
+#     x := x' al inicio del bloque, con x' un nombre nuevo
+#   - cada copia insertada se elimina si las clases de sus dos lados no
+#     interfieren (ningún miembro vivo donde se define el otro)
+#   - las copias de un mismo punto son paralelas: se secuencializan sin pisar
+#     una fuente antes de leerla, rompiendo ciclos (swap) con un temporal
+#   - la clase con el valor de entrada, o la primera, vuelve al nombre
+#     original; las demás conservan un nombre de versión
+#   - los bloques partidos que quedaron sin copias se eliminan
+
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .cfg import FunctionCFG, quad_defs_uses
+from .tac_ir import Label, Operand, Quadruple, Temp, Var
+
+SPLIT_PREFIX = "Lssa_split"
+END_PREFIX = "Lssa_end"
+ENTRY_PREFIX = "Lssa_entry"
+KEEP_PREFIX = "Lssa_keep"
+
+NewLabel = Callable[[str], Label]
+Copy = Tuple[Operand, Operand]          # (dst, src)
+
+
+def _is_name(x: Optional[Operand]) -> bool:
+    return isinstance(x, (Var, Temp))
+
+
+def _like(x: Operand, name: str) -> Operand:
+    """Operando del mismo tipo (Var/Temp) que x con otro nombre."""
+    return Temp(name) if isinstance(x, Temp) else Var(name)
+
+
+def _base(name: str) -> str:
+    """Nombre original de una versión ('t3.2' -> 't3'); los del fuente no tienen '.'."""
+    return name.split(".", 1)[0]
+
+
+def _copy(dst: Operand, src: Operand) -> Quadruple:
+    return Quadruple(":=", src, None, dst)
+
+
+# ---------- construcción ----------
+
+def dominance_frontiers(fn: FunctionCFG) -> List[Set[int]]:
+    """Frontera de dominancia de cada bloque alcanzable (Cooper-Harvey-Kennedy)."""
+    idom = fn.idom()
+    reach = fn.reachable()
+    df: List[Set[int]] = [set() for _ in fn.blocks]
+    for b in reach:
+        preds = [p for p in fn.blocks[b].preds if p in reach]
+        if len(preds) < 2:
+            continue
+        for p in preds:
+            runner: Optional[int] = p
+            while runner is not None and runner != idom[b]:
+                df[runner].add(b)
+                runner = idom[runner]
+    return df
+
+
+def _live_in(fn: FunctionCFG) -> List[Set[str]]:
+    live_out = fn.live_out()
+    res: List[Set[str]] = []
+    for blk in fn.blocks:
+        live = set(live_out[blk.id])
+        for q in reversed(blk.quads):
+            defs, uses = quad_defs_uses(q)
+            live = (live - defs) | uses
+        res.append(live)
+    return res
+
+
+def _phi_sites(fn: FunctionCFG, pinned: Set[str]) -> Dict[int, List[str]]:
+    """Bloque -> nombres que necesitan phi ahí."""
+    reach = fn.reachable()
+    live_in = _live_in(fn)
+    df = dominance_frontiers(fn)
+    defsites: Dict[str, Set[int]] = defaultdict(set)
+    for b in sorted(reach):
+        for q in fn.blocks[b].quads:
+            for d in quad_defs_uses(q)[0] - pinned:
+                defsites[d].add(b)
+    sites: Dict[int, List[str]] = defaultdict(list)
+    for v in sorted(defsites):
+        work = sorted(defsites[v])
+        queued = set(work)
+        placed: Set[int] = set()
+        while work:
+            x = work.pop()
+            for y in sorted(df[x]):
+                if y in placed or v not in live_in[y]:
+                    continue
+                placed.add(y)
+                sites[y].append(v)
+                if y not in queued:
+                    queued.add(y)
+                    work.append(y)
+    return sites
+
+
+def _prepare(fn: FunctionCFG, new_label: NewLabel) -> None:
+    reach = fn.reachable()
+    if len(reach) < len(fn.blocks):
+        fn.set_quads([q for blk in fn.blocks if blk.id in reach for q in blk.quads])
+    if fn.entry.preds:
+        fn.set_quads([Quadruple("label", dst=new_label(ENTRY_PREFIX))] + fn.quads())
+
+
+def _split_critical_edges(fn: FunctionCFG, targets: List[int], new_label: NewLabel) -> bool:
+    """
+    Parte los arcos p -> b con p de dos sucesores y b de varios predecesores.
+    El arco de caída recibe un bloque (solo un label) entre p y b; el arco
+    del salto, un bloque 'label; goto b' al final de la función, saltado por
+    un 'goto Lssa_end' si el último bloque caía.
+    """
+    before: Dict[int, List[Quadruple]] = defaultdict(list)
+    tail: List[Quadruple] = []
+    for b in sorted(targets):
+        blk = fn.blocks[b]
+        if len(blk.preds) < 2:
+            continue
+        for p in blk.preds:
+            pred = fn.blocks[p]
+            if len(pred.succs) < 2:
+                continue
+            lbl = new_label(SPLIT_PREFIX)
+            term = pred.terminator
+            if fn.block_of_label(str(term.dst)) is blk:
+                pred.quads[-1] = Quadruple(term.op, term.a, term.b, lbl)
+                tail += [Quadruple("label", dst=lbl), Quadruple("goto", dst=Label(blk.label))]
+            else:
+                before[b].append(Quadruple("label", dst=lbl))
+    if not before and not tail:
+        return False
+    quads: List[Quadruple] = []
+    for blk in fn.blocks:
+        quads += before.get(blk.id, [])
+        quads += blk.quads
+    if tail:
+        last = quads[-1] if quads else None
+        end = None
+        if last is None or last.op not in ("goto", "ret"):
+            end = new_label(END_PREFIX)
+            quads.append(Quadruple("goto", dst=end))
+        quads += tail
+        if end is not None:
+            quads.append(Quadruple("label", dst=end))
+    fn.set_quads(quads)
+    return True
+
+
+def _rename(fn: FunctionCFG, sites: Dict[int, List[str]], pinned: Set[str],
+            new_label: NewLabel) -> Dict[str, str]:
+    kinds: Dict[str, Operand] = {}
+    for q in fn.quads():
+        for x in (q.a, q.b, q.dst):
+            if _is_name(x):
+                kinds.setdefault(str(x), x)
+    origins = {name: _base(name) for name in kinds}
+    taken = set(kinds)
+    counter: Dict[str, int] = defaultdict(int)
+
+    def fresh(v: str) -> str:
+        v = _base(v)
+        while True:
+            counter[v] += 1
+            name = f"{v}.{counter[v]}"
+            if name not in taken:
+                taken.add(name)
+                origins[name] = v
+                return name
+
+    phi_of: Dict[int, Dict[str, Quadruple]] = {}
+    for b, names in sites.items():
+        blk = fn.blocks[b]
+        phis = [Quadruple("phi", dst=kinds[v]) for v in names]
+        pos = 1 if blk.label else 0
+        blk.quads[pos:pos] = phis
+        phi_of[b] = dict(zip(names, phis))
+
+    # nombre original -> operandos que tienen su valor actual (tope = vigente)
+    stacks: Dict[str, List[Operand]] = defaultdict(list)
+
+    def current(x: Optional[Operand]) -> Optional[Operand]:
+        if not _is_name(x):
+            return x
+        values = stacks[str(x)]
+        return values[-1] if values else x
+
+    def bind(x: Operand, value: Operand, pushed: List[str]) -> None:
+        stacks[str(x)].append(value)
+        pushed.append(str(x))
+
+    def define(x: Operand, pushed: List[str]) -> Operand:
+        bind(x, _like(x, fresh(str(x))), pushed)
+        return stacks[str(x)][-1]
+
+    args: Dict[int, List[Tuple[int, Operand]]] = defaultdict(list)
+    children = fn.dom_children()
+    work: List[Tuple[int, Optional[List[str]]]] = [(0, None)]
+    while work:
+        b, pushed = work.pop()
+        if pushed is not None:
+            for v in pushed:
+                stacks[v].pop()
+            continue
+        pushed = []
+        blk = fn.blocks[b]
+        out: List[Quadruple] = []
+        for q in blk.quads:
+            if q.op == "phi":
+                q.dst = define(q.dst, pushed)
+                out.append(q)
+                continue
+            a, b2 = current(q.a), current(q.b)
+            if q.op == ":=" and _is_name(a) and _is_name(q.dst) \
+                    and str(a) not in pinned and str(q.dst) not in pinned:
+                # copia plegada: los usos de dst leen directamente a
+                bind(q.dst, a, pushed)
+                continue
+            dst = q.dst
+            if _is_name(dst) and str(dst) not in pinned:
+                dst = define(dst, pushed)
+            out.append(q if (a, b2, dst) == (q.a, q.b, q.dst) else Quadruple(q.op, a, b2, dst))
+        if not out and blk.quads:
+            # solo tenía copias plegadas: sin un label el bloque desaparecería al
+            # re-partir y los phis quedarían apuntando a ids corridos
+            out.append(Quadruple("label", dst=new_label(KEEP_PREFIX)))
+        blk.quads = out
+        for s in blk.succs:
+            for v, phi in phi_of.get(s, {}).items():
+                args[id(phi)].append((b, current(kinds[v])))
+        work.append((b, pushed))
+        for c in reversed(children[b]):
+            work.append((c, None))
+
+    for phis in phi_of.values():
+        for phi in phis.values():
+            phi.args = tuple(args[id(phi)])
+    return origins
+
+
+def build_ssa(fn: FunctionCFG, new_label: NewLabel,
+              pinned: Iterable[str] = ()) -> Dict[str, str]:
+    """
+    Pasa fn a SSA (en sitio). Los nombres de 'pinned' no se versionan (los
+    ven otras funciones o el backend los distingue por nombre). Devuelve
+    versión -> nombre original.
+    """
+    pinned = set(pinned)
+    _prepare(fn, new_label)
+    sites = _phi_sites(fn, pinned)
+    if _split_critical_edges(fn, list(sites), new_label):
+        sites = _phi_sites(fn, pinned)
+    origins = _rename(fn, sites, pinned, new_label)
+    fn.invalidate()
+    return origins
+
+
+# ---------- verificación ----------
+
+def verify_ssa(fn: FunctionCFG, pinned: Iterable[str] = ()) -> List[str]:
+    """Problemas de la forma SSA de fn (vacía si es válida); 'pinned' como en build_ssa."""
+    pinned = set(pinned)
+    errors: List[str] = []
+    where: Dict[str, Tuple[int, int]] = {}
+    for blk in fn.blocks:
+        body_started = False
+        for i, q in enumerate(blk.quads):
+            if q.op == "phi":
+                if body_started:
+                    errors.append(f"B{blk.id}: phi de {q.dst} después de otras instrucciones")
+                preds = sorted(p for p, _ in q.args)
+                if preds != sorted(blk.preds):
+                    errors.append(f"B{blk.id}: phi de {q.dst} con predecesores {preds}, "
+                                  f"se esperaban {sorted(blk.preds)}")
+            elif q.op != "label":
+                body_started = True
+            for d in quad_defs_uses(q)[0] - pinned:
+                if d in where:
+                    errors.append(f"B{blk.id}: {d} definido más de una vez")
+                where[d] = (blk.id, i)
+
+    reach = fn.reachable()
+    for blk in fn.blocks:
+        if blk.id not in reach:
+            continue
+        for i, q in enumerate(blk.quads):
+            if q.op == "phi":
+                # el argumento de p se lee al final de p
+                uses = [(str(v), p, len(fn.blocks[p].quads)) for p, v in q.args if _is_name(v)]
+            else:
+                uses = [(n, blk.id, i) for n in quad_defs_uses(q)[1]]
+            for name, ub, ui in uses:
+                if name not in where:
+                    continue            # valor de entrada (param, global)
+                db, di = where[name]
+                ok = di < ui if db == ub else fn.dominates(db, ub)
+                if not ok:
+                    errors.append(f"B{blk.id}: el uso de {name} no está dominado por su definición")
+    return errors
+
+
+# ---------- destrucción ----------
+
+class _Classes:
+    """Union-find de nombres con grafo de interferencia entre clases."""
+
+    def __init__(self, adj: Dict[str, Set[str]]):
+        self.parent: Dict[str, str] = {}
+        self.members: Dict[str, Set[str]] = {}
+        self.adj = adj
+
+    def find(self, x: str) -> str:
+        self.parent.setdefault(x, x)
+        self.members.setdefault(x, {x})
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def interfere(self, x: str, y: str) -> bool:
+        rx, ry = self.find(x), self.find(y)
+        others = self.members[ry]
+        return any(self.adj.get(m, set()) & others for m in self.members[rx])
+
+    def union(self, x: str, y: str) -> None:
+        rx, ry = self.find(x), self.find(y)
+        if rx != ry:
+            self.parent[ry] = rx
+            self.members[rx] |= self.members.pop(ry)
+
+
+def _interference(fn: FunctionCFG) -> Dict[str, Set[str]]:
+    """Dos nombres interfieren si uno está vivo donde se define el otro
+    (salvo la fuente de una copia, que tiene el mismo valor)."""
+    adj: Dict[str, Set[str]] = defaultdict(set)
+    live_out = fn.live_out()
+    for blk in fn.blocks:
+        live = set(live_out[blk.id])
+        for q in reversed(blk.quads):
+            defs, uses = quad_defs_uses(q)
+            src = str(q.a) if q.op == ":=" and _is_name(q.a) else None
+            for d in defs:
+                for other in live:
+                    if other != d and other != src:
+                        adj[d].add(other)
+                        adj[other].add(d)
+            live = (live - defs) | uses
+    return adj
+
+
+def sequentialize(copies: List[Copy], temp: Callable[[Operand], Operand]) -> List[Copy]:
+    """
+    Orden secuencial de una copia paralela (destinos distintos): primero los
+    destinos que ninguna copia pendiente lee; en un ciclo, la fuente de una
+    copia se guarda en temp(fuente) y las demás la leen de ahí.
+    """
+    pending = [(d, s) for d, s in copies if str(d) != str(s)]
+    out: List[Copy] = []
+    while pending:
+        read = {str(s) for _, s in pending if _is_name(s)}
+        ready = [(d, s) for d, s in pending if str(d) not in read]
+        if ready:
+            d, s = ready[0]
+            out.append((d, s))
+            pending.remove((d, s))
+            continue
+        _, s = pending[0]
+        tmp = temp(s)
+        out.append((tmp, s))
+        pending = [(d, tmp if str(x) == str(s) else x) for d, x in pending]
+    return out
+
+
+def destroy_ssa(fn: FunctionCFG, origins: Dict[str, str]) -> None:
+    """Reemplaza los phis por copias y devuelve los nombres a su forma original."""
+    origins = dict(origins)
+    taken = set(origins)
+    for q in fn.quads():
+        for x in (q.a, q.b, q.dst):
+            if _is_name(x):
+                taken.add(str(x))
+                origins.setdefault(str(x), _base(str(x)))
+    counter: Dict[str, int] = defaultdict(int)
+
+    def fresh(x: Operand) -> Operand:
+        v = origins.get(str(x), str(x))
+        while True:
+            counter[v] += 1
+            name = f"{v}.c{counter[v]}"
+            if name not in taken:
+                taken.add(name)
+                origins[name] = v
+                return _like(x, name)
+
+    # 1) método I: x' := a al final de cada predecesor y x := x' al inicio
+    #    (x' es un nombre nuevo, vivo solo entre esas copias)
+    groups: List[List[Quadruple]] = []          # cada grupo es una copia paralela
+    at_end: Dict[int, List[Quadruple]] = defaultdict(list)
+    for blk in fn.blocks:
+        phis = [q for q in blk.quads if q.op == "phi"]
+        if not phis:
+            continue
+        start: List[Quadruple] = []
+        for phi in phis:
+            x2 = fresh(phi.dst)
+            start.append(_copy(phi.dst, x2))
+            for p, a in phi.args:
+                at_end[p].append(_copy(x2, a))
+        body = [q for q in blk.quads if q.op != "phi"]
+        pos = 1 if blk.label else 0
+        blk.quads = body[:pos] + start + body[pos:]
+        groups.append(start)
+    for p, copies in at_end.items():
+        quads = fn.blocks[p].quads
+        pos = len(quads) - 1 if fn.blocks[p].terminator is not None else len(quads)
+        quads[pos:pos] = copies
+        groups.append(copies)
+    fn.invalidate()
+
+    # 2) coalescing de las copias insertadas cuyas clases no interfieren
+    classes = _Classes(_interference(fn))
+    for group in groups:
+        for q in group:
+            if _is_name(q.a) and not classes.interfere(str(q.dst), str(q.a)):
+                classes.union(str(q.dst), str(q.a))
+
+    # 3) un nombre por clase: el original si está libre, si no una versión
+    # orígenes de cada clase, en orden de aparición de sus miembros
+    bases: Dict[str, List[str]] = {}
+    for q in fn.quads():
+        for x in (q.dst, q.a, q.b):
+            if _is_name(x):
+                names = bases.setdefault(classes.find(str(x)), [])
+                if origins[str(x)] not in names:
+                    names.append(origins[str(x)])
+    final: Dict[str, str] = {}
+    used: Set[str] = set()
+    for rep in bases:
+        # la clase que contiene el nombre original (valor de entrada) lo conserva
+        for m in classes.members[rep]:
+            if origins[m] == m and m not in used:
+                final[rep] = m
+                used.add(m)
+                break
+    for rep, names in bases.items():
+        if rep in final:
+            continue
+        free = [b for b in names if b not in used]
+        if free:
+            final[rep] = free[0]
+        else:
+            # nombre de versión que no depende de los nombres previos a SSA
+            n = 2
+            while f"{names[0]}.{n}" in used:
+                n += 1
+            final[rep] = f"{names[0]}.{n}"
+        used.add(final[rep])
+
+    def rename(x: Optional[Operand]) -> Optional[Operand]:
+        if not _is_name(x):
+            return x
+        return _like(x, final[classes.find(str(x))])
+
+    # 4) reescritura; las copias de cada grupo se secuencializan juntas
+    in_group = {id(q): g for g, group in enumerate(groups) for q in group}
+    for blk in fn.blocks:
+        out: List[Quadruple] = []
+        done: Set[int] = set()
+        for q in blk.quads:
+            g = in_group.get(id(q))
+            if g is None:
+                out.append(Quadruple(q.op, rename(q.a), rename(q.b), rename(q.dst)))
+                continue
+            if g in done:
+                continue
+            done.add(g)
+            pairs = [(rename(c.dst), rename(c.a)) for c in groups[g]]
+            out += [_copy(d, s) for d, s in sequentialize(pairs, fresh)]
+        blk.quads = [q for q in out if not (q.op == ":=" and _is_name(q.a) and q.a == q.dst)]
+    _drop_empty_splits(fn)
+
+
+def _drop_empty_splits(fn: FunctionCFG) -> None:
+    """Quita los bloques partidos que no recibieron copias y el label de entrada."""
+    # nadie salta a Lssa_entry ni a Lssa_keep: solo separaban bloques
+    quads = [q for q in fn.quads()
+             if not (q.op == "label" and str(q.dst).startswith((ENTRY_PREFIX, KEEP_PREFIX)))]
+    redirect: Dict[str, Label] = {}
+    drop: Set[int] = set()
+    for i, q in enumerate(quads):
+        if q.op != "label" or not str(q.dst).startswith(SPLIT_PREFIX):
+            continue
+        nxt = quads[i + 1] if i + 1 < len(quads) else None
+        if nxt is not None and nxt.op == "goto":
+            redirect[str(q.dst)] = nxt.dst
+            drop.update((i, i + 1))
+        elif nxt is None or nxt.op == "label":
+            drop.add(i)
+    quads = [q for i, q in enumerate(quads) if i not in drop]
+    for i, q in enumerate(quads):
+        if q.op in ("goto", "ifgoto") and str(q.dst) in redirect:
+            quads[i] = Quadruple(q.op, q.a, q.b, redirect[str(q.dst)])
+    # 'goto Lssa_end' justo antes de su label: la zona de bloques partidos quedó vacía
+    out: List[Quadruple] = []
+    for q in quads:
+        if (q.op == "label" and str(q.dst).startswith(END_PREFIX)
+                and out and out[-1].op == "goto" and out[-1].dst == q.dst):
+            out.pop()
+            continue
+        out.append(q)
+    fn.set_quads(out)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Optional
-from .tac_ir import TACProgram, Operand, Const, Var, Temp, Label, Addr
+from typing import Callable, List, Optional, Union
+from .tac_ir import NEGATED_REL, TACProgram, Operand, Const, Var, Temp, Label, Addr
 from .temp_alloc import TempAllocator
 from .label_mgr import LabelManager
 
@@ -10,6 +10,28 @@ class ExprResult:
     value: Operand
     is_temp: bool = False
 
+# Condiciones sin evaluar para gen_cond_jump (código de saltos). Las hojas son
+# un ExprResult ya evaluado o un callback que lo genera cuando toca.
+@dataclass
+class RelCond:
+    op: str
+    lhs_cb: Callable[[], ExprResult]
+    rhs_cb: Callable[[], ExprResult]
+
+@dataclass
+class AndCond:
+    parts: List["Cond"]
+
+@dataclass
+class OrCond:
+    parts: List["Cond"]
+
+@dataclass
+class NotCond:
+    cond: "Cond"
+
+Cond = Union[RelCond, AndCond, OrCond, NotCond, ExprResult, Callable[[], ExprResult]]
+
 class TACBuilder:
     """
     Builder de TAC centrado en EXPRESIONES y helpers de control mínimos.
@@ -113,43 +135,112 @@ class TACBuilder:
 
         return ExprResult(res, is_temp=True)
 
+    # Código de saltos
+    def gen_cond_jump(self, cond: Cond, true_lbl: Optional[Label], false_lbl: Optional[Label]) -> None:
+        """
+        Salta a true_lbl si cond es verdadera y a false_lbl si no; None en
+        cualquiera de los dos es seguir de largo. Un relacional salta directo
+        (negado si solo hay destino falso) y &&, || y ! solo reparten labels:
+        no se materializa ningún 0/1 y el lado derecho se evalúa solo si hace falta.
+        """
+        if isinstance(cond, NotCond):
+            self.gen_cond_jump(cond.cond, false_lbl, true_lbl)
+            return
+
+        if isinstance(cond, (AndCond, OrCond)):
+            is_and = isinstance(cond, AndCond)
+            # el corto circuito necesita un destino aunque el llamador siga de largo
+            short = false_lbl if is_and else true_lbl
+            L_short = short or self.labels.new()
+            for part in cond.parts[:-1]:
+                if is_and:
+                    self.gen_cond_jump(part, None, L_short)
+                else:
+                    self.gen_cond_jump(part, L_short, None)
+            self.gen_cond_jump(cond.parts[-1], true_lbl, false_lbl)
+            if short is None:
+                self.tac.label(L_short)
+            return
+
+        if isinstance(cond, RelCond):
+            L, R = cond.lhs_cb(), cond.rhs_cb()
+            if true_lbl is None and false_lbl is None:
+                self.tmps.free(self._binop(cond.op, L, R).value)
+                return
+            op = cond.op if true_lbl is not None else NEGATED_REL[cond.op]
+            t = self._binop(op, L, R)
+            self.tac.emit("ifgoto", t.value, None, true_lbl or false_lbl)
+            if true_lbl is not None and false_lbl is not None:
+                self.tac.emit("goto", None, None, false_lbl)
+            self.tmps.free(t.value)
+            return
+
+        E = cond if isinstance(cond, ExprResult) else cond()
+        if isinstance(E.value, Const):
+            target = true_lbl if E.value.value else false_lbl
+            if target is not None:
+                self.tac.emit("goto", None, None, target)
+            return
+        if true_lbl is not None:
+            self.tac.emit("ifgoto", E.value, None, true_lbl)
+            if false_lbl is not None:
+                self.tac.emit("goto", None, None, false_lbl)
+        elif false_lbl is not None:
+            L_true = self.labels.new()
+            self.tac.emit("ifgoto", E.value, None, L_true)
+            self.tac.emit("goto", None, None, false_lbl)
+            self.tac.label(L_true)
+        if E.is_temp and isinstance(E.value, Temp):
+            self.tmps.free(E.value)
+
+    def gen_expr_cond(self, cond: Cond) -> ExprResult:
+        """Valor 0/1 de una condición (p.ej. 'x = a && b') usando código de saltos."""
+        res = self.tmps.new()
+        L_false = self.labels.new()
+        L_end = self.labels.new()
+        self.gen_cond_jump(cond, None, L_false)
+        self.tac.emit(":=", Const(1), None, res)
+        self.tac.emit("goto", None, None, L_end)
+        self.tac.label(L_false)
+        self.tac.emit(":=", Const(0), None, res)
+        self.tac.label(L_end)
+        return ExprResult(res, is_temp=True)
+
     # Demo de statement: print
     def gen_stmt_print(self, expr: ExprResult) -> None:
         self.tac.emit("print", expr.value)
         if expr.is_temp and isinstance(expr.value, Temp):
             self.tmps.free(expr.value)
 
-    def gen_stmt_if(self, cond: ExprResult, then_body_cb, else_body_cb=None) -> None:
-        L_then = self.labels.new()
+    def gen_stmt_if(self, cond: Cond, then_body_cb, else_body_cb=None) -> None:
         L_end  = self.labels.new()
         L_else = self.labels.new() if else_body_cb else L_end
-        self.tac.emit("ifgoto", cond.value, None, L_then)
-        self.tac.emit("goto", None, None, L_else)
-        self.tac.label(L_then)
+        # el then queda a continuación: solo se salta cuando la condición es falsa
+        self.gen_cond_jump(cond, None, L_else)
         then_body_cb(self)
         if else_body_cb:
             self.tac.emit("goto", None, None, L_end)
             self.tac.label(L_else)
             else_body_cb(self)
         self.tac.label(L_end)
-        if cond.is_temp and isinstance(cond.value, Temp):
-            self.tmps.free(cond.value)
 
     # ============================
     # CONTROL DE FLUJO (Persona B)
     # ============================
 
     def gen_stmt_while(self, cond_cb, body_cb) -> None:
-        """Genera TAC para un ciclo while(cond) { body }"""
+        """
+        Genera TAC para un ciclo while(cond) { body }. La condición va al final
+        (se entra saltando a ella): cada vuelta es el cuerpo más un solo salto
+        condicional de regreso. cond_cb devuelve un ExprResult o una condición
+        sin evaluar (RelCond/AndCond/...) para gen_cond_jump.
+        """
         L_start = self.labels.new("Lwhile_start")
         L_body  = self.labels.new("Lwhile_body")
         L_end   = self.labels.new("Lwhile_end")
 
         # Empieza el ciclo
-        self.tac.label(L_start)
-        cond = cond_cb(self)
-        self.tac.emit("ifgoto", cond.value, None, L_body)
-        self.tac.emit("goto", None, None, L_end)
+        self.tac.emit("goto", None, None, L_start)
 
         # Registrar etiquetas de loop
         self.labels.push_loop(continue_lbl=L_start, break_lbl=L_end)
@@ -157,14 +248,12 @@ class TACBuilder:
         # Cuerpo
         self.tac.label(L_body)
         body_cb(self)
-        self.tac.emit("goto", None, None, L_start)
-
-        # Fin del ciclo
         self.labels.pop_loop()
-        self.tac.label(L_end)
 
-        if cond.is_temp and isinstance(cond.value, Temp):
-            self.tmps.free(cond.value)
+        # Condición: vuelve al cuerpo o sigue de largo al fin
+        self.tac.label(L_start)
+        self.gen_cond_jump(cond_cb(self), L_body, None)
+        self.tac.label(L_end)
 
     def gen_stmt_do_while(self, body_cb, cond_cb) -> None:
         """Genera TAC para un ciclo do { body } while(cond)"""
@@ -179,15 +268,11 @@ class TACBuilder:
         self.labels.pop_loop()
 
         self.tac.label(L_cond)
-        cond = cond_cb(self)
-        self.tac.emit("ifgoto", cond.value, None, L_body)
+        self.gen_cond_jump(cond_cb(self), L_body, None)
         self.tac.label(L_end)
 
-        if cond.is_temp and isinstance(cond.value, Temp):
-            self.tmps.free(cond.value)
-
     def gen_stmt_for(self, init_cb, cond_cb, step_cb, body_cb) -> None:
-        """Genera TAC para for(init; cond; step) { body }"""
+        """Genera TAC para for(init; cond; step) { body }, con la condición al final como while"""
         L_cond = self.labels.new("Lfor_cond")
         L_body = self.labels.new("Lfor_body")
         L_step = self.labels.new("Lfor_step")
@@ -196,11 +281,7 @@ class TACBuilder:
         # init
         if init_cb:
             init_cb(self)
-
-        self.tac.label(L_cond)
-        cond = cond_cb(self)
-        self.tac.emit("ifgoto", cond.value, None, L_body)
-        self.tac.emit("goto", None, None, L_end)
+        self.tac.emit("goto", None, None, L_cond)
 
         self.labels.push_loop(continue_lbl=L_step, break_lbl=L_end)
 
@@ -209,14 +290,12 @@ class TACBuilder:
         self.tac.label(L_step)
         if step_cb:
             step_cb(self)
-        self.tac.emit("goto", None, None, L_cond)
 
         self.labels.pop_loop()
+        self.tac.label(L_cond)
+        self.gen_cond_jump(cond_cb(self), L_body, None)
         self.tac.label(L_end)
 
-        if cond.is_temp and isinstance(cond.value, Temp):
-            self.tmps.free(cond.value)
-
     def gen_stmt_break(self) -> None:
         """Salto a la etiqueta break del bucle actual"""
         self.tac.emit("goto", None, None, self.labels.current_break)
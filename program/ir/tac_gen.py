@@ -1,6 +1,6 @@
 from program.CompiscriptVisitor import CompiscriptVisitor
 from program.CompiscriptParser import CompiscriptParser
-from program.ir.tac_builder import TACBuilder, ExprResult
+from program.ir.tac_builder import TACBuilder, ExprResult, RelCond, AndCond, OrCond, NotCond
 from program.ir.tac_ir import Var, Const, Addr  
 from program.semantic.symbols import VarSymbol, FuncSymbol, ClassSymbol
 from program.semantic.table import SymbolTable
@@ -44,6 +44,8 @@ class TACGen(CompiscriptVisitor):
         """
         Devuelve Addr("fp", offset_en_palabras) si 'name' vive en el AR
         de la función actual (param/local/this). Si no, None.
+        Los params que llegan en $a0..$a3 (slot.reg) se direccionan igual, por
+        su home [fp+2..5]: el backend lo llena en el prólogo solo si aparece aquí.
         """
         fn = self._current_fn_sym()
         if not fn or not getattr(fn, "activation_record", None):
@@ -133,12 +135,9 @@ class TACGen(CompiscriptVisitor):
         if len(ctx.equalityExpr()) == 1:
             return self.visit(ctx.equalityExpr(0))
 
-        # Caso con múltiples && encadenados
-        L = self.visit(ctx.equalityExpr(0))
-        for i in range(1, len(ctx.equalityExpr())):
-            R = self.visit(ctx.equalityExpr(i))
-            L = self.b.gen_expr_and(L, lambda R=R: R)
-        return L
+        # Caso con múltiples && encadenados: código de saltos, el lado derecho
+        # solo se evalúa si el izquierdo fue verdadero
+        return self.b.gen_expr_cond(self._cond(ctx))
 
     def visitLogicalOrExpr(self, ctx):
         # Si solo hay una subexpresión, devuélvela directamente
@@ -146,11 +145,55 @@ class TACGen(CompiscriptVisitor):
             return self.visit(ctx.logicalAndExpr(0))
 
         # Caso con múltiples || encadenados
-        L = self.visit(ctx.logicalAndExpr(0))
-        for i in range(1, len(ctx.logicalAndExpr())):
-            R = self.visit(ctx.logicalAndExpr(i))
-            L = self.b.gen_expr_or(L, lambda R=R: R)
-        return L
+        return self.b.gen_expr_cond(self._cond(ctx))
+
+    def _cond(self, ctx):
+        """
+        Condición sin evaluar (para gen_cond_jump) de una expresión: &&, ||, !
+        y los relacionales de dos operandos se vuelven saltos; cualquier otra
+        cosa es una hoja que se evalúa a un valor cuando toca.
+        """
+        P = CompiscriptParser
+        while True:
+            if isinstance(ctx, P.ExpressionContext):
+                ctx = ctx.assignmentExpr()
+            elif isinstance(ctx, P.ExprNoAssignContext):
+                ctx = ctx.conditionalExpr()
+            elif isinstance(ctx, P.TernaryExprContext) and ctx.getChildCount() == 1:
+                ctx = ctx.logicalOrExpr()
+            elif isinstance(ctx, P.LogicalOrExprContext):
+                parts = ctx.logicalAndExpr()
+                if len(parts) > 1:
+                    return OrCond([self._cond(x) for x in parts])
+                ctx = parts[0]
+            elif isinstance(ctx, P.LogicalAndExprContext):
+                parts = ctx.equalityExpr()
+                if len(parts) > 1:
+                    return AndCond([self._cond(x) for x in parts])
+                ctx = parts[0]
+            elif isinstance(ctx, (P.EqualityExprContext, P.RelationalExprContext)):
+                parts = ctx.relationalExpr() if isinstance(ctx, P.EqualityExprContext) else ctx.additiveExpr()
+                if len(parts) == 2:
+                    op = ctx.getChild(1).getText()
+                    return RelCond(op, lambda c=parts[0]: self.visit(c), lambda c=parts[1]: self.visit(c))
+                if len(parts) != 1:
+                    break
+                ctx = parts[0]
+            elif isinstance(ctx, P.AdditiveExprContext) and len(ctx.multiplicativeExpr()) == 1:
+                ctx = ctx.multiplicativeExpr(0)
+            elif isinstance(ctx, P.MultiplicativeExprContext) and len(ctx.unaryExpr()) == 1:
+                ctx = ctx.unaryExpr(0)
+            elif isinstance(ctx, P.UnaryExprContext) and ctx.getChildCount() == 2:
+                if ctx.getChild(0).getText() == "!":
+                    return NotCond(self._cond(ctx.unaryExpr()))
+                break
+            elif isinstance(ctx, P.UnaryExprContext):
+                ctx = ctx.primaryExpr()
+            elif isinstance(ctx, P.PrimaryExprContext) and ctx.expression():
+                ctx = ctx.expression()
+            else:
+                break
+        return lambda c=ctx: self.visit(c)
 
 
     def visitUnaryExpr(self, ctx):
@@ -406,7 +449,7 @@ class TACGen(CompiscriptVisitor):
         return None
 
     def visitIfStatement(self, ctx):
-        cond = self.visit(ctx.expression())
+        cond = self._cond(ctx.expression())
         def then_cb(b): self.visit(ctx.block(0))
         def else_cb(b): self.visit(ctx.block(1)) if len(ctx.block()) > 1 else None
         if len(ctx.block()) > 1:
@@ -423,7 +466,7 @@ class TACGen(CompiscriptVisitor):
         """
         def cond_cb(b):
             if ctx.expression():
-                return self.visit(ctx.expression())
+                return self._cond(ctx.expression())
             return self.b.gen_expr_literal(1)  # por si falta expresión
 
         def body_cb(b):
@@ -493,7 +536,7 @@ class TACGen(CompiscriptVisitor):
 
         def cond_cb(b):
             if ctx.expression():
-                return self.visit(ctx.expression())
+                return self._cond(ctx.expression())
             return self.b.gen_expr_literal(1)
 
         self.b.gen_stmt_do_while(body_cb, cond_cb)
@@ -518,7 +561,7 @@ class TACGen(CompiscriptVisitor):
         def cond_cb(b):
             exprs = ctx.expression()
             if len(exprs) >= 1:
-                return self.visit(exprs[0])
+                return self._cond(exprs[0])
             return self.b.gen_expr_literal(1)
 
         def step_cb(b):
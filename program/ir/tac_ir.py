@@ -1,7 +1,11 @@
 # program/ir/tac_ir.py
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import List, Optional, Union
+from typing import List, Optional, Tuple, Union
+
+# relacional -> su negación (el TAC solo tiene 'if x goto L', saltar si es falso
+# es saltar con el relacional negado)
+NEGATED_REL = {"<": ">=", ">=": "<", ">": "<=", "<=": ">", "==": "!=", "!=": "=="}
 
 class Operand:
     def __str__(self) -> str:
@@ -50,8 +54,12 @@ class Quadruple:
     a: Optional[Operand] = None
     b: Optional[Operand] = None
     dst: Optional[Operand] = None
+    # Solo 'phi' (forma SSA, ver ir/ssa.py): (id del bloque predecesor, valor)
+    args: Tuple[Tuple[int, Operand], ...] = ()
 
     def __repr__(self) -> str:
+        if self.op == "phi":
+            return f"{self.dst} := phi(" + ", ".join(f"B{p}: {v}" for p, v in self.args) + ")"
         if self.op == "label":
             return f"{self.dst}:"
         if self.op == "goto":
@@ -87,12 +95,20 @@ class Quadruple:
 @dataclass
 class TACProgram:
     code: List[Quadruple] = field(default_factory=list)
+    # Cambia con cada modificación del código; invalida el CFG en caché (ir/cfg.py)
+    version: int = field(default=0, compare=False)
+    _cfg: Optional[object] = field(default=None, repr=False, compare=False)
 
     def emit(self, op: str, a: Optional[Operand] = None, b: Optional[Operand] = None, dst: Optional[Operand] = None) -> Quadruple:
         q = Quadruple(op, a, b, dst)
         self.code.append(q)
+        self.version += 1
         return q
 
+    def invalidate(self) -> None:
+        """Para passes que editan self.code directamente."""
+        self.version += 1
+
     def label(self, lbl: Label) -> Quadruple:
         return self.emit("label", dst=lbl)
 
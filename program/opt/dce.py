@@ -0,0 +1,185 @@
+# program/opt/dce.py
+#
+# Eliminación de código muerto sobre el CFG de cada función.
+#
+# - Bloques inalcanzables desde la entrada (p.ej. el 'ret null' que
+#   gen_fn_end agrega después de un return explícito) se eliminan.
+# - Liveness de Vars/Temps: un quad sin efectos cuyo dst no está vivo después
+#   se elimina (:=, aritmética, relacionales, addr_field/addr_index, len, load).
+#   call, print, param, store, alloc y alloc_array se quedan; de un 'call' con
+#   resultado muerto solo se quita el dst (gen_call siempre pide un temporal).
+# - Stores muertos al frame: 'store v, [fp±k]' se elimina si ningún load lee
+#   ese slot antes de que otro store lo pise o la función termine. Los slots
+#   no tienen alias salvo que su dirección aparezca en otro quad (addr_field,
+#   param, ...); esos se dejan como están.
+# - Labels a los que no salta nadie se quitan (los bloques se fusionan).
+#
+# Las Vars de main que otra función lee por nombre nunca están muertas.
+
+from typing import List, Optional, Set
+
+from program.ir.cfg import FunctionCFG, postorder, program_cfg, quad_defs_uses
+from program.ir.tac_ir import Addr, Operand, Quadruple, TACProgram
+
+from .fold import FOLDABLE_OPS
+from .pass_manager import Pass, register_pass
+
+# quads cuyo único efecto es escribir dst
+PURE_OPS = (":=", "addr_field", "addr_index", "len", "load") + FOLDABLE_OPS
+
+
+def _frame_slot(x: Optional[Operand]) -> Optional[int]:
+    if isinstance(x, Addr) and str(x.base) == "fp":
+        return x.offset
+    return None
+
+
+def _escaped_slots(quads: List[Quadruple]) -> Set[int]:
+    """Slots cuya dirección se usa para algo más que load/store directo."""
+    escaped: Set[int] = set()
+    for q in quads:
+        for role, x in (("a", q.a), ("b", q.b), ("dst", q.dst)):
+            off = _frame_slot(x)
+            if off is None:
+                continue
+            if not ((q.op == "load" and role == "a") or (q.op == "store" and role == "b")):
+                escaped.add(off)
+    return escaped
+
+
+def remove_unreachable(fn: FunctionCFG) -> bool:
+    reach = fn.reachable()
+    if len(reach) == len(fn.blocks):
+        return False
+    fn.set_quads([q for blk in fn.blocks if blk.id in reach for q in blk.quads])
+    return True
+
+
+def remove_dead_code(fn: FunctionCFG, keep: Set[str]) -> bool:
+    """Quita quads puros con dst muerto y el dst muerto de los 'call'."""
+    changed = False
+    while True:
+        live_out = fn.live_out()
+        removed = False
+        for blk in fn.blocks:
+            live = set(live_out[blk.id]) | keep
+            kept: List[Quadruple] = []
+            for q in reversed(blk.quads):
+                defs, uses = quad_defs_uses(q)
+                if defs and not (defs & live):
+                    if q.op in PURE_OPS:
+                        removed = True
+                        continue
+                    if q.op == "call":
+                        q = Quadruple(q.op, q.a, q.b, None)
+                        removed = True
+                        defs = set()
+                live = (live - defs) | uses
+                kept.append(q)
+            blk.quads = kept[::-1]
+        if not removed:
+            return changed
+        changed = True
+        fn.invalidate()
+
+
+def _slot_live_out(fn: FunctionCFG, slots: Set[int]) -> List[Set[int]]:
+    """Slots (de 'slots') leídos en algún camino antes de ser escritos."""
+    gen: List[Set[int]] = []
+    kill: List[Set[int]] = []
+    for blk in fn.blocks:
+        g: Set[int] = set()
+        k: Set[int] = set()
+        for q in reversed(blk.quads):
+            if q.op == "store" and _frame_slot(q.b) in slots:
+                g.discard(q.b.offset)
+                k.add(q.b.offset)
+            elif q.op == "load" and _frame_slot(q.a) in slots:
+                g.add(q.a.offset)
+        gen.append(g)
+        kill.append(k)
+    live_in: List[Set[int]] = [set() for _ in fn.blocks]
+    live_out: List[Set[int]] = [set() for _ in fn.blocks]
+    order = postorder([blk.succs for blk in fn.blocks])
+    changed = True
+    while changed:
+        changed = False
+        for b in order:
+            out = set().union(*(live_in[s] for s in fn.blocks[b].succs))
+            new_in = gen[b] | (out - kill[b])
+            if out != live_out[b] or new_in != live_in[b]:
+                live_out[b], live_in[b] = out, new_in
+                changed = True
+    return live_out
+
+
+def remove_dead_stores(fn: FunctionCFG) -> bool:
+    quads = fn.quads()
+    slots = {_frame_slot(q.b) for q in quads if q.op == "store"} - {None}
+    slots -= _escaped_slots(quads)
+    if not slots:
+        return False
+    live_out = _slot_live_out(fn, slots)
+    changed = False
+    for blk in fn.blocks:
+        live = set(live_out[blk.id])
+        kept: List[Quadruple] = []
+        for q in reversed(blk.quads):
+            off = _frame_slot(q.b) if q.op == "store" else None
+            if off in slots:
+                if off not in live:
+                    changed = True
+                    continue
+                live.discard(off)
+            elif q.op == "load" and _frame_slot(q.a) in slots:
+                live.add(q.a.offset)
+            kept.append(q)
+        blk.quads = kept[::-1]
+    if changed:
+        fn.invalidate()
+    return changed
+
+
+def remove_unused_labels(fn: FunctionCFG, targets: Set[str]) -> bool:
+    quads = [q for q in fn.quads() if not (q.op == "label" and str(q.dst) not in targets)]
+    if len(quads) == len(fn.quads()):
+        return False
+    fn.set_quads(quads)
+    return True
+
+
+def _jump_targets(quads: List[Quadruple]) -> Set[str]:
+    return {str(q.dst) for q in quads if q.op in ("goto", "ifgoto", "if_goto")}
+
+
+def eliminate_function(fn: FunctionCFG, keep: Set[str]) -> bool:
+    """Bloques inalcanzables, código muerto y stores muertos de una función."""
+    changed = remove_unreachable(fn)
+    changed |= remove_dead_code(fn, keep)
+    # un store muerto deja muerto el valor que guardaba
+    while remove_dead_stores(fn):
+        changed = True
+        if not remove_dead_code(fn, keep):
+            break
+    return changed
+
+
+@register_pass
+class DCE(Pass):
+    """Código muerto, stores muertos al frame, bloques inalcanzables y labels sin uso."""
+
+    name = "dce"
+
+    def run(self, tac: TACProgram) -> bool:
+        cfg = program_cfg(tac)
+        keep = cfg.global_names()
+        changed = False
+        for fn in cfg:
+            changed |= eliminate_function(fn, keep)
+        # los labels se cuentan después: quitar bloques también quita saltos
+        targets = _jump_targets(cfg.quads())
+        for fn in cfg:
+            changed |= remove_unused_labels(fn, targets)
+        if changed:
+            cfg.commit()
+        return changed
@@ -0,0 +1,67 @@
+# program/opt/fold.py
+#
+# Evaluación de quads con operandos constantes, con la misma semántica que el
+# backend MIPS:
+#   - enteros de 32 bits con signo, con wrap-around (addu/subu/mul -> 32 bits bajos)
+#   - '/' y '%' como 'div': cociente truncado hacia cero, resto con el signo
+#     del dividendo; nunca se pliega una división por cero ni INT_MIN / -1
+#     (en MIPS el resultado no está definido)
+#   - relacionales -> 0/1
+#   - true/false cuentan como 1/0; null y strings no son constantes enteras
+
+from typing import Optional
+
+from program.ir.tac_ir import Const, Operand
+
+INT_MIN = -(1 << 31)
+INT_MAX = (1 << 31) - 1
+
+ARITH_OPS = ("+", "-", "*", "/", "%")
+REL_OPS = ("<", "<=", ">", ">=", "==", "!=")
+FOLDABLE_OPS = ARITH_OPS + REL_OPS
+
+
+def wrap32(v: int) -> int:
+    """Reduce v a un entero de 32 bits con signo (complemento a 2)."""
+    return ((v - INT_MIN) & 0xFFFFFFFF) + INT_MIN
+
+
+def const_int(x: Optional[Operand]) -> Optional[int]:
+    """Valor entero de un Const (bool -> 0/1); None si no es un entero literal."""
+    if isinstance(x, Const):
+        v = x.value
+        if isinstance(v, bool):
+            return int(v)
+        if isinstance(v, int):
+            return wrap32(v)
+    return None
+
+
+def fold_binop(op: str, x: int, y: int) -> Optional[int]:
+    """Resultado de 'x op y' o None si no se puede (o no se debe) plegar."""
+    if op == "+":
+        return wrap32(x + y)
+    if op == "-":
+        return wrap32(x - y)
+    if op == "*":
+        return wrap32(x * y)
+    if op in ("/", "%"):
+        if y == 0 or (x == INT_MIN and y == -1):
+            return None
+        q = abs(x) // abs(y)
+        if (x < 0) != (y < 0):
+            q = -q
+        return wrap32(q) if op == "/" else wrap32(x - y * q)
+    if op == "<":
+        return int(x < y)
+    if op == "<=":
+        return int(x <= y)
+    if op == ">":
+        return int(x > y)
+    if op == ">=":
+        return int(x >= y)
+    if op == "==":
+        return int(x == y)
+    if op == "!=":
+        return int(x != y)
+    return None
@@ -0,0 +1,303 @@
+# program/opt/gvn.py
+#
+# Numeración de valores: elimina cálculos redundantes (aritmética,
+# relacionales, addr_field/addr_index) y loads que ningún store intermedio pudo
+# cambiar.
+#
+# - 'lvn': numeración local, cada bloque básico empieza con la tabla vacía.
+# - 'gvn': la tabla de un bloque parte de la de su dominador inmediato
+#   (recorrido del árbol de dominadores). Como el TAC no está en SSA, al entrar
+#   a un bloque se invalidan los nombres redefinidos y la memoria escrita en
+#   cualquier bloque de los caminos idom -> bloque.
+#
+# Cada nombre (Var/Temp) tiene un número de valor; una expresión se identifica
+# por (op, números de sus operandos) y recuerda qué nombre la contiene. Si la
+# expresión ya está disponible y ese nombre no fue redefinido, el quad pasa a
+# 'dst := nombre'. Las constantes enteras también tienen número, así que
+# t1 := 5 y t2 := 5 son el mismo valor.
+#
+# Memoria: los slots del frame ([fp+k]) no tienen alias (no hay '&'), así que
+# un store a [fp+k] solo invalida los loads de ese slot. Un store a través de
+# un puntero invalida todos los loads del heap (punteros y len). Un 'call'
+# invalida el heap y también los loads del frame: el callee no los cambia,
+# pero repetir un 'lw' es más barato que mantener el valor vivo a través de
+# la llamada (obliga a usar un $s* con su save/restore). Un 'call' además da
+# un número nuevo a los globales de main que usan otras funciones.
+# Después de 'store v, a', un 'load a' se reemplaza por v.
+#
+# Los quads con literales string no se numeran: el backend trata aparte
+# "s" + x (prefijo de print) y los nombres que reciben un literal string.
+
+from typing import Dict, List, Optional, Set, Tuple
+
+from program.ir.cfg import FunctionCFG, program_cfg
+from program.ir.tac_ir import Addr, Const, Operand, Quadruple, TACProgram, Temp, Var
+
+from .fold import FOLDABLE_OPS, const_int
+from .pass_manager import Pass, register_pass
+
+COMMUTATIVE_OPS = ("+", "*", "==", "!=")
+# quads puros de dos operandos que se pueden numerar
+VALUE_OPS = FOLDABLE_OPS + ("addr_field", "addr_index")
+
+
+def _is_name(x: Optional[Operand]) -> bool:
+    return isinstance(x, (Var, Temp))
+
+
+def _frame_slot(x: Optional[Operand]) -> Optional[str]:
+    """'[fp+k]' si x es un slot del frame."""
+    if isinstance(x, Addr) and str(x.base) == "fp":
+        return str(x)
+    return None
+
+
+class _Table:
+    """Estado de la numeración en un punto del programa (se copia por bloque)."""
+
+    def __init__(self, counter: List[int], shared: Set[str]):
+        self._counter = counter
+        # globales de main que otras funciones pueden escribir (cambian en un call)
+        self.shared = shared
+        self.vn: Dict[str, int] = {}
+        self.consts: Dict[object, int] = {}
+        # clave de expresión -> (número, operando que la contiene)
+        self.exprs: Dict[tuple, Tuple[int, Operand]] = {}
+        # versión de la memoria: por slot del frame, una para todo el frame
+        # (cambia con cada call) y una para todo el heap
+        self.slot_epoch: Dict[str, int] = {}
+        self.frame_epoch = 0
+        self.heap_epoch = 0
+
+    def copy(self) -> "_Table":
+        t = _Table(self._counter, self.shared)
+        t.vn = dict(self.vn)
+        t.consts = dict(self.consts)
+        t.exprs = dict(self.exprs)
+        t.slot_epoch = dict(self.slot_epoch)
+        t.frame_epoch = self.frame_epoch
+        t.heap_epoch = self.heap_epoch
+        return t
+
+    def fresh(self) -> int:
+        self._counter[0] += 1
+        return self._counter[0]
+
+    def redefine(self, name: str) -> int:
+        self.vn[name] = self.fresh()
+        return self.vn[name]
+
+    def value(self, x: Optional[Operand]) -> Optional[object]:
+        """Número de valor de un operando (None si no se puede numerar)."""
+        if _is_name(x):
+            name = str(x)
+            if name not in self.vn:
+                self.vn[name] = self.fresh()
+            return self.vn[name]
+        if isinstance(x, Const):
+            if isinstance(x.value, str):
+                return None
+            key = const_int(x) if const_int(x) is not None else repr(x)
+            if key not in self.consts:
+                self.consts[key] = self.fresh()
+            return self.consts[key]
+        return None
+
+    def holder_valid(self, holder: Operand, number: int) -> bool:
+        return isinstance(holder, Const) or self.vn.get(str(holder)) == number
+
+    # ---------- memoria ----------
+    def load_key(self, addr: Optional[Operand]) -> Optional[tuple]:
+        slot = _frame_slot(addr)
+        if slot is not None:
+            return ("load", slot, self.slot_epoch.get(slot, 0), self.frame_epoch)
+        if isinstance(addr, Addr):
+            base = self.value(addr.base) if _is_name(addr.base) else str(addr.base)
+            return ("load", ("addr", base, addr.offset), self.heap_epoch)
+        v = self.value(addr)
+        return None if v is None else ("load", v, self.heap_epoch)
+
+    def write_slot(self, slot: str) -> None:
+        self.slot_epoch[slot] = self.slot_epoch.get(slot, 0) + 1
+
+    def write_heap(self) -> None:
+        self.heap_epoch += 1
+
+    def call(self) -> None:
+        self.frame_epoch += 1
+        self.write_heap()
+        for name in self.shared:
+            if name in self.vn:
+                self.redefine(name)
+
+
+def _expr_key(q: Quadruple, t: _Table) -> Optional[tuple]:
+    if q.op in VALUE_OPS:
+        x, y = t.value(q.a), t.value(q.b)
+        if x is None or y is None:
+            return None
+        if q.op in COMMUTATIVE_OPS and y < x:
+            x, y = y, x
+        return (q.op, x, y)
+    if q.op == "load":
+        return t.load_key(q.a)
+    if q.op == "len":
+        v = t.value(q.a)
+        return None if v is None else ("len", v, t.heap_epoch)
+    return None
+
+
+def _number_block(quads: List[Quadruple], t: _Table) -> Tuple[List[Quadruple], bool]:
+    out: List[Quadruple] = []
+    changed = False
+    for q in quads:
+        if q.op == "store":
+            number = t.value(q.a)
+            slot = _frame_slot(q.b)
+            if slot is not None:
+                t.write_slot(slot)
+            else:
+                t.write_heap()
+            key = t.load_key(q.b)
+            if key is not None and number is not None:
+                t.exprs[key] = (number, q.a)
+            out.append(q)
+            continue
+        if q.op == "call":
+            t.call()
+
+        if not _is_name(q.dst):
+            out.append(q)
+            continue
+
+        dst = str(q.dst)
+        if q.op == ":=":
+            number = t.value(q.a)
+            if number is None:
+                t.redefine(dst)
+            else:
+                t.vn[dst] = number
+            out.append(q)
+            continue
+
+        key = _expr_key(q, t)
+        hit = t.exprs.get(key) if key is not None else None
+        if hit is not None and t.holder_valid(hit[1], hit[0]):
+            number, holder = hit
+            # 'dst := dst' no hace falta: dst ya tiene ese valor
+            if holder != q.dst:
+                out.append(Quadruple(":=", holder, None, q.dst))
+            t.vn[dst] = number
+            changed = True
+            continue
+        number = t.redefine(dst)
+        if key is not None:
+            t.exprs[key] = (number, q.dst)
+        out.append(q)
+    return out, changed
+
+
+def _block_effects(quads: List[Quadruple]) -> Tuple[Set[str], Set[str], bool, bool]:
+    """Nombres definidos, slots del frame escritos, si escribe el heap y si llama."""
+    names: Set[str] = set()
+    slots: Set[str] = set()
+    heap = calls = False
+    for q in quads:
+        if q.op == "store":
+            slot = _frame_slot(q.b)
+            if slot is None:
+                heap = True
+            else:
+                slots.add(slot)
+        elif q.op == "call":
+            calls = True
+        if _is_name(q.dst):
+            names.add(str(q.dst))
+    return names, slots, heap, calls
+
+
+def _between(fn: FunctionCFG, d: int, b: int) -> Set[int]:
+    """Bloques en algún camino d -> b sin contar d (incluye b si está en un ciclo)."""
+    seen: Set[int] = set()
+    stack = list(fn.blocks[b].preds)
+    while stack:
+        x = stack.pop()
+        if x == d or x in seen:
+            continue
+        seen.add(x)
+        stack.extend(fn.blocks[x].preds)
+    return seen
+
+
+def number_function(fn: FunctionCFG, global_scope: bool = True,
+                    shared: Optional[Set[str]] = None) -> bool:
+    """
+    Numera los valores de una función. True si reemplazó algún quad.
+    'shared' son los globales que otras funciones pueden escribir
+    (ProgramCFG.global_names()): un 'call' les da un valor nuevo.
+    """
+    counter = [0]
+    shared = shared or set()
+    changed = False
+    if not global_scope:
+        for blk in fn.blocks:
+            blk.quads, c = _number_block(blk.quads, _Table(counter, shared))
+            changed |= c
+    else:
+        idom = fn.idom()
+        children = fn.dom_children()
+        effects: Dict[int, tuple] = {}
+        tables: Dict[int, _Table] = {}
+        for b in fn.rpo():
+            d = idom[b]
+            if d is None:
+                t = _Table(counter, shared)
+            else:
+                t = tables[d].copy()
+                for x in _between(fn, d, b):
+                    if x not in effects:
+                        effects[x] = _block_effects(fn.blocks[x].quads)
+                    names, slots, heap, calls = effects[x]
+                    for name in names:
+                        t.redefine(name)
+                    for slot in slots:
+                        t.write_slot(slot)
+                    if calls:
+                        t.call()
+                    elif heap:
+                        t.write_heap()
+            blk = fn.blocks[b]
+            blk.quads, c = _number_block(blk.quads, t)
+            effects[b] = _block_effects(blk.quads)
+            changed |= c
+            if children[b]:
+                tables[b] = t
+    if changed:
+        fn.invalidate()
+    return changed
+
+
+@register_pass
+class GVN(Pass):
+    """Numeración de valores sobre el árbol de dominadores."""
+
+    name = "gvn"
+    global_scope = True
+
+    def run(self, tac: TACProgram) -> bool:
+        cfg = program_cfg(tac)
+        shared = cfg.global_names()
+        changed = False
+        for fn in cfg:
+            changed |= number_function(fn, self.global_scope, shared)
+        if changed:
+            cfg.commit()
+        return changed
+
+
+@register_pass
+class LVN(GVN):
+    """Numeración de valores local a cada bloque básico."""
+
+    name = "lvn"
+    global_scope = False
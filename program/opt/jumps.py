@@ -0,0 +1,280 @@
+# program/opt/jumps.py
+#
+# Simplificación de saltos sobre el CFG de cada función.
+#
+# Un &&/|| materializado a 0/1 (gen_expr_cond, gen_expr_and/gen_expr_or) que
+# después se prueba con un if deja cadenas como
+#
+#     < a, b -> t0                      < a, b -> t0
+#     if t0 goto L0                     if t0 goto L0
+#     goto L1                           goto L1
+#   L0:                               L0:
+#     ...                               ...
+#   L3: t1 := 1                       L3: t1 := 1
+#     goto L2                           goto L4
+#   L1: t1 := 0              =>       L1: t1 := 0
+#   L2: if t1 goto L4                   goto L6
+#     goto L6
+#
+# - Threading con condición conocida: un bloque que asigna 'x := k' y sigue a
+#   un bloque que solo hace 'if x goto L' salta directo al destino que toma
+#   ese 'if' (el booleano materializado queda muerto y lo quita dce).
+# - Threading por bloques vacíos: un goto/ifgoto a un bloque que solo tiene
+#   su label y 'goto M' (o nada, y cae al siguiente) salta directo a M.
+# - '== c, 0' sobre un relacional c de un solo uso pasa a ser el relacional
+#   negado, y el 'if' salta sobre la comparación original.
+# - Inversión: 'if c goto L1; goto L2; L1:' pasa a 'if !c goto L2; L1:'
+#   negando el relacional que define c (si c no se usa en otro lado); el
+#   backend fusiona relacional + 'if' en un solo salto, así que negar no cuesta.
+# - 'goto L' / 'if c goto L' justo antes de 'L:' se eliminan.
+#
+# Los bloques que dejan de ser alcanzables y los labels sin uso los quita dce.
+
+from typing import Callable, List, Optional, Set
+
+from program.ir.cfg import BasicBlock, FunctionCFG, program_cfg, quad_defs_uses
+from program.ir.tac_ir import NEGATED_REL, Label, Quadruple, TACProgram, Temp, Var
+
+from .dce import remove_unreachable
+from .fold import REL_OPS, const_int
+from .pass_manager import Pass, register_pass
+
+NewLabel = Callable[[str], Label]
+
+
+def _body(blk: BasicBlock) -> List[Quadruple]:
+    return [q for q in blk.quads if q.op != "label"]
+
+
+def _next(fn: FunctionCFG, blk: BasicBlock) -> Optional[BasicBlock]:
+    return fn.blocks[blk.id + 1] if blk.id + 1 < len(fn.blocks) else None
+
+
+def _last_def(blk: BasicBlock, name: str, end: int) -> Optional[int]:
+    """Índice del último quad de blk[:end] que define name."""
+    for i in range(end - 1, -1, -1):
+        if str(blk.quads[i].dst) == name and isinstance(blk.quads[i].dst, (Var, Temp)):
+            return i
+    return None
+
+
+def _used_between(blk: BasicBlock, name: str, start: int, end: int) -> bool:
+    return any(name in quad_defs_uses(q)[1] for q in blk.quads[start:end])
+
+
+def _label_of(fn: FunctionCFG, blk: BasicBlock, new_label: NewLabel) -> str:
+    """Label de blk; si no tiene, 'goto M' solo -> M, si no se le agrega uno."""
+    if blk.label:
+        return blk.label
+    if len(blk.quads) == 1 and blk.quads[0].op == "goto":
+        return str(blk.quads[0].dst)
+    lbl = new_label("Lthr")
+    blk.quads.insert(0, Quadruple("label", dst=lbl))
+    return str(lbl)
+
+
+# ---------- threading ----------
+
+def thread_known_conditions(fn: FunctionCFG, new_label: NewLabel) -> bool:
+    changed = False
+    for blk in fn.blocks:
+        term = blk.terminator
+        if term is None:
+            succ = _next(fn, blk)
+        elif term.op == "goto":
+            succ = fn.block_of_label(str(term.dst))
+        else:
+            continue
+        if succ is None or succ is blk:
+            continue
+        body = _body(succ)
+        if len(body) != 1 or body[0].op not in ("ifgoto", "if_goto"):
+            continue
+        cond = body[0].a
+        end = len(blk.quads) - (term is not None)
+        i = _last_def(blk, str(cond), end) if isinstance(cond, (Var, Temp)) else None
+        if i is None or blk.quads[i].op != ":=":
+            continue
+        k = const_int(blk.quads[i].a)
+        if k is None:
+            continue
+        if k:
+            target = str(body[0].dst)
+        else:
+            after = _next(fn, succ)
+            if after is None:
+                continue
+            target = _label_of(fn, after, new_label)
+        jump = Quadruple("goto", dst=Label(target))
+        if term is None:
+            blk.quads.append(jump)
+        else:
+            blk.quads[-1] = jump
+        changed = True
+    if changed:
+        fn.invalidate()
+    return changed
+
+
+def _resolve(fn: FunctionCFG, name: str) -> str:
+    """Destino final de un salto a 'name' a través de bloques vacíos."""
+    seen: Set[str] = set()
+    blk = fn.block_of_label(name)
+    while blk is not None and name not in seen:
+        seen.add(name)
+        body = _body(blk)
+        if not body:
+            nxt = _next(fn, blk)
+            if nxt is None or not nxt.label:
+                break
+            name, blk = nxt.label, nxt
+        elif len(body) == 1 and body[0].op == "goto":
+            name = str(body[0].dst)
+            blk = fn.block_of_label(name)
+        else:
+            break
+    return name
+
+
+def thread_jumps(fn: FunctionCFG) -> bool:
+    changed = False
+    for blk in fn.blocks:
+        term = blk.terminator
+        if term is None or term.op not in ("goto", "ifgoto", "if_goto"):
+            continue
+        target = _resolve(fn, str(term.dst))
+        if target != str(term.dst):
+            blk.quads[-1] = Quadruple(term.op, term.a, term.b, Label(target))
+            changed = True
+    if changed:
+        fn.invalidate()
+    return changed
+
+
+# ---------- condiciones ----------
+
+def _single_use_rel(fn: FunctionCFG, blk: BasicBlock, live_out: Set[str]) -> Optional[int]:
+    """
+    Índice del relacional que define la condición del 'if' final de blk, si
+    esa condición no se usa en otro lado (se puede negar en su lugar).
+    """
+    term = blk.terminator
+    if term is None or term.op not in ("ifgoto", "if_goto") or not isinstance(term.a, (Var, Temp)):
+        return None
+    name = str(term.a)
+    if name in live_out:
+        return None
+    end = len(blk.quads) - 1
+    i = _last_def(blk, name, end)
+    if i is None or blk.quads[i].op not in REL_OPS or _used_between(blk, name, i + 1, end):
+        return None
+    return i
+
+
+def fold_negations(fn: FunctionCFG) -> bool:
+    """'rel a, b -> y; == y, 0 -> x; if x goto L' => 'rel! a, b -> x; if x goto L'."""
+    changed = False
+    live_out = fn.live_out()
+    for blk in fn.blocks:
+        i = _single_use_rel(fn, blk, live_out[blk.id])
+        if i is None:
+            continue
+        q = blk.quads[i]
+        if q.op not in ("==", "!=") or const_int(q.b) != 0 or not isinstance(q.a, (Var, Temp)):
+            continue
+        y = str(q.a)
+        if y in live_out[blk.id]:
+            continue
+        j = _last_def(blk, y, i)
+        if j is None or blk.quads[j].op not in REL_OPS:
+            continue
+        inner = blk.quads[j]
+        # y solo lo lee el '== y, 0' y los operandos de inner no cambian antes de i
+        if _used_between(blk, y, j + 1, i) or _used_between(blk, y, i + 1, len(blk.quads)):
+            continue
+        operands = {str(x) for x in (inner.a, inner.b) if isinstance(x, (Var, Temp))}
+        if any(quad_defs_uses(x)[0] & operands for x in blk.quads[j + 1:i]):
+            continue
+        op = NEGATED_REL[inner.op] if q.op == "==" else inner.op
+        blk.quads[i] = Quadruple(op, inner.a, inner.b, q.dst)
+        del blk.quads[j]
+        changed = True
+    if changed:
+        fn.invalidate()
+    return changed
+
+
+def invert_branches(fn: FunctionCFG) -> bool:
+    """'if c goto L1; goto L2; L1:' => 'if !c goto L2; L1:'."""
+    changed = False
+    live_out = fn.live_out()
+    for blk in fn.blocks:
+        jump = _next(fn, blk)
+        after = _next(fn, jump) if jump is not None else None
+        if after is None or jump.quads != _body(jump) or len(jump.quads) != 1 \
+                or jump.quads[0].op != "goto":
+            continue
+        if after.label != str(blk.terminator.dst if blk.terminator else None):
+            continue
+        i = _single_use_rel(fn, blk, live_out[blk.id])
+        if i is None:
+            continue
+        rel = blk.quads[i]
+        term = blk.quads[-1]
+        blk.quads[i] = Quadruple(NEGATED_REL[rel.op], rel.a, rel.b, rel.dst)
+        blk.quads[-1] = Quadruple(term.op, term.a, term.b, jump.quads[0].dst)
+        jump.quads = []
+        changed = True
+    if changed:
+        fn.invalidate()
+    return changed
+
+
+def drop_jumps_to_next(fn: FunctionCFG) -> bool:
+    """Quita 'goto L' / 'if c goto L' cuando L está justo después."""
+    quads = fn.quads()
+    out: List[Quadruple] = []
+    for i, q in enumerate(quads):
+        if q.op in ("goto", "ifgoto", "if_goto"):
+            j = i + 1
+            following: Set[str] = set()
+            while j < len(quads) and quads[j].op == "label":
+                following.add(str(quads[j].dst))
+                j += 1
+            if str(q.dst) in following:
+                continue
+        out.append(q)
+    if len(out) == len(quads):
+        return False
+    fn.set_quads(out)
+    return True
+
+
+def simplify_function(fn: FunctionCFG, new_label: NewLabel) -> bool:
+    changed = False
+    while True:
+        step = remove_unreachable(fn)
+        step |= thread_known_conditions(fn, new_label)
+        step |= thread_jumps(fn)
+        step |= fold_negations(fn)
+        step |= invert_branches(fn)
+        step |= drop_jumps_to_next(fn)
+        if not step:
+            return changed
+        changed = True
+
+
+@register_pass
+class JumpThreading(Pass):
+    """Threading de saltos, inversión de ramas y ramas sobre la comparación original."""
+
+    name = "jumps"
+
+    def run(self, tac: TACProgram) -> bool:
+        cfg = program_cfg(tac)
+        changed = False
+        for fn in cfg:
+            changed |= simplify_function(fn, cfg.new_label)
+        if changed:
+            cfg.commit()
+        return changed
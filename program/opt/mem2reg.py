@@ -0,0 +1,166 @@
+# program/opt/mem2reg.py
+#
+# Promoción de slots del frame a registros virtuales.
+#
+# TACGen lee cada local/param con 'load [fp+k] -> t' y lo escribe con
+# 'store v, [fp+k]', así que un contador de loop hace un lw y un sw por
+# iteración. Si un slot solo aparece como dirección de esos load/store (nadie
+# toma su dirección para otra cosa), se reemplaza por una Var propia del slot:
+#
+#     load [fp-1] -> t3      =>   t3 := %fp-1
+#     store t4, [fp-1]       =>   %fp-1 := t4
+#
+# El nombre '%fp-1' no choca con identificadores del fuente ni con temporales.
+# El TAC admite redefinir un nombre y el backend asigna registros por nombre
+# sobre el CFG, así que no hacen falta phis: la Var es el registro virtual
+# del slot. Un param (k > 0) se carga una vez al inicio de la función.
+# Después, los usos de 't' en el bloque leen '%fp-1' y la copia desaparece
+# si 't' no sigue viva.
+
+from typing import Dict, List, Optional
+
+from program.ir.cfg import FunctionCFG, program_cfg, quad_defs_uses
+from program.ir.tac_ir import Addr, Operand, Quadruple, TACProgram, Temp, Var
+
+from .pass_manager import Pass, register_pass
+
+
+def _slot_offset(x: Optional[Operand]) -> Optional[int]:
+    if isinstance(x, Addr) and str(x.base) == "fp":
+        return x.offset
+    return None
+
+
+def slot_var(offset: int) -> Var:
+    return Var(f"%fp{offset:+d}")
+
+
+def promotable_slots(quads: List[Quadruple]) -> Dict[int, Addr]:
+    """Slots [fp+k] usados solo como dirección de load/store: offset -> Addr."""
+    slots: Dict[int, Addr] = {}
+    taken = set()
+    for q in quads:
+        for role, x in (("a", q.a), ("b", q.b), ("dst", q.dst)):
+            off = _slot_offset(x)
+            if off is None:
+                continue
+            if (q.op == "load" and role == "a") or (q.op == "store" and role == "b"):
+                slots.setdefault(off, x)
+            else:
+                taken.add(off)
+    return {off: addr for off, addr in slots.items() if off not in taken}
+
+
+def _slot_access(q: Quadruple) -> Optional[int]:
+    if q.op == "load":
+        return _slot_offset(q.a)
+    if q.op == "store":
+        return _slot_offset(q.b)
+    return None
+
+
+def is_slot_var(x: Optional[Operand]) -> bool:
+    return isinstance(x, Var) and x.name.startswith("%fp")
+
+
+def _worth_promoting(fn: FunctionCFG, slots: Dict[int, Addr]) -> Dict[int, Addr]:
+    """
+    En una función con llamadas, un slot promovido que sigue vivo tras un
+    'call' ocupa un $s* (save/restore en prólogo/epílogo) en vez de un 'lw'
+    por uso: solo conviene si el slot se usa dentro de un loop.
+    """
+    quads = fn.quads()
+    if not any(q.op == "call" for q in quads):
+        return slots
+    hot = {_slot_access(q) for blk in fn.blocks if fn.loop_depth(blk.id) > 0
+           for q in blk.quads}
+    return {off: addr for off, addr in slots.items() if off in hot}
+
+
+def _forward_slot_copies(fn: FunctionCFG) -> bool:
+    """
+    't := %fp-k' seguido de usos de t en el mismo bloque: los usos leen
+    %fp-k directamente y la copia se borra si t ya no está viva después.
+    """
+    changed = False
+    for blk in fn.blocks:
+        copies: Dict[str, Var] = {}
+        out: List[Quadruple] = []
+        for q in blk.quads:
+            a = copies.get(str(q.a), q.a) if isinstance(q.a, (Var, Temp)) else q.a
+            b = copies.get(str(q.b), q.b) if isinstance(q.b, (Var, Temp)) else q.b
+            if a is not q.a or b is not q.b:
+                q = Quadruple(q.op, a, b, q.dst)
+                changed = True
+            if isinstance(q.dst, (Var, Temp)):
+                d = str(q.dst)
+                copies = {t: v for t, v in copies.items() if t != d and str(v) != d}
+                if q.op == ":=" and is_slot_var(q.a) and isinstance(q.dst, Temp):
+                    copies[d] = q.a
+            out.append(q)
+        blk.quads = out
+    if not changed:
+        return False
+    fn.invalidate()
+    live_out = fn.live_out()
+    for blk in fn.blocks:
+        live = set(live_out[blk.id])
+        kept: List[Quadruple] = []
+        for q in reversed(blk.quads):
+            defs, uses = quad_defs_uses(q)
+            if q.op == ":=" and is_slot_var(q.a) and not (defs & live):
+                continue
+            live = (live - defs) | uses
+            kept.append(q)
+        blk.quads = kept[::-1]
+    fn.invalidate()
+    return True
+
+
+def promote_function(fn: FunctionCFG) -> bool:
+    slots = _worth_promoting(fn, promotable_slots(fn.quads()))
+    params_read, entry_loaded = set(), set()
+    changed = False
+    for blk in fn.blocks:
+        out: List[Quadruple] = []
+        for q in blk.quads:
+            off = _slot_offset(q.a) if q.op == "load" else None
+            # la lectura de entrada que dejó una ejecución anterior
+            if off in slots and q.dst == slot_var(off):
+                entry_loaded.add(off)
+                out.append(q)
+                continue
+            changed |= _slot_access(q) in slots
+            if off in slots:
+                if off > 0:
+                    params_read.add(off)
+                out.append(Quadruple(":=", slot_var(off), None, q.dst))
+                continue
+            off = _slot_offset(q.b) if q.op == "store" else None
+            if off in slots:
+                out.append(Quadruple(":=", q.a, None, slot_var(off)))
+                continue
+            out.append(q)
+        blk.quads = out
+    # el valor de entrada de los params sigue en su home: una sola lectura
+    fn.entry.quads[:0] = [Quadruple("load", slots[off], None, slot_var(off))
+                          for off in sorted(params_read - entry_loaded)]
+    if changed:
+        fn.invalidate()
+    return _forward_slot_copies(fn) or changed
+
+
+@register_pass
+class Mem2Reg(Pass):
+    """Reemplaza load/store de slots sin alias del frame por registros virtuales."""
+
+    name = "mem2reg"
+
+    def run(self, tac: TACProgram) -> bool:
+        cfg = program_cfg(tac)
+        changed = False
+        for fn in cfg:
+            changed |= promote_function(fn)
+        if changed:
+            cfg.commit()
+        return changed
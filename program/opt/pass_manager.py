@@ -0,0 +1,143 @@
+# program/opt/pass_manager.py
+#
+# Passes de optimización TAC -> TAC, entre TACGen.visit y MIPSGenerator.generate.
+#
+# - Cada pass es una clase con 'name' y run(tac) -> bool (True si cambió el
+#   código); se registra con @register_pass y se elige por nombre.
+# - Los niveles -O0/-O1/-O2 son listas de nombres (OPT_LEVELS). --passes
+#   reemplaza la lista ("a,b,c") o la ajusta ("+a" agrega, "-b" quita).
+# - La secuencia se repite hasta un punto fijo (ningún pass cambió nada) o
+#   hasta max_iterations.
+# - Por pass se acumulan ejecuciones, cambios, tiempo de pared y el delta de
+#   quads (PassStats); si hay PassTimer, cada pass es además una etapa
+#   "opt:<nombre>" del reporte de --time-passes.
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+from program.ir.tac_ir import TACProgram
+from program.pass_timer import PassTimer
+
+
+class Pass:
+    """Base de los passes: subclases definen 'name' y run()."""
+
+    name = "pass"
+
+    def run(self, tac: TACProgram) -> bool:
+        raise NotImplementedError
+
+
+# nombre -> clase del pass
+PASS_REGISTRY: Dict[str, Callable[[], Pass]] = {}
+
+
+def register_pass(cls):
+    PASS_REGISTRY[cls.name] = cls
+    return cls
+
+
+# Secuencias por nivel (-O<n>); -O2 además elige el asignador 'color' en el Driver
+OPT_LEVELS: Dict[int, List[str]] = {
+    0: [],
+    1: ["mem2reg", "sccp", "lvn", "jumps", "dce"],
+    2: ["mem2reg", "ssa", "sccp", "gvn", "jumps", "dce"],
+}
+
+
+def resolve_passes(level: int = 0, spec: Optional[str] = None) -> List[str]:
+    """
+    Lista final de passes para un nivel y un --passes opcional:
+      "a,b"    -> exactamente a, b (ignora el nivel)
+      "+a,-b"  -> la lista del nivel, agregando a y quitando b
+    Lanza ValueError si un nombre no está registrado.
+    """
+    if level not in OPT_LEVELS:
+        raise ValueError(f"nivel de optimización desconocido: -O{level}")
+    names = list(OPT_LEVELS[level])
+    items = [s.strip() for s in (spec or "").split(",") if s.strip()]
+    if items and not all(s[0] in "+-" for s in items):
+        if any(s[0] in "+-" for s in items):
+            raise ValueError("--passes: no mezclar una lista explícita con +pass/-pass")
+        names = []
+    for item in items:
+        name = item.lstrip("+-")
+        if name not in PASS_REGISTRY:
+            raise ValueError(f"pass desconocido: {name!r} (disponibles: {', '.join(sorted(PASS_REGISTRY))})")
+        if item[0] == "-":
+            names = [n for n in names if n != name]
+        elif name not in names or item[0] != "+":
+            names.append(name)
+    return names
+
+
+@dataclass
+class PassStats:
+    name: str
+    runs: int = 0
+    changed: int = 0
+    wall_s: float = 0.0
+    quads_delta: int = 0    # suma de (quads después - quads antes) por ejecución
+
+
+class PassManager:
+    """
+    Ejecuta una secuencia de passes sobre un TACProgram:
+
+        pm = PassManager(resolve_passes(1))
+        pm.run(tac)
+        print(pm.format_stats())
+    """
+
+    def __init__(self, passes: Iterable[str], fixed_point: bool = True,
+                 max_iterations: int = 10, timer: Optional[PassTimer] = None):
+        self.passes: List[Pass] = [PASS_REGISTRY[name]() for name in passes]
+        self.fixed_point = fixed_point
+        self.max_iterations = max_iterations
+        self.timer = timer or PassTimer(enabled=False)
+        self.stats: Dict[str, PassStats] = {p.name: PassStats(p.name) for p in self.passes}
+        self.iterations = 0
+        self.quads_in = self.quads_out = 0
+
+    def run(self, tac: TACProgram) -> TACProgram:
+        self.iterations = 0
+        self.quads_in = len(tac.code)
+        while self.passes and self.iterations < self.max_iterations:
+            self.iterations += 1
+            changed = False
+            for p in self.passes:
+                changed |= self._run_one(p, tac)
+            if not (self.fixed_point and changed):
+                break
+        self.quads_out = len(tac.code)
+        return tac
+
+    def _run_one(self, p: Pass, tac: TACProgram) -> bool:
+        st = self.stats[p.name]
+        before = len(tac.code)
+        t0 = time.perf_counter()
+        with self.timer.stage(f"opt:{p.name}"):
+            changed = bool(p.run(tac))
+        st.wall_s += time.perf_counter() - t0
+        st.runs += 1
+        st.changed += int(changed)
+        st.quads_delta += len(tac.code) - before
+        if self.timer.enabled:
+            self.timer.count(f"opt:{p.name}", "quads_delta", st.quads_delta)
+        return changed
+
+    def format_stats(self) -> str:
+        """Tabla por pass: ejecuciones, veces que cambió el código, tiempo y delta de quads."""
+        header = f"{'pass':<16} {'runs':>5} {'cambios':>8} {'wall(ms)':>10} {'Δ quads':>8}"
+        lines = [header, "-" * len(header)]
+        for st in self.stats.values():
+            lines.append(f"{st.name:<16} {st.runs:>5} {st.changed:>8} "
+                         f"{st.wall_s * 1000:>10.2f} {st.quads_delta:>+8}")
+        lines.append("-" * len(header))
+        lines.append(f"quads: {self.quads_in} -> {self.quads_out} en {self.iterations} iteración(es)")
+        return "\n".join(lines)
+
+
+# Los passes se registran al importarse (después de definir Pass y register_pass)
+from . import dce, gvn, jumps, mem2reg, sccp, ssa  # noqa: E402,F401
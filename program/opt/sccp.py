@@ -0,0 +1,202 @@
+# program/opt/sccp.py
+#
+# Propagación de constantes condicional (Wegman-Zadeck) sobre el CFG.
+#
+# El TAC todavía no está en SSA (un mismo nombre se redefine), así que el
+# análisis es por bloque: cada bloque tiene un estado de entrada nombre -> valor
+# entero, que es el "meet" de las salidas de sus predecesores por arcos
+# ejecutables. Un nombre ausente del estado es desconocido (bottom); un arco que
+# todavía no es ejecutable no aporta nada (top), y así un valor que entra a un
+# loop sigue siendo constante si el loop no lo cambia.
+#
+# - Un 'ifgoto' con condición conocida marca solo uno de sus arcos.
+# - Al final: los quads plegables con resultado conocido pasan a 'dst := c',
+#   los usos que el backend acepta como literal (:=, print, ret, param,
+#   ifgoto, alloc_array, y los dos operandos de + - * / %, relacionales y el
+#   índice de addr_index, que el selector emite con inmediato) se reemplazan
+#   por la constante, los 'ifgoto' resueltos se vuelven 'goto' o desaparecen y
+#   los bloques no ejecutables se eliminan.
+# - Un 'call' olvida el valor de los globales de main que usan otras
+#   funciones (ProgramCFG.global_names()): el callee puede escribirlos.
+# - El '+' con un literal string (prefijo de print) no se toca.
+
+from typing import Dict, List, Optional, Set, Tuple
+
+from program.ir.cfg import FunctionCFG, program_cfg
+from program.ir.tac_ir import Const, Operand, Quadruple, TACProgram, Temp, Var
+
+from .fold import FOLDABLE_OPS, const_int, fold_binop
+from .pass_manager import Pass, register_pass
+
+State = Dict[str, int]
+
+# quads cuyo operando 'a' puede ser un literal entero en el backend
+_LITERAL_USES = (":=", "print", "ret", "param", "ifgoto", "alloc_array")
+# quads cuyo operando 'b' (y 'a', salvo en addr_index) puede ser un literal
+_IMMEDIATE_USES = FOLDABLE_OPS + ("addr_index",)
+
+
+def _is_value(x: Optional[Operand]) -> bool:
+    return isinstance(x, (Var, Temp))
+
+
+def _string_operand(q: Quadruple) -> bool:
+    return any(isinstance(x, Const) and isinstance(x.value, str) for x in (q.a, q.b))
+
+
+def _value_of(x: Optional[Operand], state: State) -> Optional[int]:
+    if _is_value(x):
+        return state.get(str(x))
+    return const_int(x)
+
+
+def _evaluate(q: Quadruple, state: State) -> Optional[int]:
+    """Valor que q asigna a su dst, si se conoce."""
+    if q.op == ":=":
+        return _value_of(q.a, state)
+    if q.op in FOLDABLE_OPS:
+        x, y = _value_of(q.a, state), _value_of(q.b, state)
+        if x is not None and y is not None:
+            return fold_binop(q.op, x, y)
+    return None
+
+
+def _transfer(q: Quadruple, state: State, shared: Set[str]) -> None:
+    if q.op == "call":
+        # el callee puede escribir cualquier global que comparte con main
+        for name in shared:
+            state.pop(name, None)
+    if q.op not in ("label", "goto", "ifgoto") and _is_value(q.dst):
+        v = _evaluate(q, state)
+        if v is None:
+            state.pop(str(q.dst), None)
+        else:
+            state[str(q.dst)] = v
+
+
+def _meet(states: List[State]) -> State:
+    out = dict(states[0])
+    for st in states[1:]:
+        for name, v in list(out.items()):
+            if st.get(name) != v:
+                del out[name]
+    return out
+
+
+class _Analysis:
+    def __init__(self, fn: FunctionCFG, shared: Set[str]):
+        self.fn = fn
+        self.shared = shared
+        n = len(fn.blocks)
+        self.ins: List[Optional[State]] = [None] * n
+        self.outs: List[Optional[State]] = [None] * n
+        self.edges: Set[Tuple[int, int]] = set()
+        self._run()
+
+    def executable(self, b: int) -> bool:
+        return self.outs[b] is not None
+
+    def _successors(self, b: int, out: State) -> List[int]:
+        blk = self.fn.blocks[b]
+        term = blk.terminator
+        if term is None or term.op not in ("ifgoto", "if_goto"):
+            return blk.succs
+        cond = _value_of(term.a, out)
+        if cond is None:
+            return blk.succs
+        if cond:
+            target = self.fn.block_of_label(str(term.dst))
+            return [target.id] if target is not None else []
+        return [b + 1] if b + 1 < len(self.fn.blocks) else []
+
+    def _run(self) -> None:
+        blocks = self.fn.blocks
+        work = [0]
+        while work:
+            b = work.pop()
+            preds = [self.outs[p] for p in blocks[b].preds if (p, b) in self.edges]
+            state = _meet(([{}] if b == 0 else []) + preds)
+            if self.executable(b) and state == self.ins[b]:
+                continue
+            self.ins[b] = dict(state)
+            for q in blocks[b].quads:
+                _transfer(q, state, self.shared)
+            changed = state != self.outs[b]
+            self.outs[b] = state
+            for s in self._successors(b, state):
+                if (b, s) not in self.edges:
+                    self.edges.add((b, s))
+                    work.append(s)
+                elif changed:
+                    work.append(s)
+
+
+def _rewrite_block(quads: List[Quadruple], state: State,
+                   shared: Set[str]) -> Tuple[List[Quadruple], bool]:
+    out: List[Quadruple] = []
+    changed = False
+    for q in quads:
+        new = q
+        if q.op in _LITERAL_USES and _is_value(q.a):
+            v = state.get(str(q.a))
+            if v is not None:
+                new = Quadruple(q.op, Const(v), q.b, q.dst)
+        if q.op in _IMMEDIATE_USES and not _string_operand(q):
+            a = _value_of(q.a, state) if q.op != "addr_index" else None
+            b = _value_of(q.b, state)
+            if a is not None or b is not None:
+                new = Quadruple(q.op, q.a if a is None else Const(a),
+                                q.b if b is None else Const(b), q.dst)
+        if q.op in FOLDABLE_OPS and _is_value(q.dst):
+            v = _evaluate(q, state)
+            if v is not None:
+                new = Quadruple(":=", Const(v), None, q.dst)
+        if q.op in ("ifgoto", "if_goto"):
+            cond = _value_of(q.a, state)
+            if cond is not None:
+                changed = True
+                if cond:
+                    out.append(Quadruple("goto", dst=q.dst))
+                continue
+        _transfer(q, state, shared)
+        changed |= new is not q
+        out.append(new)
+    return out, changed
+
+
+def propagate_function(fn: FunctionCFG, shared: Optional[Set[str]] = None) -> bool:
+    """
+    Analiza y reescribe una función. True si cambió algo. 'shared' son los
+    globales que leen/escriben otras funciones (ProgramCFG.global_names()):
+    su valor se olvida en cada 'call'.
+    """
+    shared = shared or set()
+    an = _Analysis(fn, shared)
+    changed = False
+    for blk in fn.blocks:
+        if not an.executable(blk.id):
+            changed |= bool(blk.quads)
+            blk.quads = []
+            continue
+        blk.quads, blk_changed = _rewrite_block(blk.quads, dict(an.ins[blk.id]), shared)
+        changed |= blk_changed
+    if changed:
+        fn.invalidate()
+    return changed
+
+
+@register_pass
+class SCCP(Pass):
+    """Propagación y plegado de constantes; resuelve saltos y poda ramas muertas."""
+
+    name = "sccp"
+
+    def run(self, tac: TACProgram) -> bool:
+        cfg = program_cfg(tac)
+        shared = cfg.global_names()
+        changed = False
+        for fn in cfg:
+            changed |= propagate_function(fn, shared)
+        if changed:
+            cfg.commit()
+        return changed
@@ -0,0 +1,57 @@
+# program/opt/ssa.py
+#
+# Pass 'ssa': ida y vuelta por la forma SSA (ver ir/ssa.py).
+#
+# Cada definición recibe un nombre propio y al salir de SSA solo se vuelven a
+# unir los nombres que no interfieren. Así se separan los valores sin relación
+# que comparten un nombre (temporales reciclados por TempAllocator, una local
+# reasignada), y los passes siguientes (gvn, sccp) ven un valor por nombre y
+# el asignador de registros recibe rangos de vida más cortos.
+# Antes de volver, la forma se verifica: un error es un bug del compilador.
+#
+# No se versionan:
+#   - las Vars de main que también usa otra función (globales), porque la
+#     otra función las lee por nombre
+#   - los nombres que reciben un literal string o un "s" + x: el backend
+#     decide cómo imprimirlos según el nombre (string_vars, concat_prefix)
+
+from typing import Set
+
+from program.ir.cfg import FunctionCFG, program_cfg
+from program.ir.ssa import build_ssa, destroy_ssa, verify_ssa
+from program.ir.tac_ir import Const, TACProgram
+
+from .pass_manager import Pass, register_pass
+
+
+def _string_names(fn: FunctionCFG) -> Set[str]:
+    names = set()
+    for q in fn.quads():
+        operands = (q.a, q.b) if q.op in (":=", "+") else ()
+        if any(isinstance(x, Const) and isinstance(x.value, str) for x in operands):
+            names.add(str(q.dst))
+    return names
+
+
+@register_pass
+class SSARoundTrip(Pass):
+    """Construye SSA, la verifica y la destruye coalesciendo las copias."""
+
+    name = "ssa"
+
+    def run(self, tac: TACProgram) -> bool:
+        cfg = program_cfg(tac)
+        changed = False
+        shared = cfg.global_names()
+        for fn in cfg:
+            before = [repr(q) for q in fn.quads()]
+            pinned = shared | _string_names(fn)
+            origins = build_ssa(fn, cfg.new_label, pinned)
+            errors = verify_ssa(fn, pinned)
+            if errors:
+                raise RuntimeError(f"SSA inválida en '{fn.name}': " + "; ".join(errors))
+            destroy_ssa(fn, origins)
+            changed |= [repr(q) for q in fn.quads()] != before
+        if changed:
+            cfg.commit()
+        return changed
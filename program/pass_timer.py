@@ -0,0 +1,160 @@
+# program/pass_timer.py
+#
+# Medición por etapa del pipeline (--time-passes / --mem-passes).
+# Cada etapa (lex, parse, semantic, tac, mips, ...) registra:
+#   - tiempo de pared (perf_counter) y de CPU (process_time)
+#   - pico de memoria asignada durante la etapa (tracemalloc), opcional
+#   - contadores propios de la etapa (tokens, nodos, quads, líneas asm, ...)
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+
+
+@dataclass
+class PassRecord:
+    name: str
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    peak_kb: Optional[float] = None
+    counts: Dict[str, int] = field(default_factory=dict)
+
+
+class PassTimer:
+    """
+    Cronómetro de etapas del compilador.
+
+    Uso:
+        timer = PassTimer(track_memory=True)
+        with timer.stage("parse"):
+            tree = parser.program()
+        timer.count("parse", "parse_tree_nodes", n)
+        print(timer.report())
+
+    Si enabled=False, stage() y count() no hacen nada (costo casi cero),
+    así el pipeline puede llamarlos siempre.
+    """
+
+    def __init__(self, enabled: bool = True, track_memory: bool = False):
+        self.enabled = enabled
+        self.track_memory = enabled and track_memory
+        self.records: List[PassRecord] = []
+        self._by_name: Dict[str, PassRecord] = {}
+        self._started_tracemalloc = False
+
+    def _record(self, name: str) -> PassRecord:
+        rec = self._by_name.get(name)
+        if rec is None:
+            rec = PassRecord(name)
+            self._by_name[name] = rec
+            self.records.append(rec)
+        return rec
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.enabled:
+            yield
+            return
+
+        if self.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            tracemalloc.reset_peak()
+            mem_base = tracemalloc.get_traced_memory()[0]
+
+        w0 = time.perf_counter()
+        c0 = time.process_time()
+        try:
+            yield
+        finally:
+            rec = self._record(name)
+            # Una etapa puede ejecutarse varias veces (p.ej. re-parseo): se acumula
+            rec.wall_s += time.perf_counter() - w0
+            rec.cpu_s += time.process_time() - c0
+            if self.track_memory:
+                peak = (tracemalloc.get_traced_memory()[1] - mem_base) / 1024.0
+                rec.peak_kb = max(rec.peak_kb or 0.0, peak)
+
+    def count(self, name: str, key: str, value: int) -> None:
+        if self.enabled:
+            self._record(name).counts[key] = value
+
+    def close(self) -> None:
+        """Detiene tracemalloc si fue este timer quien lo arrancó."""
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    # ---------- Salida ----------
+    def report(self) -> str:
+        """Tabla de texto con una fila por etapa y una fila de total."""
+        header = f"{'etapa':<12} {'wall(ms)':>10} {'cpu(ms)':>10}"
+        if self.track_memory:
+            header += f" {'peak(KB)':>10}"
+        header += "  contadores"
+        lines = [header, "-" * len(header)]
+
+        tot_wall = tot_cpu = 0.0
+        for rec in self.records:
+            row = f"{rec.name:<12} {rec.wall_s * 1000:>10.2f} {rec.cpu_s * 1000:>10.2f}"
+            if self.track_memory:
+                peak = f"{rec.peak_kb:.1f}" if rec.peak_kb is not None else "-"
+                row += f" {peak:>10}"
+            row += "  " + ", ".join(f"{k}={v}" for k, v in rec.counts.items())
+            lines.append(row.rstrip())
+            tot_wall += rec.wall_s
+            tot_cpu += rec.cpu_s
+
+        lines.append("-" * len(header))
+        lines.append(f"{'total':<12} {tot_wall * 1000:>10.2f} {tot_cpu * 1000:>10.2f}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict:
+        return {"passes": [asdict(r) for r in self.records]}
+
+    def to_json(self, path: Optional[str] = None) -> str:
+        text = json.dumps(self.to_dict(), indent=2)
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        return text
+
+
+# ---------- Contadores auxiliares ----------
+
+def count_tree_nodes(tree) -> int:
+    """Número de nodos del árbol de parseo (reglas + terminales), sin recursión."""
+    if tree is None:
+        return 0
+    n = 0
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        n += 1
+        for i in range(node.getChildCount()):
+            stack.append(node.getChild(i))
+    return n
+
+
+def count_symbols(scopes) -> int:
+    """
+    Símbolos alcanzables desde el scope global: globales, parámetros,
+    campos, métodos y funciones anidadas.
+    """
+    if scopes is None or not scopes.stack:
+        return 0
+
+    n = 0
+    pending = list(scopes.stack[0].symbols.values())
+    while pending:
+        sym = pending.pop()
+        n += 1
+        pending.extend(getattr(sym, "params", None) or [])
+        pending.extend((getattr(sym, "fields", None) or {}).values())
+        pending.extend((getattr(sym, "methods", None) or {}).values())
+        pending.extend((getattr(sym, "nested", None) or {}).values())
+    return n
@@ -1,11 +1,17 @@
 from dataclasses import dataclass, field
 from typing import Dict, Optional
 
+# Convención de llamada: los primeros args (contando 'this') viajan en $a0..$a3.
+# Su slot [fp+2..5] es el "home" que el caller reserva igual que para los demás
+# args; el callee solo lo escribe (desde $aN) si la función lee o escribe el param.
+ARG_REGS = ("$a0", "$a1", "$a2", "$a3")
+
 @dataclass
 class Slot:
     name: str
     region: str        # "param" | "local" | "this" | "temp"
     offset: int        # relativo a fp
+    reg: Optional[str] = None   # registro en el que llega ($a0..$a3), si aplica
 
 @dataclass
 class ActivationRecord:
@@ -15,17 +21,22 @@ class ActivationRecord:
     params_size: int = 0
     has_this: bool = False
 
+    def _arg_reg(self) -> Optional[str]:
+        """Registro del siguiente argumento (arg_i con i < 4), o None si va por pila."""
+        i = self.params_size
+        return ARG_REGS[i] if i < len(ARG_REGS) else None
+
     def add_this(self):
         """
         Coloca 'this' como el primer parámetro lógico.
         Si es un método:
-          this -> [fp+2] (arg0)
-          param0 -> [fp+3] (arg1)
-          param1 -> [fp+4] (arg2)
+          this -> [fp+2] (arg0, llega en $a0)
+          param0 -> [fp+3] (arg1, llega en $a1)
+          param1 -> [fp+4] (arg2, llega en $a2)
           ...
         """
         off = self.params_size + 2      # igual que un parámetro normal
-        self.slots["this"] = Slot("this", "this", off)
+        self.slots["this"] = Slot("this", "this", off, self._arg_reg())
         self.has_this = True
         self.params_size += 1           # cuenta como un "parámetro" más
 
@@ -39,9 +50,10 @@ class ActivationRecord:
               this   -> [fp+2]
               param0 -> [fp+3]
               param1 -> [fp+4]
+        Los cuatro primeros (arg0..arg3) llegan en $a0..$a3 y [fp+k] es su home.
         """
         off = self.params_size + 2
-        self.slots[name] = Slot(name, "param", off)
+        self.slots[name] = Slot(name, "param", off, self._arg_reg())
         self.params_size += size
 
     def add_local(self, name: str, size: int = 1):
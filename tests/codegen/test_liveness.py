@@ -0,0 +1,58 @@
+from program.ir.tac_ir import TACProgram, Quadruple, Label, Const, Var, Temp
+from program.codegen.mips.mips_gen import MIPSGenerator
+
+
+def _func_quads(gen, quads):
+    tac = TACProgram()
+    tac.label(Label("func_f_entry"))
+    for q in quads:
+        tac.code.append(q)
+    tac.label(Label("func_f_end"))
+    return gen._split_functions(tac)[0].quads
+
+
+def test_loop_keeps_values_live_across_back_edge():
+    # i := 0; L1: c := i < n; if c goto L2; ret i; L2: i := i + 1; goto L1
+    gen = MIPSGenerator()
+    quads = _func_quads(gen, [
+        Quadruple(":=", Const(0), None, Var("i")),
+        Quadruple("label", None, None, Label("L1")),
+        Quadruple("<", Var("i"), Var("n"), Temp("t0")),
+        Quadruple("ifgoto", Temp("t0"), None, Label("L2")),
+        Quadruple("ret", Var("i")),
+        Quadruple("label", None, None, Label("L2")),
+        Quadruple("+", Var("i"), Const(1), Var("i")),
+        Quadruple("goto", None, None, Label("L1")),
+    ])
+    liv = gen._compute_liveness(quads)
+    ops = [q["op"] for q in quads]
+    assert len(liv) == len(quads)
+
+    i_assign = ops.index("assign")
+    i_ifgoto = ops.index("ifgoto")
+    i_ret = ops.index("ret")
+    i_goto = ops.index("goto")
+
+    assert liv[i_assign] == {"i", "n"}
+    assert liv[i_ifgoto] == {"i", "n"}     # ambos caminos usan i; n por el back-edge
+    assert liv[i_ret] == set()             # ret no tiene sucesores
+    assert liv[i_goto] == {"i", "n"}       # vuelve a L1
+    assert "t0" not in liv[i_ifgoto]
+    assert liv.is_live_after("n", i_goto) and not liv.is_live_after("t0", i_goto)
+
+
+def test_blocks_split_at_labels_and_jumps():
+    gen = MIPSGenerator()
+    quads = _func_quads(gen, [
+        Quadruple(":=", Const(1), None, Var("a")),
+        Quadruple("goto", None, None, Label("L1")),
+        Quadruple(":=", Const(2), None, Var("a")),   # inalcanzable
+        Quadruple("label", None, None, Label("L1")),
+        Quadruple("print", Var("a")),
+    ])
+    liv = gen._compute_liveness(quads)
+    # bloques: [entry, a:=1, goto] [a:=2] [L1, print, end]
+    assert len(liv.blocks) == 3
+    assert liv.succ[0] == [2] and liv.succ[1] == [2]
+    assert list(liv) == [liv[i] for i in range(len(quads))]
+    assert liv[1] == {"a"} and liv[2] == {"a"}
@@ -4,15 +4,16 @@ import pytest
 
 # Ajusta el import a tu árbol real:
 from program.codegen.mips.mips_gen import MIPSGenerator
+from program.ir.tac_ir import TACProgram, Label, Const, Temp, Addr
 
 class TACProg:
     """Contenedor mínimo con .code (lista de strings TAC) para el generador."""
     def __init__(self, code):
         self.code = code
 
-def gen_asm(lines):
+def gen_asm(lines, peephole=True):
     """Helper: ejecuta el generador y devuelve el ensamblador como string."""
-    gen = MIPSGenerator()
+    gen = MIPSGenerator(peephole=peephole)
     prog = TACProg([ln for ln in lines if ln.strip()])
     asm = gen.generate(prog)
     # Normaliza espacios por si el writer varia en blank lines
@@ -40,14 +41,16 @@ def test_binops_and_ret():
         "ret t2",
         "func_main_end:",
     ])
-    # Prolog/epilog genérico (sin fijar tamaño exacto)
-    assert_regex(r"addiu \$sp,\$sp,-\d+", asm)
+    # main es hoja y todo vive en registros: sin frame, sin ajustes de $sp
+    assert "hoja sin frame" in asm
+    assert "$sp" not in asm and "$fp" not in asm
     assert_in_order(asm, [
         "li ",             # li (alguno) , 5
         "li ",             # li (alguno) , 7
         "addu ",           # suma
         "move $v0",        # retorno
-        "jr $ra"
+        "li $v0, 10",      # main termina con exit
+        "syscall"
     ])
 
 def test_load_store_frame_addressing():
@@ -58,7 +61,7 @@ def test_load_store_frame_addressing():
         "load [fp-1] -> t1",
         "ret t1",
         "func_ls_end:",
-    ])
+    ], peephole=False)   # el peephole quitaría el lw del mismo slot
     # Debe traducir [fp-1] a offset en BYTES: -4($fp)
     assert "sw " in asm and "($fp)" in asm
     assert "lw " in asm and "($fp)" in asm
@@ -95,18 +98,71 @@ def test_call_param_ret_caller_saved():
         "ret t2",
         "func_suma_end:",
     ])
-    # Debe empujar 2 params y luego limpiar stack con 8
+    # Un solo ajuste de $sp para los 2 args, que viajan en $a0/$a1
     assert_in_order(asm, [
-        "addi $sp, $sp, -4",
-        "sw ",                         # primer param
-        "addi $sp, $sp, -4",
-        "sw ",                         # segundo param
+        "addiu $sp, $sp, -8",
+        "move $a0, ",
+        "move $a1, ",
         "jal suma",
-        "addi $sp, $sp, 8",            # pop de params
+        "addiu $sp, $sp, 8",
     ])
+    assert "addi $sp, $sp, -4" not in asm
     # Retorno propagado
     assert "move $v0" in asm
 
+def test_args_beyond_four_go_on_stack_and_callee_homes_only_used_ones():
+    asm = gen_asm([
+        "func_main_entry:",
+        "t0 := 1",
+        "param t0",
+        "param 2",
+        "param t0",
+        "param t0",
+        "param 5",
+        "call f, 5 -> t1",
+        "print t1",
+        "func_main_end:",
+        "func_f_entry:",
+        "load [fp+3] -> t0",
+        "load [fp+6] -> t1",
+        "+ t0, t1 -> t2",
+        "ret t2",
+        "func_f_end:",
+    ])
+    main = asm[:asm.index("\nf:")]
+    f = asm[asm.index("\nf:"):]
+    assert_in_order(main, ["addiu $sp, $sp, -20", "li $a1, 2", "li $t7, 5",
+                           "sw $t7, 16($sp)", "jal f", "addiu $sp, $sp, 20"])
+    # arg1 llega en $a1 y solo se lee antes de cualquier call: se toma de $a1
+    # sin copiarlo a su home; arg4 ya está en la pila (28($fp)) y el resto
+    # de $a* no se toca
+    assert_in_order(f, ["addiu $fp,$sp", "move $t", ", $a1", "lw ", "28($fp)"])
+    assert "16($fp)" not in f
+    assert not re.search(r"\$a[023]", f)
+
+def test_param_read_after_a_clobber_is_homed():
+    asm = gen_asm([
+        "func_g_entry:",
+        "print 1",                 # la syscall pisa $a0
+        "load [fp+2] -> t0",
+        "ret t0",
+        "func_g_end:",
+    ])
+    assert_in_order(asm, ["sw $a0,12($fp)", "syscall", "lw ", "12($fp)"])
+
+def test_leaf_that_only_reads_its_params_needs_no_frame():
+    asm = gen_asm([
+        "func_h_entry:",
+        "load [fp+2] -> t0",
+        "t1 := 1",
+        "+ t0, t1 -> t2",
+        "ret t2",
+        "func_h_end:",
+    ])
+    # el parámetro se toma de $a0 sin home, así que la hoja no necesita frame
+    assert "hoja sin frame" in asm and "$sp" not in asm and "($fp)" not in asm
+    assert "move $t0, $a0" in asm
+
 def test_relops_basic_eq_lt():
     asm = gen_asm([
         "func_rel_entry:",
@@ -121,11 +177,80 @@ def test_relops_basic_eq_lt():
     assert "slt " in asm
     assert "subu " in asm and "sltiu " in asm
 
+def test_relop_feeding_only_the_next_ifgoto_becomes_one_branch():
+    asm = gen_asm([
+        "func_br_entry:",
+        "load [fp+2] -> a",
+        "load [fp+3] -> b",
+        ">= a, b -> t0",
+        "if t0 goto L1",
+        "== a, 0 -> t1",
+        "if t1 goto L1",
+        "< 3, b -> t2",          # constante a la izquierda: b > 3
+        "if t2 goto L1",
+        "!= a, b -> t3",         # t3 se usa después: no se fusiona
+        "if t3 goto L1",
+        "ret t3",
+        "L1:",
+        "ret a",
+        "func_br_end:",
+    ])
+    assert_regex(r"bge \$\w+, \$\w+, L1", asm)
+    assert_regex(r"beqz \$\w+, L1", asm)
+    assert_regex(r"slti \$t8, \$\w+, 4\n\s*beqz \$t8, L1", asm)
+    assert "xori " not in asm and "slt " not in asm
+    # el último relacional sí materializa su 0/1
+    assert_in_order(asm, ["subu ", "sltu ", "bne "])
+
+def test_constant_temps_become_immediates():
+    p = TACProgram()
+    p.label(Label("func_imm_entry"))
+    p.emit("load", Addr("fp", 2), None, Temp("a"))
+    p.emit(":=", Const(1), None, Temp("t0"))
+    p.emit("+", Temp("a"), Temp("t0"), Temp("t1"))        # addiu, t0 no ocupa registro
+    p.emit(":=", Const(8), None, Temp("t2"))
+    p.emit("*", Temp("t1"), Temp("t2"), Temp("t3"))       # potencia de 2: sll
+    p.emit(":=", Const(40000), None, Temp("t4"))
+    p.emit("<", Temp("t3"), Temp("t4"), Temp("t5"))       # no cabe en 16 bits: li + slt
+    p.emit("==", Temp("t3"), Const(7), Temp("t6"))
+    p.emit("-", Const(0), Temp("t5"), Temp("t7"))
+    p.emit("+", Temp("t6"), Temp("t7"), Temp("t8"))
+    p.emit("ret", Temp("t8"))
+    p.label(Label("func_imm_end"))
+    asm = MIPSGenerator().generate(p)
+    assert_regex(r"addiu \$\w+, \$\w+, 1\n", asm)
+    assert_regex(r"sll \$\w+, \$\w+, 3\n", asm)
+    assert_in_order(asm, ["li $t8, 40000", "slt ", "xori ", "sltiu ", "subu "])
+    assert_regex(r"subu \$\w+, \$zero, \$\w+", asm)
+    assert "li $t0, 1" not in asm and "li $t0, 8" not in asm
+
+def test_mul_div_mod_by_constants_avoid_mul_and_div():
+    p = TACProgram()
+    p.label(Label("func_sr_entry"))
+    p.emit("load", Addr("fp", 2), None, Temp("a"))
+    p.emit("*", Temp("a"), Const(10), Temp("t0"))          # (a << 3) + (a << 1)
+    p.emit("/", Temp("t0"), Const(8), Temp("t1"))          # sesgo + sra
+    p.emit("%", Temp("t1"), Const(7), Temp("t2"))          # número mágico
+    p.emit("*", Temp("a"), Const(2), Temp("t3"))
+    p.emit("addr_index", Temp("t2"), Temp("t3"), Temp("t4"))   # a*2*4: un solo sll
+    p.emit("load", Temp("t4"), None, Temp("t5"))
+    p.emit("ret", Temp("t5"))
+    p.label(Label("func_sr_end"))
+    asm = MIPSGenerator().generate(p)
+    assert "div " not in asm
+    assert_in_order(asm, ["sll $t8, ", ", 3", "addu ",
+                          "sra $t8, ", "srl $t8, $t8, 29", "sra ",
+                          "li $t8, -1840700269", "mult ", "mfhi $t8", "sra $t8, $t8, 2"])
+    assert_regex(r"sll \$t9, \$\w+, 3\n\s*addu ", asm)
+
 def test_spilling_basic():
-    # Fuerza más de 10 valores vivos para inducir spills.
-    body = ["func_spill_entry:"] + [f"t{i} := {i}" for i in range(12)] + [
-        "+ t10, t11 -> t12",
-        "ret t12",
+    # Fuerza 20 valores vivos a la vez (todos se usan en la suma final) para
+    # inducir spills: hay 15 registros asignables ($t0-$t6 y $s0-$s7) y, con
+    # liveness, valores muertos ya no ocupan registro.
+    body = ["func_spill_entry:"] + [f"t{i} := {i}" for i in range(20)] + [
+        "+ t0, t1 -> t20",
+    ] + [f"+ t20, t{i} -> t20" for i in range(2, 20)] + [
+        "ret t20",
         "func_spill_end:",
     ]
     asm = gen_asm(body)
@@ -149,3 +274,205 @@ def test_print_string_and_int_smoke():
     assert "li $v0, 4" in asm
     assert "li $v0, 1" in asm
     assert "syscall" in asm
+
+def test_string_pool_dedup_and_stable_labels():
+    lines = [
+        'func_pr_entry:',
+        'print "Hola"',
+        't0 := "Hola"',
+        'print t0',
+        'print "Adios"',
+        "ret t0",
+        "func_pr_end:",
+    ]
+    asm = gen_asm(lines)
+    # Cada literal se define una sola vez, en una única sección .data
+    assert asm.count('.asciiz "Hola"') == 1
+    assert asm.count('.asciiz "Adios"') == 1
+    assert asm.count(".data") == 1
+    assert "la $a0, _str_0" in asm and "_str_1:" in asm
+    # Etiquetas deterministas: dos generaciones producen exactamente lo mismo
+    assert gen_asm(lines) == asm
+
+def test_linear_scan_reuses_dead_registers():
+    # 12 valores que mueren enseguida: no hace falta ningún spill
+    body = ["func_reuse_entry:"]
+    for i in range(12):
+        body += [f"t{i} := {i}", f"print t{i}"]
+    body += ["ret t11", "func_reuse_end:"]
+    asm = gen_asm(body)
+    assert not re.findall(r"sw \$t\d,\s*-\d+\(\$fp\)", asm)
+
+
+def test_linear_scan_saves_only_values_live_across_call():
+    asm = gen_asm([
+        "func_main_entry:",
+        "a := 1",
+        "b := 2",
+        "param b",
+        "call f, nargs=1 -> c",
+        "+ a, c -> d",
+        "print d",
+        "func_main_end:",
+        "func_f_entry:",
+        "ret 0",
+        "func_f_end:",
+    ])
+    # 'a' sigue viva tras el jal: va a un $s* (callee-saved) y la llamada no
+    # necesita guardar/recargar nada; 'b' muere en la llamada
+    assert re.search(r"li \$s\d, 1", asm)
+    assert not re.findall(r"sw \$[ts]\d, -\d+\(\$fp\)", asm)
+    assert not re.findall(r"lw \$[ts]\d, -\d+\(\$fp\)", asm)
+
+
+def test_callee_saves_only_used_s_registers():
+    asm = gen_asm([
+        "func_g_entry:",
+        "a := 1",
+        "call h, nargs=0 -> c",
+        "+ a, c -> d",
+        "ret d",
+        "func_g_end:",
+        "func_h_entry:",
+        "ret 0",
+        "func_h_end:",
+    ])
+    g = asm[:asm.index("\nh:")]
+    h = asm[asm.index("\nh:"):]
+    # g usa un único $s (para 'a'): lo guarda tras fijar $fp y lo restaura antes de salir
+    saved = re.findall(r"sw (\$s\d),(-\d+)\(\$fp\)", g)
+    assert len(saved) == 1
+    reg, off = saved[0]
+    assert_in_order(g, ["addiu $fp,$sp", f"sw {reg},{off}($fp)", "jal h",
+                        f"lw {reg},{off}($fp)", "addiu $sp,$fp,12"])
+    # h no toca $s*: prólogo/epílogo sin saves extra
+    assert not re.search(r"\$s\d", h)
+
+
+def test_leaf_functions_get_exact_or_empty_frames():
+    asm = gen_asm([
+        "func_main_entry:",
+        "call f, 0 -> a",
+        "call g, 0 -> b",
+        "+ a, b -> c",
+        "print c",
+        "func_main_end:",
+        "func_f_entry:",
+        "ret 1",
+        "func_f_end:",
+        "func_g_entry:",
+        "t0 := 2",
+        "store t0, [fp-1]",
+        "load [fp-1] -> t1",
+        "ret t1",
+        "func_g_end:",
+    ])
+    main = asm[:asm.index("\nf:")]
+    f = asm[asm.index("\nf:"):asm.index("\ng:")]
+    g = asm[asm.index("\ng:"):]
+    # main nunca retorna: reserva su frame exacto sin guardar $ra ni old $fp
+    assert "addiu $sp,$sp,-16" in main and "sw $ra" not in main and "sw $fp" not in main
+    # f es hoja y no toca $fp: sin prólogo ni epílogo, solo jr $ra
+    assert "$sp" not in f and "$fp" not in f
+    assert_in_order(f, ["li $v0, 1", "jr $ra"])
+    # g es hoja con un local: frame exacto (12 + 4 -> 16), guarda old $fp pero no $ra
+    assert_in_order(g, ["addiu $sp,$sp,-16", "sw $fp,8($sp)", "addiu $fp,$sp,4",
+                        "addiu $sp,$fp,12", "lw $fp,4($fp)", "jr $ra"])
+    assert "$ra," not in g and "$ra)" not in g
+
+
+def test_ret_in_the_middle_jumps_to_the_epilogue():
+    asm = gen_asm([
+        "func_main_entry:",
+        "param 3",
+        "call f, 1 -> r",
+        "print r",
+        "func_main_end:",
+        "func_f_entry:",
+        "load [fp+2] -> t0",
+        "if t0 goto L1",
+        "ret 0",
+        "L1:",
+        "ret 1",
+        "func_f_end:",
+        "ret null",
+    ])
+    f = asm[asm.index("\nf:"):]
+    # el primer ret salta al epílogo; el último (y el implícito) caen en él
+    assert_in_order(f, ["li $v0, 0", "j f_epilogo", "L1:", "li $v0, 1", "f_epilogo:", "jr $ra"])
+    assert f.count("j f_epilogo") == 1
+
+
+def test_linear_scan_keeps_scratch_registers_free():
+    body = ["func_main_entry:"] + [f"t{i} := {i}" for i in range(20)] + [
+        "+ t0, t1 -> t20",
+    ] + [f"+ t20, t{i} -> t20" for i in range(2, 20)] + [
+        "print t20",
+        "func_main_end:",
+    ]
+    gen = MIPSGenerator(regalloc="linear")
+    gen.generate(TACProg(body))
+    regs = {iv.reg for iv in gen.ra.intervals if iv.reg}
+    spilled = [iv.name for iv in gen.ra.intervals if iv.reg is None]
+    # $t7..$t9 son scratch del selector; el resto se reparte y sobra presión
+    assert regs == {f"$t{i}" for i in range(7)} | {f"$s{i}" for i in range(8)}
+    assert spilled
+
+
+def test_graph_color_coalesces_moves_and_reports_stats():
+    body = [
+        "func_main_entry:",
+        "a := 1",
+        "b := 2",
+        "+ a, b -> t0",
+        "x := t0",
+        "print x",
+        "func_main_end:",
+    ]
+    gen = MIPSGenerator(regalloc="color")
+    asm = gen.generate(TACProg(body))
+    # x := t0 quedó en el mismo registro: no se emite el move
+    assert not re.findall(r"move \$[ts]\d, \$[ts]\d", asm)
+    assert gen.ra.loc["x"].reg == gen.ra.loc["t0"].reg
+    (st,) = gen.regalloc_stats
+    assert st["function"] == "main" and st["regalloc"] == "color"
+    assert st["moves_coalesced"] == 1 and st["spills"] == 0
+
+
+def test_graph_color_spills_values_outside_loops_first():
+    hot = [f"v{i}" for i in range(15)]
+    body = ["func_main_entry:", "cold := 99"] + [f"{v} := {i}" for i, v in enumerate(hot)]
+    body += ["L1:"] + [f"+ {v}, {hot[(i + 1) % 15]} -> {v}" for i, v in enumerate(hot)]
+    body += ["< v0, v1 -> c", "if c goto L1", "print cold"] + [f"print {v}" for v in hot]
+    body += ["func_main_end:"]
+
+    gen = MIPSGenerator(regalloc="color")
+    gen.generate(TACProg(body))
+    # 16 valores vivos a la vez y 15 colores: se derrama lo más barato (fuera del
+    # loop); el booleano c se fusiona con el salto y no compite por registro
+    assert gen.ra.loc["cold"].reg is None
+    assert all(gen.ra.loc[v].reg is not None for v in hot)
+    assert "c" not in gen.ra.loc
+    assert gen.regalloc_stats[0]["spills"] == 1
+
+
+@pytest.mark.parametrize("regalloc", ["linear", "color"])
+def test_spill_slots_are_shared_by_disjoint_live_ranges(regalloc):
+    # dos fases de 20 valores vivos a la vez: los derramados de la primera ya
+    # murieron cuando se derraman los de la segunda, así que reusan sus slots
+    body = ["func_main_entry:"]
+    for phase in ("a", "b"):
+        body += [f"{phase}{i} := {i}" for i in range(20)]
+        body += [f"+ {phase}0, {phase}1 -> {phase}s"]
+        body += [f"+ {phase}s, {phase}{i} -> {phase}s" for i in range(2, 20)]
+        body += [f"print {phase}s"]
+    body += ["func_main_end:"]
+
+    gen = MIPSGenerator(regalloc=regalloc)
+    gen.generate(TACProg(body))
+    (st,) = gen.regalloc_stats
+    spilled = [iv for iv in gen.ra.intervals if iv.reg is None]
+    assert {iv.name[0] for iv in spilled} == {"a", "b"}
+    assert st["spill_slots_before"] == len(spilled)
+    assert st["spill_slots_after"] == len({iv.slot for iv in spilled}) == len(spilled) // 2
+    assert "->" in gen.format_regalloc_stats()
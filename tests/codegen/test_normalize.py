@@ -15,3 +15,41 @@ def test_normalize_assign_from_tac_attrs_and_str():
     assert ":=" not in asm
     # Debe haber 'li' por la asignación constante y 'move $v0, t0' por el ret
     assert "li t0, 5" in asm or "li $t" in asm  # según asignador futuro
+
+
+def test_typed_path_precomputes_kinds_and_offsets():
+    from program.ir.tac_ir import Quadruple, Temp, Addr
+    from program.codegen.mips.operands import K_ADDR, K_TEMP, K_INT, K_LABEL
+
+    gen = MIPSGenerator()
+    ld = gen._normalize_quad(Quadruple("load", Addr("fp", 2), None, Temp("t0")))
+    assert (ld["op"], ld["a1"], ld["dst"]) == ("load", "[fp+2]", "t0")
+    assert ld["k1"] == K_ADDR and ld["m1"] == ("fp", 12)   # arg0 -> 12($fp)
+    assert ld["kd"] == K_TEMP
+
+    st = gen._normalize_quad(Quadruple("store", Temp("t0"), Addr("fp", -1)))
+    assert st["m2"] == ("fp", -4)
+
+    jmp = gen._normalize_quad(Quadruple("ifgoto", Temp("t1"), None, Label("L3")))
+    assert (jmp["a1"], jmp["a2"], jmp["k2"]) == ("t1", "L3", K_LABEL)
+
+    call = gen._normalize_quad(Quadruple("call", Const("f"), Const(2), Temp("t2")))
+    assert (call["a1"], call["a2"], call["k2"], call["dst"]) == ("f", "2", K_INT, "t2")
+
+
+def test_text_fallback_matches_typed_path():
+    from program.ir.tac_ir import Quadruple, Temp, Addr
+
+    gen = MIPSGenerator()
+    quads = [
+        Quadruple(":=", Const(5), None, Temp("t0")),
+        Quadruple("load", Addr("fp", -2), None, Temp("t1")),
+        Quadruple("+", Temp("t0"), Temp("t1"), Temp("t2")),
+        Quadruple("addr_index", Var("arr"), Temp("t2"), Temp("t3")),
+        Quadruple("goto", None, None, Label("L1")),
+    ]
+    for q in quads:
+        typed = gen._normalize_quad(q)
+        text = gen._normalize_quad(str(q))
+        for k in ("op", "a1", "a2", "dst", "m1", "m2"):
+            assert typed[k] == text[k], (str(q), k)
@@ -0,0 +1,69 @@
+from program.codegen.mips.peephole import Peephole, parse_asm_line
+
+
+def _run(lines):
+    ph = Peephole()
+    return ph.run(lines), ph.removed
+
+
+def test_parse_records():
+    r = parse_asm_line("  addiu $sp,$sp,-16")
+    assert (r.kind, r.op, r.args) == ("instr", "addiu", ("$sp", "$sp", "-16"))
+    r = parse_asm_line("  nop  # delay slot")
+    assert (r.op, r.args, r.comment) == ("nop", (), "delay slot")
+    assert parse_asm_line("L3:").kind == "label"
+    assert parse_asm_line('  .asciiz "a, b # c"').args == ('"a, b # c"',)
+
+
+def test_each_rule_removes_its_instructions():
+    out, removed = _run([
+        ".text",
+        "f:",
+        "  move $t0, $t0",
+        "  move $t1, $t2",
+        "  move $t2, $t1",
+        "  sw $t1, -4($fp)",
+        "  # comentario",
+        "  lw $t1, -4($fp)",
+        "  addiu $sp, $sp, 8",
+        "  addiu $sp, $sp, -12",
+        "  jal g",
+        "  addiu $sp, $sp, 4",
+        "  addiu $sp,$sp,-4",
+        "  beqz $t1, L1",
+        "  j L1",
+        "  li $t0, 1",
+        "L1:",
+        ".text",
+        "  jr $ra",
+    ])
+    assert out == [
+        ".text",
+        "f:",
+        "  move $t1, $t2",
+        "  sw $t1, -4($fp)",
+        "  # comentario",
+        "  addiu $sp, $sp, -4",
+        "  jal g",
+        "L1:",
+        "  jr $ra",
+    ]
+    assert removed == {"self_move": 1, "move_back": 1, "store_load": 1, "sp_adjust": 3,
+                       "jump_to_next": 2, "unreachable": 1, "section": 1}
+
+
+def test_labels_and_other_slots_cut_the_window():
+    lines = [
+        "  sw $t0, -4($fp)",
+        "L0:",
+        "  lw $t0, -4($fp)",          # se puede llegar a L0 desde otro lado
+        "  sw $t0, -8($fp)",
+        "  lw $t0, -4($fp)",
+        "  j L2",
+        "L1:",
+        "  jr $ra",
+        "L2:",
+    ]
+    out, removed = _run(lines)
+    assert out == lines
+    assert sum(removed.values()) == 0
@@ -0,0 +1,38 @@
+import random
+
+from program.codegen.mips.strength import shift_add_terms, signed_magic
+from program.opt.fold import fold_binop, wrap32
+
+
+def _magic_div(n, d):
+    # misma secuencia que emite InstructionSelector._emit_by_const
+    m, s = signed_magic(d)
+    q = (m * n) >> 32                    # mfhi
+    if d > 0 and m < 0:
+        q = wrap32(q + n)
+    elif d < 0 and m > 0:
+        q = wrap32(q - n)
+    q >>= s                              # sra
+    return wrap32(q + ((q & 0xFFFFFFFF) >> 31))
+
+
+def test_magic_numbers_match_truncating_division():
+    r = random.Random(0)
+    edges = [0, 1, -1, 2**31 - 1, -2**31, -2**31 + 1, 12345, -12345]
+    for d in [3, 5, 6, 7, -7, 10, 641, 1000000007, 2**31 - 1, -3, -(2**31 - 1)]:
+        for n in edges + [r.randint(-2**31, 2**31 - 1) for _ in range(200)]:
+            assert _magic_div(n, d) == fold_binop("/", n, d), (n, d)
+
+
+def test_known_magic_numbers():
+    # Hacker's Delight, tabla 10-1
+    assert signed_magic(3) == (0x55555556, 0)
+    assert signed_magic(7) == (wrap32(0x92492493), 2)
+    assert signed_magic(-5) == (wrap32(0x99999999), 1)
+
+
+def test_shift_add_terms():
+    assert shift_add_terms(8) == ("sll", 3)
+    assert shift_add_terms(10) == ("addu", 3, 1)
+    assert shift_add_terms(15) == ("subu", 4, 0)
+    assert shift_add_terms(11) is None
@@ -0,0 +1,98 @@
+from program.ir.cfg import program_cfg
+from program.ir.tac_builder import TACBuilder, ExprResult
+from program.ir.tac_ir import Const, Label, Quadruple, TACProgram, Var
+
+
+def _nested_loops_program() -> TACProgram:
+    # main: while (a) { while (b) { print b } print a }  + una función f
+    p = TACProgram()
+    p.emit("print", Const(0))
+    p.label(Label("L_outer"))
+    p.emit("ifgoto", Var("a"), None, Label("L_obody"))
+    p.emit("goto", dst=Label("L_oend"))
+    p.label(Label("L_obody"))
+    p.label(Label("L_inner"))
+    p.emit("ifgoto", Var("b"), None, Label("L_ibody"))
+    p.emit("goto", dst=Label("L_iend"))
+    p.label(Label("L_ibody"))
+    p.emit("print", Var("b"))
+    p.emit("goto", dst=Label("L_inner"))
+    p.label(Label("L_iend"))
+    p.emit("print", Var("a"))
+    p.emit("goto", dst=Label("L_outer"))
+    p.label(Label("L_oend"))
+    p.label(Label("func_f_entry"))
+    p.emit("ret", Const(1))
+    p.label(Label("func_f_end"))
+    p.emit("ret", Const(None))
+    return p
+
+
+def test_blocks_edges_rpo_and_dominators():
+    cfg = program_cfg(_nested_loops_program())
+    assert list(cfg.functions) == ["main", "f"]
+    main = cfg.functions["main"]
+
+    labels = [b.label for b in main.blocks]
+    assert labels == [None, "L_outer", None, "L_obody", "L_inner", None,
+                      "L_ibody", "L_iend", "L_oend"]
+    blk = {b.label: b.id for b in main.blocks if b.label}
+    # ifgoto: destino + caída; goto: solo el destino
+    assert main.blocks[blk["L_outer"]].succs == [blk["L_obody"], 2]
+    assert main.blocks[2].succs == [blk["L_oend"]]
+    assert sorted(main.blocks[blk["L_inner"]].preds) == [blk["L_obody"], blk["L_ibody"]]
+
+    rpo = main.rpo()
+    assert rpo[0] == 0 and set(rpo) == set(range(len(main.blocks)))
+    idom = main.idom()
+    assert idom[0] is None
+    assert idom[blk["L_ibody"]] == blk["L_inner"]
+    assert idom[blk["L_oend"]] == 2
+    assert main.dominates(blk["L_outer"], blk["L_iend"])
+    assert not main.dominates(blk["L_ibody"], blk["L_iend"])
+
+
+def test_natural_loops_and_depth():
+    main = program_cfg(_nested_loops_program()).functions["main"]
+    blk = {b.label: b.id for b in main.blocks if b.label}
+    outer, inner = main.loops()
+    assert outer.header == blk["L_outer"] and inner.header == blk["L_inner"]
+    assert inner.body == {blk["L_inner"], blk["L_ibody"]}
+    assert inner.latches == [blk["L_ibody"]]
+    assert inner.body < outer.body and blk["L_oend"] not in outer.body
+    assert main.loop_depth(blk["L_ibody"]) == 2
+    assert main.loop_depth(blk["L_iend"]) == 1
+    assert main.loop_depth(0) == 0
+
+
+def test_implicit_ret_belongs_to_its_function():
+    tb = TACBuilder()
+    tb.gen_fn_begin("g")
+    tb.gen_stmt_return(ExprResult(Const(2)))
+    tb.gen_fn_end("g")
+    tb.gen_stmt_print(ExprResult(Const(3)))
+    cfg = program_cfg(tb.tac)
+    assert [q.op for q in cfg.functions["g"].quads()] == ["ret", "ret"]
+    assert [q.op for q in cfg.functions["main"].quads()] == ["print"]
+
+
+def test_cfg_is_cached_until_the_code_changes():
+    p = _nested_loops_program()
+    cfg = program_cfg(p)
+    assert program_cfg(p) is cfg
+    p.emit("print", Const(9))
+    assert program_cfg(p) is not cfg
+
+    # un pass que edita bloques: invalidate() re-parte la función y commit()
+    # reescribe el TAC sin invalidar el CFG que ya lo refleja
+    cfg = program_cfg(p)
+    main = cfg.functions["main"]
+    main.blocks[0].quads.append(Quadruple("goto", dst=Label("L_oend")))
+    main.invalidate()
+    assert main.blocks[0].succs == [main.block_of_label("L_oend").id]
+    assert len(main.reachable()) == 2 and main.loops() == []
+    cfg.commit()
+    assert program_cfg(p) is cfg
+    assert "goto L_oend" in p.dump()
+    assert p.dump().index("func_f_entry:") < p.dump().index("func_f_end:")
+
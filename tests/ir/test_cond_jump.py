@@ -0,0 +1,54 @@
+from program.ir.tac_builder import TACBuilder, ExprResult, RelCond, AndCond, OrCond, NotCond
+from program.ir.tac_ir import Const, Var
+
+
+def _v(name):
+    return lambda: ExprResult(Var(name))
+
+
+def test_if_branches_on_comparisons_without_booleans():
+    # if (a < b && (c || !(d == 0))) print(1) else print(2)
+    tb = TACBuilder()
+    cond = AndCond([
+        RelCond("<", _v("a"), _v("b")),
+        OrCond([_v("c"), NotCond(RelCond("==", _v("d"), lambda: ExprResult(Const(0))))]),
+    ])
+    tb.gen_stmt_if(cond,
+                   lambda bd: bd.gen_stmt_print(ExprResult(Const(1))),
+                   lambda bd: bd.gen_stmt_print(ExprResult(Const(2))))
+    assert tb.tac.dump().splitlines() == [
+        ">= a, b -> t0", "if t0 goto L1",
+        "if c goto L2",
+        "== d, 0 -> t0", "if t0 goto L1",
+        "L2:", "print 1", "goto L0",
+        "L1:", "print 2",
+        "L0:",
+    ]
+
+
+def test_while_tests_condition_at_the_bottom():
+    # while (i < n) i = i + 1
+    tb = TACBuilder()
+    tb.gen_stmt_while(
+        lambda bd: RelCond("<", _v("i"), _v("n")),
+        lambda bd: bd._assign(Var("i"), bd.gen_expr_add(ExprResult(Var("i")), ExprResult(Const(1)))),
+    )
+    assert tb.tac.dump().splitlines() == [
+        "goto Lwhile_start0",
+        "Lwhile_body1:", "+ i, 1 -> t0", "i := t0",
+        "Lwhile_start0:", "< i, n -> t0", "if t0 goto Lwhile_body1",
+        "Lwhile_end2:",
+    ]
+
+
+def test_or_value_short_circuits():
+    # x = p || q > r: si p es verdadero no se evalúa la comparación
+    tb = TACBuilder()
+    tb._assign(Var("x"), tb.gen_expr_cond(OrCond([_v("p"), RelCond(">", _v("q"), _v("r"))])))
+    assert tb.tac.dump().splitlines() == [
+        "if p goto L2",
+        "<= q, r -> t1", "if t1 goto L0",
+        "L2:", "t0 := 1", "goto L1",
+        "L0:", "t0 := 0",
+        "L1:", "x := t0",
+    ]
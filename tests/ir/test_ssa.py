@@ -0,0 +1,121 @@
+from program.ir.cfg import FunctionCFG, program_cfg
+from program.ir.ssa import build_ssa, destroy_ssa, sequentialize, verify_ssa
+from program.ir.tac_ir import Addr, Const, Label, Quadruple, TACProgram, Temp, Var
+from program.opt.pass_manager import PassManager
+
+
+def _diamond() -> TACProgram:
+    # t0 := 1; if (c) t0 := 2 (arco crítico); print t0; t0 reciclado para 5
+    p = TACProgram()
+    p.emit(":=", Const(1), dst=Temp("t0"))
+    p.emit("ifgoto", Var("c"), None, Label("J"))
+    p.emit(":=", Const(2), dst=Temp("t0"))
+    p.label(Label("J"))
+    p.emit("print", Temp("t0"))
+    p.emit(":=", Const(5), dst=Temp("t0"))
+    p.emit("print", Temp("t0"))
+    return p
+
+
+def test_phi_at_join_and_recycled_temp_split():
+    p = _diamond()
+    cfg = program_cfg(p)
+    fn = cfg.functions["main"]
+    origins = build_ssa(fn, cfg.new_label)
+    assert verify_ssa(fn) == []
+    body = [repr(q) for q in fn.quads()]
+    # el arco crítico B0 -> J pasa por un bloque partido al final
+    assert body[1] == "if c goto Lssa_split0"
+    phi = next(q for q in fn.quads() if q.op == "phi")
+    assert repr(phi).startswith("t0.3 := phi(")
+    assert sorted(str(v) for _, v in phi.args) == ["t0.1", "t0.2"]
+    assert body[-5:] == ["print t0.4", "goto Lssa_end0", "Lssa_split0:", "goto J", "Lssa_end0:"]
+    assert origins["t0.4"] == "t0"
+
+    destroy_ssa(fn, origins)
+    # las copias del phi se coalescen; el t0 reciclado queda con otro nombre
+    assert [repr(q) for q in fn.quads()] == [
+        "t0 := 1", "if c goto J", "t0 := 2", "J:", "print t0", "t0.2 := 5", "print t0.2",
+    ]
+
+
+def test_verifier_reports_double_definition_and_undominated_use():
+    fn = FunctionCFG("f", [
+        Quadruple("ifgoto", Var("c"), None, Label("J")),
+        Quadruple(":=", Const(1), None, Temp("x")),
+        Quadruple("label", dst=Label("J")),
+        Quadruple("print", Temp("x")),
+        Quadruple(":=", Const(2), None, Temp("x")),
+    ])
+    errors = verify_ssa(fn)
+    assert any("x definido más de una vez" in e for e in errors)
+    assert any("el uso de x no está dominado" in e for e in errors)
+
+
+def test_parallel_copy_swap_uses_a_temp():
+    a, b, c = Temp("a"), Temp("b"), Temp("c")
+    order = sequentialize([(a, b), (b, a), (c, a)], lambda x: Temp("tmp"))
+    # c lee a antes de que a se pise; el ciclo a <-> b pasa por tmp
+    assert order[0] == (c, a)
+    env = {"a": 1, "b": 2, "c": 0}
+    for dst, src in order:
+        env[str(dst)] = env[str(src)]
+    assert (env["a"], env["b"], env["c"]) == (2, 1, 1)
+    assert len(order) == 4
+
+
+def test_round_trip_on_loop_is_stable():
+    # f(n): i := 0; s := 0; while (i < n) { s := s + i; i := i + 1 } ret s
+    p = TACProgram()
+    p.label(Label("func_f_entry"))
+    p.emit("load", Addr("fp", 2), dst=Temp("t0"))
+    p.emit(":=", Const(0), dst=Var("i"))
+    p.emit(":=", Const(0), dst=Var("s"))
+    p.label(Label("L"))
+    p.emit("<", Var("i"), Temp("t0"), Temp("t1"))
+    p.emit("ifgoto", Temp("t1"), None, Label("B"))
+    p.emit("goto", dst=Label("E"))
+    p.label(Label("B"))
+    p.emit("+", Var("s"), Var("i"), Temp("t1"))
+    p.emit(":=", Temp("t1"), dst=Var("s"))
+    p.emit(":=", Const(1), dst=Temp("t1"))
+    p.emit("+", Var("i"), Temp("t1"), Temp("t2"))
+    p.emit(":=", Temp("t2"), dst=Var("i"))
+    p.emit("goto", dst=Label("L"))
+    p.label(Label("E"))
+    p.emit("ret", Var("s"))
+    p.label(Label("func_f_end"))
+
+    pm = PassManager(["ssa"])
+    pm.run(p)
+    body = p.dump().splitlines()
+    # las copias 's := t1' e 'i := t2' se pliegan (las sumas escriben s e i) y el
+    # t1 reciclado para la constante queda separado de la condición
+    assert body[8:13] == ["B:", "+ s, i -> s", "t1.2 := 1", "+ i, t1.2 -> i", "goto L"]
+    assert not any("phi" in q or "Lssa" in q for q in body)
+    # el pass manager repitió la secuencia y la segunda vuelta no cambió nada
+    assert pm.stats["ssa"].runs == 2 and pm.stats["ssa"].changed == 1
+
+
+def test_block_emptied_by_copy_folding_keeps_phi_predecessors():
+    # if (c) x := y: la copia se pliega y el bloque queda sin quads
+    p = TACProgram()
+    p.emit("load", Addr("fp", 2), dst=Temp("x"))
+    p.emit("load", Addr("fp", 3), dst=Temp("y"))
+    p.emit("ifgoto", Var("c"), None, Label("J"))
+    p.emit(":=", Temp("y"), dst=Temp("x"))
+    p.label(Label("J"))
+    p.emit("print", Temp("x"))
+    cfg = program_cfg(p)
+    fn = cfg.functions["main"]
+    origins = build_ssa(fn, cfg.new_label)
+    assert verify_ssa(fn) == []
+    join = next(blk for blk in fn.blocks if any(q.op == "phi" for q in blk.quads))
+    phi = join.quads[1]
+    assert sorted(b for b, _ in phi.args) == sorted(join.preds) == [1, 3]
+    destroy_ssa(fn, origins)
+    # el label del bloque vacío se va; la copia del arco crítico va en el partido
+    assert [repr(q) for q in fn.quads()] == [
+        "load [fp+2] -> x", "load [fp+3] -> y", "if c goto Lssa_split0", "J:", "print y",
+        "goto Lssa_end0", "Lssa_split0:", "y := x", "goto J", "Lssa_end0:",
+    ]
@@ -0,0 +1,77 @@
+from program.ir.tac_ir import Addr, Const, Label, TACProgram, Temp, Var
+from program.opt.pass_manager import PassManager
+
+
+def _run(p: TACProgram) -> list:
+    PassManager(["dce"]).run(p)
+    return p.dump().splitlines()
+
+
+def test_dead_values_and_discarded_call_result():
+    p = TACProgram()
+    p.emit(":=", Const(1), dst=Temp("t0"))
+    p.emit("+", Temp("t0"), Temp("t0"), Temp("t1"))       # nadie usa t1
+    p.emit("alloc", Const("Box"), dst=Temp("t2"))         # efecto: se queda
+    p.emit("param", Temp("t0"))
+    p.emit("call", Const("f"), Const(1), Temp("t3"))      # resultado descartado
+    p.emit("print", Temp("t0"))
+    assert _run(p) == [
+        "t0 := 1", 'alloc "Box" -> t2', "param t0", 'call "f", nargs=1', "print t0",
+    ]
+
+
+def test_overwritten_frame_store_and_dead_value_go_away():
+    p = TACProgram()
+    p.label(Label("func_f_entry"))
+    p.emit(":=", Const(1), dst=Temp("t0"))
+    p.emit("store", Temp("t0"), Addr("fp", -1))          # pisado antes de leerse
+    p.emit(":=", Const(2), dst=Temp("t1"))
+    p.emit("store", Temp("t1"), Addr("fp", -1))
+    p.emit("load", Addr("fp", -1), dst=Temp("t2"))
+    p.emit("store", Temp("t2"), Addr("fp", -2))          # nadie lee [fp-2]
+    p.emit("ret", Temp("t2"))
+    p.label(Label("func_f_end"))
+    assert _run(p) == [
+        "func_f_entry:", "t1 := 2", "store t1, [fp-1]", "load [fp-1] -> t2", "ret t2",
+        "func_f_end:",
+    ]
+
+
+def test_address_taken_slot_keeps_its_stores():
+    p = TACProgram()
+    p.label(Label("func_f_entry"))
+    p.emit(":=", Const(1), dst=Temp("t0"))
+    p.emit("store", Temp("t0"), Addr("fp", -1))
+    p.emit("addr_field", Addr("fp", -1), Const(0), Temp("t1"))
+    p.emit("param", Temp("t1"))
+    p.emit("call", Const("g"), Const(1), None)
+    p.emit("ret", Const(0))
+    p.label(Label("func_f_end"))
+    assert "store t0, [fp-1]" in _run(p)
+
+
+def test_unreachable_ret_and_unused_labels():
+    p = TACProgram()
+    p.label(Label("func_f_entry"))
+    p.emit("ifgoto", Var("c"), None, Label("L1"))
+    p.label(Label("L0"))                                 # nadie salta a L0
+    p.emit("ret", Const(1))
+    p.label(Label("L1"))
+    p.emit("ret", Const(2))
+    p.label(Label("func_f_end"))
+    p.emit("ret", Const(None))                           # el 'ret null' implícito
+    p.emit("print", Var("g"))
+    assert _run(p) == [
+        "func_f_entry:", "if c goto L1", "ret 1", "L1:", "ret 2", "func_f_end:", "print g",
+    ]
+
+
+def test_globals_read_by_other_functions_stay_live():
+    p = TACProgram()
+    p.emit(":=", Const(5), dst=Var("g"))
+    p.emit(":=", Const(6), dst=Var("x"))                 # local de main sin uso
+    p.label(Label("func_f_entry"))
+    p.emit("ret", Var("g"))
+    p.label(Label("func_f_end"))
+    assert _run(p)[0] == "g := 5"
+    assert "x := 6" not in p.dump()
@@ -0,0 +1,97 @@
+from program.ir.tac_ir import Addr, Const, Label, TACProgram, Temp, Var
+from program.opt.pass_manager import PassManager
+
+
+def _run(p: TACProgram, name: str) -> list:
+    PassManager([name]).run(p)
+    return p.dump().splitlines()
+
+
+def test_local_numbering_reuses_arith_and_addresses():
+    p = TACProgram()
+    p.emit(":=", Const(7), dst=Temp("t0"))
+    p.emit("*", Var("i"), Temp("t0"), Temp("t1"))
+    p.emit(":=", Const(7), dst=Temp("t2"))
+    p.emit("*", Temp("t2"), Var("i"), Temp("t3"))        # conmutativo, 7 == 7
+    p.emit("addr_index", Var("a"), Var("i"), Temp("t4"))
+    p.emit("load", Temp("t4"), dst=Temp("t5"))
+    p.emit("addr_index", Var("a"), Var("i"), Temp("t6"))
+    p.emit("load", Temp("t6"), dst=Temp("t7"))
+    out = _run(p, "lvn")
+    assert out[3] == "t3 := t1"
+    assert out[6:] == ["t6 := t4", "t7 := t5"]
+
+
+def test_redefined_holder_or_operand_is_not_reused():
+    p = TACProgram()
+    p.emit("+", Var("x"), Var("y"), Temp("t0"))
+    p.emit(":=", Const(1), dst=Temp("t0"))              # t0 ya no contiene x + y
+    p.emit("+", Var("x"), Var("y"), Temp("t1"))
+    p.emit("+", Var("x"), Var("y"), Var("x"))
+    p.emit("+", Var("x"), Var("y"), Temp("t2"))         # x cambió
+    out = _run(p, "lvn")
+    assert out == ["+ x, y -> t0", "t0 := 1", "+ x, y -> t1", "x := t1", "+ x, y -> t2"]
+
+
+def test_stores_and_calls_kill_loads():
+    slot = Addr("fp", -1)
+    p = TACProgram()
+    p.emit("load", slot, dst=Temp("t0"))
+    p.emit("load", Var("p"), dst=Temp("t1"))
+    p.emit("store", Temp("t9"), Var("q"))               # puede apuntar a lo mismo que p
+    p.emit("load", slot, dst=Temp("t2"))                # el frame no tiene alias
+    p.emit("load", Var("p"), dst=Temp("t3"))
+    p.emit("store", Temp("t8"), slot)
+    p.emit("load", slot, dst=Temp("t4"))                # forwarding del store
+    p.emit("call", Const("f"), Const(0), Temp("t5"))
+    p.emit("load", slot, dst=Temp("t6"))
+    out = _run(p, "lvn")
+    assert out[3] == "t2 := t0"
+    assert out[4] == "load p -> t3"
+    assert out[6] == "t4 := t8"
+    assert out[8] == "load [fp-1] -> t6"
+
+
+def test_global_numbering_follows_dominators():
+    # t0 := x + y; if c goto L; t1 := x + y; L: t2 := x + y; x := 0; goto L2; L2: t3 := x + y
+    p = TACProgram()
+    p.emit("+", Var("x"), Var("y"), Temp("t0"))
+    p.emit("ifgoto", Var("c"), None, Label("L"))
+    p.emit("+", Var("x"), Var("y"), Temp("t1"))
+    p.emit("store", Temp("t1"), Addr("fp", -1))
+    p.label(Label("L"))
+    p.emit("+", Var("x"), Var("y"), Temp("t2"))
+    p.emit("load", Addr("fp", -1), dst=Temp("t3"))
+    p.emit("print", Temp("t3"))
+    assert _run(p, "lvn")[2] == "+ x, y -> t1"
+    out = _run(p, "gvn")
+    assert out[2] == "t1 := t0" and out[5] == "t2 := t0"
+    # el store de la rama no domina L: el load se queda
+    assert out[6] == "load [fp-1] -> t3"
+
+
+def test_loop_redefinitions_are_killed_at_the_header():
+    p = TACProgram()
+    p.emit("+", Var("x"), Var("y"), Temp("t0"))
+    p.label(Label("H"))
+    p.emit("+", Var("x"), Var("y"), Temp("t1"))
+    p.emit(":=", Temp("t1"), dst=Var("y"))
+    p.emit("ifgoto", Var("c"), None, Label("H"))
+    out = _run(p, "gvn")
+    assert out[2] == "+ x, y -> t1"
+
+
+def test_call_renumbers_globals_the_callee_can_write():
+    # y = x * 3; f(); print(x * 3)  con f escribiendo x
+    for name in ("lvn", "gvn"):
+        p = TACProgram()
+        p.emit("*", Var("x"), Const(3), Temp("t0"))
+        p.emit(":=", Temp("t0"), dst=Var("y"))
+        p.emit("call", Const("f"), Const(0), None)
+        p.emit("*", Var("x"), Const(3), Temp("t1"))
+        p.emit("print", Temp("t1"))
+        p.label(Label("func_f_entry"))
+        p.emit(":=", Const(5), dst=Var("x"))
+        p.emit("ret", Const(None))
+        p.label(Label("func_f_end"))
+        assert "* x, 3 -> t1" in _run(p, name)
@@ -0,0 +1,95 @@
+from program.ir.tac_ir import Const, Label, TACProgram, Temp, Var
+from program.opt.pass_manager import PassManager
+
+
+def _run(p: TACProgram) -> list:
+    PassManager(["jumps", "dce"]).run(p)
+    return p.dump().splitlines()
+
+
+def test_materialized_and_threads_to_original_comparisons():
+    # if (a < b && b < c) print 1 else print 2, como lo arma gen_expr_and
+    p = TACProgram()
+    p.emit("<", Var("a"), Var("b"), Temp("t0"))
+    p.emit("ifgoto", Temp("t0"), None, Label("L0"))
+    p.emit("goto", dst=Label("L1"))
+    p.label(Label("L0"))
+    p.emit("<", Var("b"), Var("c"), Temp("t2"))
+    p.emit("ifgoto", Temp("t2"), None, Label("L3"))
+    p.emit("goto", dst=Label("L1"))
+    p.label(Label("L3"))
+    p.emit(":=", Const(1), dst=Temp("t1"))
+    p.emit("goto", dst=Label("L2"))
+    p.label(Label("L1"))
+    p.emit(":=", Const(0), dst=Temp("t1"))
+    p.label(Label("L2"))
+    p.emit("ifgoto", Temp("t1"), None, Label("L4"))
+    p.emit("goto", dst=Label("L5"))
+    p.label(Label("L4"))
+    p.emit("print", Const(1))
+    p.emit("goto", dst=Label("L6"))
+    p.label(Label("L5"))
+    p.emit("print", Const(2))
+    p.label(Label("L6"))
+    # tras el threading, las dos comparaciones se invierten y caen al then
+    assert _run(p) == [
+        ">= a, b -> t0", "if t0 goto L5", ">= b, c -> t2", "if t2 goto L5",
+        "print 1", "goto L6", "L5:", "print 2", "L6:",
+    ]
+
+
+def test_branch_over_goto_is_inverted():
+    p = TACProgram()
+    p.emit("<=", Var("a"), Var("b"), Temp("t0"))
+    p.emit("ifgoto", Temp("t0"), None, Label("L1"))
+    p.emit("goto", dst=Label("L2"))
+    p.label(Label("L1"))
+    p.emit("print", Var("a"))
+    p.label(Label("L2"))
+    p.emit("<", Var("a"), Var("b"), Temp("t1"))
+    p.emit("ifgoto", Temp("t1"), None, Label("L3"))
+    p.emit("goto", dst=Label("L4"))
+    p.label(Label("L3"))
+    p.emit("print", Var("b"))
+    p.label(Label("L4"))
+    assert _run(p) == [
+        "> a, b -> t0", "if t0 goto L2", "print a",
+        "L2:", ">= a, b -> t1", "if t1 goto L4", "print b", "L4:",
+    ]
+
+
+def test_negated_comparison_feeds_the_branch():
+    # if (!(a == b)) ...: '== t0, 0' sobre un relacional que nadie más lee
+    p = TACProgram()
+    p.emit("==", Var("a"), Var("b"), Temp("t0"))
+    p.emit("==", Temp("t0"), Const(0), Temp("t1"))
+    p.emit("ifgoto", Temp("t1"), None, Label("L0"))
+    p.emit("print", Const(1))
+    p.label(Label("L0"))
+    p.emit("print", Temp("t0"))                           # t0 vivo: no se toca
+    p.emit("==", Var("a"), Var("c"), Temp("t2"))
+    p.emit("==", Temp("t2"), Const(0), Temp("t3"))
+    p.emit("ifgoto", Temp("t3"), None, Label("L1"))
+    p.emit("print", Const(2))
+    p.label(Label("L1"))
+    assert _run(p) == [
+        "== a, b -> t0", "== t0, 0 -> t1", "if t1 goto L0", "print 1",
+        "L0:", "print t0", "!= a, c -> t3", "if t3 goto L1", "print 2", "L1:",
+    ]
+
+
+def test_goto_chains_and_jump_to_next_label():
+    p = TACProgram()
+    p.emit("ifgoto", Var("c"), None, Label("L0"))
+    p.emit("print", Const(1))
+    p.emit("goto", dst=Label("L1"))
+    p.label(Label("L0"))
+    p.emit("goto", dst=Label("L2"))                       # L0 -> L2 -> (vacío) L3
+    p.label(Label("L2"))
+    p.label(Label("L3"))
+    p.emit("print", Const(2))
+    p.emit("goto", dst=Label("L1"))
+    p.label(Label("L1"))
+    assert _run(p) == [
+        "if c goto L3", "print 1", "goto L1", "L3:", "print 2", "L1:",
+    ]
@@ -0,0 +1,82 @@
+from program.ir.cfg import program_cfg
+from program.ir.tac_ir import Addr, Const, Label, TACProgram, Temp
+from program.opt.pass_manager import PassManager
+
+
+def _counter_loop(with_call: bool = False) -> TACProgram:
+    # func f(n): i := 0; while (i < n) { i := i + 1 } ret i
+    p = TACProgram()
+    p.label(Label("func_f_entry"))
+    p.emit(":=", Const(0), dst=Temp("t0"))
+    p.emit("store", Temp("t0"), Addr("fp", -1))
+    if with_call:
+        p.emit("store", Temp("t0"), Addr("fp", -2))
+    p.label(Label("L"))
+    p.emit("load", Addr("fp", -1), dst=Temp("t1"))
+    p.emit("load", Addr("fp", 2), dst=Temp("t2"))
+    p.emit("<", Temp("t1"), Temp("t2"), Temp("t3"))
+    p.emit("ifgoto", Temp("t3"), None, Label("B"))
+    p.emit("goto", dst=Label("E"))
+    p.label(Label("B"))
+    p.emit("load", Addr("fp", -1), dst=Temp("t1"))
+    p.emit(":=", Const(1), dst=Temp("t2"))
+    p.emit("+", Temp("t1"), Temp("t2"), Temp("t3"))
+    p.emit("store", Temp("t3"), Addr("fp", -1))
+    p.emit("goto", dst=Label("L"))
+    p.label(Label("E"))
+    if with_call:
+        p.emit("call", Const("g"), Const(0), None)
+        p.emit("load", Addr("fp", -2), dst=Temp("t5"))
+        p.emit("print", Temp("t5"))
+    p.emit("load", Addr("fp", -1), dst=Temp("t4"))
+    p.emit("ret", Temp("t4"))
+    p.label(Label("func_f_end"))
+    return p
+
+
+def test_loop_counter_runs_in_virtual_registers():
+    p = _counter_loop()
+    PassManager(["mem2reg"]).run(p)
+    body = p.dump().splitlines()
+    # el param se lee una vez al entrar; el loop ya no toca memoria
+    assert body[1] == "load [fp+2] -> %fp+2"
+    assert [q for q in body if "[fp" in q] == ["load [fp+2] -> %fp+2"]
+    assert "< %fp-1, %fp+2 -> t3" in body
+    assert "+ %fp-1, t2 -> t3" in body and "%fp-1 := t3" in body
+    assert body[-2] == "ret %fp-1"
+    # segunda ejecución: nada más que hacer
+    pm = PassManager(["mem2reg"])
+    pm.run(p)
+    assert pm.stats["mem2reg"].changed == 0
+
+
+def test_address_taken_slots_stay_in_memory():
+    p = TACProgram()
+    p.emit(":=", Const(5), dst=Temp("t0"))
+    p.emit("store", Temp("t0"), Addr("fp", -1))
+    p.emit("addr_field", Addr("fp", -1), Const(0), Temp("t1"))
+    p.emit("load", Addr("fp", -1), dst=Temp("t2"))
+    p.emit("print", Temp("t2"))
+    before = p.dump()
+    PassManager(["mem2reg"]).run(p)
+    assert p.dump() == before
+
+
+def test_with_calls_only_loop_slots_are_promoted():
+    p = _counter_loop(with_call=True)
+    PassManager(["mem2reg"]).run(p)
+    out = p.dump()
+    assert "%fp-1" in out and "%fp+2" in out
+    # [fp-2] vive a través del call fuera del loop: un lw es más barato que un $s*
+    assert "store t0, [fp-2]" in out and "load [fp-2] -> t5" in out
+
+
+def test_tac_liveness_per_block():
+    p = _counter_loop()
+    PassManager(["mem2reg"]).run(p)
+    f = program_cfg(p).functions["f"]
+    live = f.live_out()
+    assert live[0] == {"%fp-1", "%fp+2"}
+    blk = {b.label: b.id for b in f.blocks if b.label}
+    assert live[blk["B"]] == {"%fp-1", "%fp+2"}
+    assert live[blk["E"]] == set()
@@ -0,0 +1,93 @@
+from program.ir.tac_ir import Const, Label, TACProgram, Temp, Var
+from program.opt.fold import INT_MAX, INT_MIN, fold_binop
+from program.opt.pass_manager import PassManager
+
+
+def _run(p: TACProgram) -> str:
+    PassManager(["sccp"]).run(p)
+    return p.dump()
+
+
+def test_fold_uses_32_bit_mips_semantics():
+    assert fold_binop("+", INT_MAX, 1) == INT_MIN
+    assert fold_binop("*", 65536, 65536) == 0
+    assert fold_binop("-", INT_MIN, 1) == INT_MAX
+    # div de MIPS: trunca hacia cero, el resto lleva el signo del dividendo
+    assert fold_binop("/", -7, 2) == -3 and fold_binop("%", -7, 2) == -1
+    assert fold_binop("/", 7, -2) == -3 and fold_binop("%", 7, -2) == 1
+    assert fold_binop("/", 1, 0) is None and fold_binop("%", INT_MIN, -1) is None
+    assert fold_binop("<=", 3, 3) == 1 and fold_binop("!=", 3, 3) == 0
+
+
+def test_folds_and_substitutes_literal_uses():
+    p = TACProgram()
+    p.emit(":=", Const(6), dst=Temp("t0"))
+    p.emit(":=", Const(7), dst=Temp("t1"))
+    p.emit("*", Temp("t0"), Temp("t1"), Temp("t2"))
+    p.emit("==", Temp("t2"), Const(0), Temp("t3"))      # !t2
+    p.emit(":=", Temp("t2"), dst=Var("x"))
+    p.emit("+", Var("x"), Var("y"), Temp("t4"))          # y desconocido
+    p.emit("print", Var("x"))
+    p.emit("print", Temp("t4"))
+    out = _run(p).splitlines()
+    assert out[2:] == ["t2 := 42", "t3 := 0", "x := 42", "+ 42, y -> t4",
+                       "print 42", "print t4"]
+
+
+def test_known_branch_is_resolved_and_dead_arm_removed():
+    # t0 := 1; if t0 goto L_then; print 1; goto L_end; L_then: print 2; L_end:
+    p = TACProgram()
+    p.emit(":=", Const(True), dst=Temp("t0"))
+    p.emit("ifgoto", Temp("t0"), None, Label("L_then"))
+    p.emit("print", Const(1))
+    p.emit("goto", dst=Label("L_end"))
+    p.label(Label("L_then"))
+    p.emit("print", Const(2))
+    p.label(Label("L_end"))
+    out = _run(p)
+    assert "print 1" not in out and "if t0" not in out
+    assert out.splitlines() == ["t0 := true", "goto L_then", "L_then:", "print 2", "L_end:"]
+
+
+def test_loop_keeps_invariant_constants_only():
+    # i := 0; k := 5; L: if c goto B; goto E; B: i := i + k; goto L; E: print k; print i
+    p = TACProgram()
+    p.emit(":=", Const(0), dst=Var("i"))
+    p.emit(":=", Const(5), dst=Var("k"))
+    p.label(Label("L"))
+    p.emit("ifgoto", Var("c"), None, Label("B"))
+    p.emit("goto", dst=Label("E"))
+    p.label(Label("B"))
+    p.emit("+", Var("i"), Var("k"), Var("i"))
+    p.emit("goto", dst=Label("L"))
+    p.label(Label("E"))
+    p.emit("print", Var("k"))
+    p.emit("print", Var("i"))
+    out = _run(p)
+    assert "print 5" in out and "print i" in out and "+ i, 5 -> i" in out
+
+
+def test_unknown_names_and_calls_are_not_constants():
+    p = TACProgram()
+    p.emit(":=", Const(1), dst=Temp("t0"))
+    p.emit("call", Const("f"), Const(0), Temp("t0"))
+    p.emit("ret", Temp("t0"))
+    assert _run(p).splitlines()[-1] == "ret t0"
+
+
+def test_call_forgets_globals_the_callee_can_write():
+    # let x = 1; function f() { x = 2; }  f(); print(x); print(k)
+    p = TACProgram()
+    p.emit(":=", Const(1), dst=Var("x"))
+    p.emit(":=", Const(3), dst=Var("k"))                 # k no lo usa otra función
+    p.emit("call", Const("f"), Const(0), None)
+    p.emit("print", Var("x"))
+    p.emit("*", Var("x"), Const(3), Temp("t0"))
+    p.emit("print", Temp("t0"))
+    p.emit("print", Var("k"))
+    p.label(Label("func_f_entry"))
+    p.emit(":=", Const(2), dst=Var("x"))
+    p.emit("ret", Const(None))
+    p.label(Label("func_f_end"))
+    out = _run(p).splitlines()
+    assert out[3:7] == ["print x", "* x, 3 -> t0", "print t0", "print 3"]
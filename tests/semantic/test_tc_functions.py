@@ -19,3 +19,16 @@ def test_return_type_enforced_and_return_outside():
     """
     rep, _ = compile_source(code_bad)
     assert rep.has_errors(), "Return incompatible y return fuera de función debían fallar"
+
+def test_first_four_params_arrive_in_a_registers():
+    code = """
+    function f(a: integer, b: integer, c: integer, d: integer, e: integer): integer {
+      return a + e;
+    }
+    """
+    rep, checker = compile_source(code)
+    assert not rep.has_errors(), [str(e) for e in rep]
+    ar = checker.symtab.scope_stack.stack[0].resolve("f").activation_record
+    # offsets de siempre ([fp+2]..): para a..d son el home de $a0..$a3
+    assert [(ar.addr_of(p).offset, ar.addr_of(p).reg) for p in "abcde"] == [
+        (2, "$a0"), (3, "$a1"), (4, "$a2"), (5, "$a3"), (6, None)]
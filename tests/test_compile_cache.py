@@ -0,0 +1,64 @@
+import os
+import time
+
+from program.compile_cache import CompileCache
+
+
+def test_key_depends_on_source_and_options(tmp_path):
+    cache = CompileCache(str(tmp_path))
+    k1 = cache.key("print(1);", {"stage": "tac"})
+    assert k1 == cache.key("print(1);", {"stage": "tac"})
+    assert k1 != cache.key("print(2);", {"stage": "tac"})
+    assert k1 != cache.key("print(1);", {"stage": "mips"})
+
+
+def test_hit_miss_and_stats(tmp_path):
+    cache = CompileCache(str(tmp_path))
+    key = cache.key("print(1);")
+
+    assert cache.get(key) is None
+    cache.put(key, "print 1", ".text\n")
+    assert cache.get(key) == {"tac": "print 1", "asm": ".text\n"}
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stores"]) == (1, 1, 1)
+    assert stats["entries"] == 1
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    payload = "x" * 400
+    cache = CompileCache(str(tmp_path), max_bytes=1100)
+
+    keys = [cache.key(f"src{i}") for i in range(3)]
+    cache.put(keys[0], payload)
+    cache.put(keys[1], payload)
+    # Envejecer ambas y luego "usar" la primera: la segunda pasa a ser la más vieja
+    for i, k in enumerate(keys[:2]):
+        path = cache._entry_path(k)
+        os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+    assert cache.get(keys[0]) is not None
+
+    cache.put(keys[2], payload)
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_stats_flags_bypass_a_cache_hit(tmp_path, capsys):
+    from program.Driver import main
+
+    src = tmp_path / "p.cps"
+    src.write_text("let x: integer = 2;\nprint(x * 3);\n")
+    argv = ["Driver.py", str(src), "-O1", "--cache-dir", str(tmp_path / "cache"),
+            "--mips", str(tmp_path / "p.s")]
+    main(argv)
+    main(argv)
+    assert "recuperada del caché" in capsys.readouterr().out
+
+    main(argv + ["--opt-stats", "--regalloc-stats", "--peephole-stats"])
+    out = capsys.readouterr().out
+    assert "recuperada del caché" not in out
+    for title in ("Passes de optimización", "Asignación de registros", "Peephole MIPS"):
+        assert title in out
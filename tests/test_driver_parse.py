@@ -0,0 +1,35 @@
+from antlr4 import InputStream, CommonTokenStream
+from program.CompiscriptLexer import CompiscriptLexer
+from program.CompiscriptParser import CompiscriptParser
+from program.Driver import _parse_program
+
+
+def _both_trees(src: str):
+    ref_tokens = CommonTokenStream(CompiscriptLexer(InputStream(src)))
+    ref_parser = CompiscriptParser(ref_tokens)
+    ref_parser.removeErrorListeners()
+    ref = ref_parser.program().toStringTree(recog=ref_parser)
+
+    tokens = CommonTokenStream(CompiscriptLexer(InputStream(src)))
+    parser = CompiscriptParser(tokens)
+    tree, used_fallback = _parse_program(parser, tokens)
+    return ref, tree.toStringTree(recog=parser), used_fallback
+
+
+def test_sll_fast_path_matches_ll():
+    src = """
+    function suma(a: integer, b: integer): integer {
+      return a + b * 2;
+    }
+    let z: integer = suma(1, 2);
+    if (z > 3 && z != 4) { print(z); } else { print(0); }
+    """
+    ref, got, used_fallback = _both_trees(src)
+    assert not used_fallback
+    assert got == ref
+
+
+def test_syntax_error_falls_back_to_ll_recovery():
+    ref, got, used_fallback = _both_trees("let x: integer = ;\nprint(1);")
+    assert used_fallback
+    assert got == ref
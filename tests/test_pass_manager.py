@@ -0,0 +1,89 @@
+import pytest
+
+from program.Driver import _cache_options, _regalloc_for
+from program.ir.tac_ir import Const, TACProgram
+from program.opt import pass_manager
+from program.opt.pass_manager import Pass, PassManager, PassTimer, resolve_passes
+
+
+class DropOnePrint(Pass):
+    """Quita un 'print' por ejecución: cambia el código hasta que no queda ninguno."""
+    name = "drop_print"
+
+    def run(self, tac):
+        for i, q in enumerate(tac.code):
+            if q.op == "print":
+                del tac.code[i]
+                tac.invalidate()
+                return True
+        return False
+
+
+class Noop(Pass):
+    name = "noop"
+
+    def run(self, tac):
+        return False
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(pass_manager, "PASS_REGISTRY",
+                        {"drop_print": DropOnePrint, "noop": Noop})
+    monkeypatch.setattr(pass_manager, "OPT_LEVELS",
+                        {0: [], 1: ["drop_print"], 2: ["drop_print", "noop"]})
+
+
+def _prog(n_prints):
+    p = TACProgram()
+    for i in range(n_prints):
+        p.emit("print", Const(i))
+    p.emit("ret", Const(None))
+    return p
+
+
+def test_resolve_levels_and_pass_spec(registry):
+    assert resolve_passes(0) == []
+    assert resolve_passes(2) == ["drop_print", "noop"]
+    assert resolve_passes(2, "-noop") == ["drop_print"]
+    assert resolve_passes(0, "+noop") == ["noop"]
+    assert resolve_passes(2, "noop,drop_print") == ["noop", "drop_print"]
+    with pytest.raises(ValueError):
+        resolve_passes(1, "sccp")
+    with pytest.raises(ValueError):
+        resolve_passes(1, "noop,-drop_print")
+    with pytest.raises(ValueError):
+        resolve_passes(3)
+
+
+def test_runs_to_fixed_point_and_reports_deltas(registry):
+    tac = _prog(3)
+    timer = PassTimer()
+    pm = PassManager(resolve_passes(2), timer=timer)
+    pm.run(tac)
+    assert [q.op for q in tac.code] == ["ret"]
+    # 3 iteraciones que cambian + 1 que confirma el punto fijo
+    assert pm.iterations == 4
+    st = pm.stats["drop_print"]
+    assert (st.runs, st.changed, st.quads_delta) == (4, 3, -3)
+    assert pm.stats["noop"].quads_delta == 0
+    assert (pm.quads_in, pm.quads_out) == (4, 1)
+    assert "drop_print" in pm.format_stats()
+    assert timer._by_name["opt:drop_print"].counts["quads_delta"] == -3
+
+
+def test_single_sweep_and_iteration_cap(registry):
+    tac = _prog(3)
+    PassManager(["drop_print"], fixed_point=False).run(tac)
+    assert len(tac.code) == 3
+    pm = PassManager(["drop_print"], max_iterations=2)
+    pm.run(tac)
+    assert len(tac.code) == 1 and pm.iterations == 2
+
+
+def test_opt_level_feeds_cache_key_and_regalloc():
+    assert "passes" not in _cache_options(mips=False)
+    assert _cache_options(mips=True, regalloc="linear", passes=["a"])["passes"] == ["a"]
+    assert _regalloc_for(0) == "linear"
+    assert _regalloc_for(2) == "color"
+    assert _regalloc_for(2, "simple") == "simple"
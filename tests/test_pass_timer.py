@@ -0,0 +1,47 @@
+import json
+
+from program.pass_timer import PassTimer, count_tree_nodes
+
+
+class _Node:
+    def __init__(self, *children):
+        self.children = list(children)
+
+    def getChildCount(self):
+        return len(self.children)
+
+    def getChild(self, i):
+        return self.children[i]
+
+
+def test_stages_accumulate_counts_and_report():
+    timer = PassTimer(track_memory=True)
+    with timer.stage("parse"):
+        data = [i for i in range(1000)]
+    with timer.stage("parse"):   # re-entrar acumula en la misma fila
+        pass
+    timer.count("parse", "parse_tree_nodes", len(data))
+    timer.close()
+
+    assert [r.name for r in timer.records] == ["parse"]
+    rec = timer.records[0]
+    assert rec.wall_s >= 0 and rec.cpu_s >= 0
+    assert rec.peak_kb is not None
+    assert "parse_tree_nodes=1000" in timer.report()
+
+    payload = json.loads(timer.to_json())
+    assert payload["passes"][0]["counts"] == {"parse_tree_nodes": 1000}
+
+
+def test_disabled_timer_records_nothing():
+    timer = PassTimer(enabled=False)
+    with timer.stage("lex"):
+        pass
+    timer.count("lex", "tokens", 3)
+    assert timer.records == []
+
+
+def test_count_tree_nodes():
+    tree = _Node(_Node(), _Node(_Node(), _Node()))
+    assert count_tree_nodes(tree) == 5
+    assert count_tree_nodes(None) == 0